@@ -0,0 +1 @@
+"""回测模块"""
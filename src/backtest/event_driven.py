@@ -0,0 +1,234 @@
+"""
+事件驱动回测模块
+
+逐根 K 线驱动任意 BaseStrategy 子类，下单、成交、持仓与平仓都通过 trading.order / trading.position 完成，
+适合依赖持仓状态（如 should_sell）等无法向量化的策略逻辑。
+
+每根 K 线依次处理：
+    1. 待成交的限价买单：最低价触及委托价即成交（开盘价更低时按开盘价），过期未成交则撤单；
+       止损价与目标价按成交价重新计算（保持信号的止损幅度与盈亏比，与向量化回测一致）
+    2. 持仓离场（入场次日起）：止损优先于止盈，其后由 strategy.should_sell 决定是否按收盘价卖出
+    3. 空仓时调用 strategy.analyze，should_buy 通过后挂单，新信号替换未成交的旧订单
+
+股票按分片分配到进程池，价格面板放在共享内存中，任务只传递句柄；
+各分片返回交易明细，由主进程合并为组合权益曲线与绩效报告。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import BacktestConfig, StrategyConfig
+from ..data.panel_store import OHLCVPanel
+from ..data.shared_panel import SharedPanel, SharedPanelHandle, attach_panel
+from ..strategy.base import BaseStrategy
+from ..trading import order as order_api
+from ..trading import position as position_api
+from ..utils import logging
+from .metrics import TRADE_COLUMNS, build_equity_curve, compute_metrics, net_prices
+from .vectorized import BacktestResult, resolve_date_range
+
+logger = logging.get_logger(__name__)
+
+
+def run_event_backtest(
+    panel: OHLCVPanel,
+    strategy: BaseStrategy,
+    config: StrategyConfig,
+    backtest_config: BacktestConfig,
+    max_workers: Optional[int] = None,
+    n_shards: Optional[int] = None
+) -> BacktestResult:
+    """
+    事件驱动回测
+
+    Args:
+        panel: 行情面板
+        strategy: 策略实例（多进程时需可 pickle）
+        config: 策略配置
+        backtest_config: 回测配置
+        max_workers: 进程数，默认 CPU 核数；为 1 时在当前进程执行
+        n_shards: 股票分片数，默认为进程数的 4 倍（平衡各进程负载）
+
+    Returns:
+        BacktestResult
+    """
+    start, end = resolve_date_range(panel, backtest_config)
+    max_workers = max_workers or os.cpu_count() or 1
+    n_shards = min(n_shards or max_workers * 4, len(panel.symbols)) or 1
+    shards = [s.tolist() for s in np.array_split(np.arange(len(panel.symbols)), n_shards) if len(s)]
+
+    records = []
+    if max_workers == 1:
+        for rows in shards:
+            records.extend(backtest_rows(panel, rows, strategy, backtest_config, start, end))
+    else:
+        with SharedPanel(panel) as shared, ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_run_shard, shared.handle, rows, strategy, backtest_config, start, end)
+                for rows in shards
+            ]
+            for future in futures:
+                records.extend(future.result())
+
+    trades = pd.DataFrame(records, columns=TRADE_COLUMNS[:-2])
+    close = panel.field('close')
+    entry_cost, exit_proceeds = net_prices(trades['entry_price'].to_numpy(), trades['exit_price'].to_numpy(),
+                                           backtest_config.commission_rate)
+    equity = build_equity_curve(
+        panel.dates, close, trades['symbol'].to_numpy(), trades['entry_date'].to_numpy(),
+        trades['exit_date'].to_numpy(), entry_cost, exit_proceeds,
+        trades['shares'].to_numpy(), start, end, backtest_config.initial_capital
+    )
+    trades['pnl'] = trades['shares'] * (exit_proceeds - entry_cost)
+    trades['return'] = exit_proceeds / entry_cost - 1
+    trades['symbol'] = [panel.symbols[i] for i in trades['symbol']]
+    for column in ('signal_date', 'entry_date', 'exit_date'):
+        trades[column] = pd.DatetimeIndex(panel.dates[trades[column].to_numpy(dtype=np.intp)])
+    trades = trades.sort_values(['entry_date', 'symbol'], ignore_index=True)
+
+    metrics = compute_metrics(trades, equity)
+    logger.info(f"事件驱动回测完成: {len(panel.symbols)} 只股票, {len(shards)} 个分片, {len(trades)} 笔交易, "
+                f"总收益 {metrics['total_return']:.2%}")
+    return BacktestResult(trades=trades, equity=equity, metrics=metrics)
+
+
+def backtest_rows(
+    panel: OHLCVPanel,
+    rows: List[int],
+    strategy: BaseStrategy,
+    backtest_config: BacktestConfig,
+    start: int,
+    end: int
+) -> List[tuple]:
+    """
+    逐只股票执行事件驱动回测
+
+    Returns:
+        交易记录 (row, signal_type, signal, entry, entry_price, stop, target, exit, exit_price, reason, shares)，
+        日期为面板日期下标
+    """
+    records = []
+    for row in rows:
+        order_api.clear_orders()
+        position_api.clear_positions()
+        records.extend(_backtest_symbol(panel, row, strategy, backtest_config, start, end))
+    return records
+
+
+def _run_shard(
+    handle: SharedPanelHandle,
+    rows: List[int],
+    strategy: BaseStrategy,
+    backtest_config: BacktestConfig,
+    start: int,
+    end: int
+) -> List[tuple]:
+    """子进程入口：映射共享面板后回测一个分片"""
+    return backtest_rows(attach_panel(handle), rows, strategy, backtest_config, start, end)
+
+
+def _backtest_symbol(
+    panel: OHLCVPanel,
+    row: int,
+    strategy: BaseStrategy,
+    backtest_config: BacktestConfig,
+    start: int,
+    end: int
+) -> List[tuple]:
+    """回测单只股票"""
+    symbol = panel.symbols[row]
+    frame = panel.to_frame(row)
+    date_idx = np.searchsorted(panel.dates, frame.index.values.astype('datetime64[D]'))
+    frame = frame[date_idx < end]
+    date_idx = date_idx[date_idx < end]
+    if frame.empty:
+        return []
+
+    open_, high = frame['open'].to_numpy(), frame['high'].to_numpy()
+    low, close = frame['low'].to_numpy(), frame['close'].to_numpy()
+    times = frame.index.to_pydatetime()
+
+    records = []
+    pending = None      # (order, signal, signal_bar, expire_bar)
+    holding = None      # (position, signal, signal_bar, entry_bar)
+
+    def exit_position(bar: int, price: float, reason: str) -> None:
+        position, signal, signal_bar, entry_bar = holding
+        position_api.close_position(position['position_id'], price, times[bar])
+        records.append((row, signal['signal_type'], date_idx[signal_bar], date_idx[entry_bar],
+                        position['entry_price'], position['stop_loss'], position['target_price'],
+                        date_idx[bar], price, reason, position['quantity']))
+
+    for bar in range(len(frame)):
+        # 1. 待成交订单
+        if pending is not None:
+            order, signal, signal_bar, expire_bar = pending
+            if order_api.check_order_fills(order, low[bar]):
+                fill = open_[bar] if open_[bar] <= order['price'] else order['price']
+                order_api.update_order_status(order['order_id'], "filled", fill, times[bar])
+                stop, target = _levels_from_fill(signal, fill)
+                position = position_api.create_position(
+                    symbol, fill, order['quantity'], stop, target,
+                    entry_time=times[bar], signal_id=order['signal_id']
+                )
+                holding = (position, signal, signal_bar, bar)
+                pending = None
+            elif bar >= expire_bar:
+                order_api.cancel_order(order['order_id'], times[bar])
+                pending = None
+
+        # 2. 持仓离场（入场当日不检查）
+        if holding is not None and bar > holding[3]:
+            position = holding[0]
+            if position_api.should_stop_loss(position, low[bar]):
+                stop = position['stop_loss']
+                exit_position(bar, open_[bar] if open_[bar] < stop else stop, 'stop')
+                holding = None
+            elif position_api.should_take_profit(position, high[bar], position['target_price']):
+                target = position['target_price']
+                exit_position(bar, open_[bar] if open_[bar] > target else target, 'target')
+                holding = None
+            else:
+                position_api.update_position(position['position_id'], current_price=close[bar])
+                if strategy.should_sell(position, frame.iloc[:bar + 1]):
+                    exit_position(bar, close[bar], 'strategy')
+                    holding = None
+            if holding is None:
+                continue    # 离场当日不再开新仓
+
+        # 3. 空仓时生成信号
+        if holding is not None or date_idx[bar] < start:
+            continue
+        signal = strategy.analyze(symbol, frame.iloc[:bar + 1])
+        if signal is None or not strategy.should_buy(signal):
+            continue
+        quantity = int(strategy.calculate_position_size(signal, backtest_config.initial_capital)
+                       // signal['entry_price'])
+        if quantity <= 0:
+            continue
+        if pending is not None:
+            order_api.cancel_order(pending[0]['order_id'], times[bar])
+        order = order_api.create_order(symbol, "buy", quantity, signal['entry_price'], "limit",
+                                       created_time=times[bar])
+        pending = (order, signal, bar, bar + backtest_config.order_ttl) if order['status'] == "pending" else None
+
+    if holding is not None:
+        exit_position(len(frame) - 1, close[-1], 'end')
+    return records
+
+
+def _levels_from_fill(signal: dict, fill: float) -> tuple:
+    """
+    按成交价重新计算止损价与目标价
+
+    信号的止损价、目标价基于挂单价；成交价（跳空低开时为开盘价）不同时，
+    保持止损幅度 (1 - stop_loss / entry_price) 与盈亏比不变。
+
+    Returns:
+        (stop_loss, target_price)
+    """
+    stop = fill * signal['stop_loss'] / signal['entry_price']
+    return stop, fill + signal['risk_reward_ratio'] * (fill - stop)
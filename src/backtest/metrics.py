@@ -0,0 +1,119 @@
+"""
+回测绩效指标模块
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 年化使用的交易日数
+TRADING_DAYS_PER_YEAR = 252
+
+# 交易明细的列
+TRADE_COLUMNS = [
+    'symbol', 'signal_type', 'signal_date', 'entry_date', 'entry_price', 'stop_loss',
+    'target_price', 'exit_date', 'exit_price', 'exit_reason', 'shares', 'pnl', 'return',
+]
+
+
+def build_equity_curve(
+    dates: np.ndarray,
+    close: np.ndarray,
+    rows: np.ndarray,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    entry_prices: np.ndarray,
+    exit_prices: np.ndarray,
+    shares: np.ndarray,
+    start: int,
+    end: int,
+    initial_capital: float
+) -> pd.Series:
+    """
+    按收盘价逐日盯市计算权益：已平仓收益累计 + 持仓浮动盈亏
+
+    Args:
+        dates: 面板日期
+        close: 收盘价面板，形状 (n_symbols, n_dates)
+        rows: 每笔交易的股票行号
+        entries: 入场日下标
+        exits: 离场日下标
+        entry_prices: 入场价（含佣金的成本价，见 net_prices）
+        exit_prices: 离场价（扣除佣金的净价）
+        shares: 股数
+        start: 回测区间起始下标（含）
+        end: 回测区间结束下标（不含）
+        initial_capital: 初始资金
+
+    Returns:
+        [start, end) 区间的每日权益
+    """
+    realized = np.zeros(end)
+    unrealized = np.zeros(end)
+    if len(rows):
+        # 停牌（NaN）日沿用最近的收盘价，只处理有交易的股票
+        traded = np.unique(rows)
+        filled = pd.DataFrame(np.asarray(close[traded, :end])).ffill(axis=1).to_numpy()
+        position = {row: i for i, row in enumerate(traded)}
+        for row, entry, exit_day, entry_price, exit_price, n in zip(
+                rows, entries, exits, entry_prices, exit_prices, shares):
+            unrealized[entry:exit_day] += n * (filled[position[row], entry:exit_day] - entry_price)
+            realized[exit_day] += n * (exit_price - entry_price)
+    equity = initial_capital + np.cumsum(realized) + unrealized
+    return pd.Series(equity[start:], index=pd.DatetimeIndex(dates[start:end], name='date'), name='equity')
+
+
+def net_prices(
+    entry_prices: np.ndarray,
+    exit_prices: np.ndarray,
+    commission_rate: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按双边佣金折算成交价：买入成本价 = 成交价 × (1 + 费率)，卖出净价 = 成交价 × (1 - 费率)
+
+    Args:
+        entry_prices: 入场成交价
+        exit_prices: 离场成交价
+        commission_rate: 单边佣金费率（成交额比例）
+
+    Returns:
+        (买入成本价, 卖出净价)，用于盈亏、收益率与权益曲线
+    """
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)
+    exit_prices = np.asarray(exit_prices, dtype=np.float64)
+    return entry_prices * (1 + commission_rate), exit_prices * (1 - commission_rate)
+
+
+def compute_metrics(trades: pd.DataFrame, equity: pd.Series) -> Dict[str, float]:
+    """
+    计算回测绩效指标
+
+    Args:
+        trades: 交易明细（TRADE_COLUMNS）
+        equity: 每日权益曲线
+
+    Returns:
+        指标字典：交易数、胜率、平均收益、盈亏因子、总收益、年化收益、夏普比率、最大回撤
+    """
+    returns = trades['return'].to_numpy(dtype=np.float64) if len(trades) else np.array([])
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+
+    values = equity.to_numpy(dtype=np.float64)
+    total_return = values[-1] / values[0] - 1 if len(values) else 0.0
+    years = len(values) / TRADING_DAYS_PER_YEAR
+    annual_return = (1 + total_return) ** (1 / years) - 1 if years > 0 and total_return > -1 else np.nan
+    daily = np.diff(values) / values[:-1] if len(values) > 1 else np.array([])
+    sharpe = daily.mean() / daily.std() * np.sqrt(TRADING_DAYS_PER_YEAR) if len(daily) and daily.std() > 0 else np.nan
+    drawdown = values / np.maximum.accumulate(values) - 1 if len(values) else np.array([0.0])
+
+    return {
+        'n_trades': int(len(returns)),
+        'win_rate': float((returns > 0).mean()) if len(returns) else np.nan,
+        'avg_return': float(returns.mean()) if len(returns) else np.nan,
+        'profit_factor': float(gains / losses) if losses > 0 else np.nan,
+        'total_return': float(total_return),
+        'annual_return': float(annual_return),
+        'sharpe': float(sharpe),
+        'max_drawdown': float(drawdown.min()),
+    }
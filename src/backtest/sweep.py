@@ -0,0 +1,225 @@
+"""
+参数扫描模块
+
+对 StrategyConfig 的字段做网格或随机采样，在进程池中并行回测，结果按指定指标排序输出为表格。
+
+指标复用：MA 只取决于 ma_period，布林带下轨 = 滚动均值 - k × 滚动标准差，
+均值与标准差只取决于 bollinger_period。扫描开始前对每个不同的 ma_period / bollinger_period
+各计算一次，放入共享内存；各组合在子进程中按 (ma_period, bollinger_period, bollinger_std)
+组装 BacktestIndicators，结果与直接计算逐元素一致。
+"""
+import dataclasses
+import itertools
+import os
+import pathlib
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import BacktestConfig, StrategyConfig
+from ..data.panel_store import OHLCVPanel
+from ..data.shared_panel import SharedArrays, SharedArraysHandle, SharedPanel, SharedPanelHandle, \
+    attach_arrays, attach_panel
+from ..strategy import indicators
+from ..utils import logging
+from .vectorized import BacktestIndicators, simulate
+
+logger = logging.get_logger(__name__)
+
+# 参数取值：列表表示离散取值；二元组 (low, high) 表示随机采样时的均匀分布区间（均为 int 时取整数）
+ParamSpace = Dict[str, Union[Sequence[Any], Tuple[float, float]]]
+
+
+def grid_configs(base: StrategyConfig, grid: Dict[str, Sequence[Any]]) -> List[StrategyConfig]:
+    """
+    网格展开参数
+
+    Args:
+        base: 基准配置，未出现在 grid 中的字段保持不变
+        grid: 字段名 -> 取值列表
+
+    Returns:
+        全部组合的配置
+    """
+    _check_fields(grid)
+    keys = list(grid)
+    return [dataclasses.replace(base, **dict(zip(keys, values)))
+            for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def random_configs(
+    base: StrategyConfig,
+    space: ParamSpace,
+    n_samples: int,
+    seed: Optional[int] = None
+) -> List[StrategyConfig]:
+    """
+    随机采样参数
+
+    Args:
+        base: 基准配置
+        space: 字段名 -> 取值列表或 (low, high) 区间
+        n_samples: 采样数
+        seed: 随机种子
+
+    Returns:
+        采样得到的配置（已去重）
+    """
+    _check_fields(space)
+    rng = random.Random(seed)
+    configs = {}
+    for _ in range(n_samples):
+        params = {}
+        for key, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                low, high = values
+                params[key] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) \
+                    else rng.uniform(low, high)
+            else:
+                params[key] = rng.choice(list(values))
+        config = dataclasses.replace(base, **params)
+        configs[dataclasses.astuple(config)] = config
+    return list(configs.values())
+
+
+def run_sweep(
+    panel: OHLCVPanel,
+    configs: List[StrategyConfig],
+    backtest_config: BacktestConfig,
+    metric: str = 'sharpe',
+    market_caps: Optional[np.ndarray] = None,
+    max_workers: Optional[int] = None,
+    output_path: Optional[pathlib.Path] = None
+) -> pd.DataFrame:
+    """
+    并行回测全部参数组合
+
+    Args:
+        panel: 行情面板
+        configs: 参数组合，见 grid_configs / random_configs
+        backtest_config: 回测配置
+        metric: 排序指标（compute_metrics 的键），降序
+        market_caps: 按 panel.symbols 顺序的市值
+        max_workers: 进程数，默认 CPU 核数；为 1 时在当前进程执行
+        output_path: 结果表保存路径（.csv），为空时不保存
+
+    Returns:
+        每个组合一行：StrategyConfig 字段 + 绩效指标，按 metric 降序
+    """
+    if not configs:
+        raise ValueError("参数组合为空")
+    rows = map_configs(panel, configs, evaluate_configs, (backtest_config, market_caps), max_workers)
+    results = pd.DataFrame(rows).sort_values(metric, ascending=False, na_position='last', ignore_index=True)
+    logger.info(f"参数扫描完成: {len(configs)} 组参数, 最优 {metric} = {results[metric].iloc[0]:.4f}")
+    if output_path is not None:
+        output_path = pathlib.Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        results.to_csv(output_path, index=False, float_format='%.6g')
+    return results
+
+
+def map_configs(
+    panel: OHLCVPanel,
+    configs: List[StrategyConfig],
+    evaluate: Callable[..., List[Any]],
+    args: tuple = (),
+    max_workers: Optional[int] = None
+) -> List[Any]:
+    """
+    预计算共享指标后，把参数组合分块交给 evaluate 并行执行
+
+    Args:
+        panel: 行情面板
+        configs: 参数组合
+        evaluate: 模块级函数 evaluate(panel, arrays, configs, *args) -> 结果列表（需可 pickle）
+        args: evaluate 的其余参数
+        max_workers: 进程数，默认 CPU 核数；为 1 时在当前进程执行
+
+    Returns:
+        各块结果按块顺序拼接（块内顺序与组合排序一致）
+    """
+    arrays = precompute_indicator_arrays(panel, configs)
+    # 同一 MA / 布林带周期的组合放在同一块，子进程内按顺序访问同一组指标
+    configs = sorted(configs, key=lambda c: (c.ma_period, c.bollinger_period, c.bollinger_std))
+    max_workers = max_workers or os.cpu_count() or 1
+    n_chunks = min(len(configs), max_workers * 4)
+    chunks = [configs[i * len(configs) // n_chunks:(i + 1) * len(configs) // n_chunks] for i in range(n_chunks)]
+    logger.info(f"{len(configs)} 组参数共享 {len(arrays)} 个指标面板, 分 {n_chunks} 块")
+
+    results = []
+    if max_workers == 1:
+        for chunk in chunks:
+            results.extend(evaluate(panel, arrays, chunk, *args))
+        return results
+    with SharedPanel(panel) as shared_panel, SharedArrays(arrays) as shared_arrays, \
+            ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_run_chunk, shared_panel.handle, shared_arrays.handle, evaluate, chunk, args)
+            for chunk in chunks
+        ]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def precompute_indicator_arrays(panel: OHLCVPanel, configs: List[StrategyConfig]) -> Dict[str, np.ndarray]:
+    """
+    对每个不同的 ma_period / bollinger_period 计算一次指标面板
+
+    Returns:
+        'ma_<n>' -> MA 面板；'bb_mean_<n>' / 'bb_std_<n>' -> 滚动均值 / 标准差面板
+    """
+    close = panel.field('close')
+    arrays = {}
+    for period in sorted({c.ma_period for c in configs}):
+        arrays[f'ma_{period}'] = indicators.calculate_sma_panel(close, period)
+    for period in sorted({c.bollinger_period for c in configs}):
+        arrays[f'bb_mean_{period}'], arrays[f'bb_std_{period}'] = \
+            indicators.calculate_rolling_mean_std_panel(close, period)
+    return arrays
+
+
+def evaluate_configs(
+    panel: OHLCVPanel,
+    arrays: Dict[str, np.ndarray],
+    configs: List[StrategyConfig],
+    backtest_config: BacktestConfig,
+    market_caps: Optional[np.ndarray] = None
+) -> List[Dict[str, Any]]:
+    """在预计算的指标面板上回测一组参数，返回每组参数的字段与指标"""
+    rows = []
+    for config in configs:
+        result = simulate(panel, indicators_for(arrays, config), config, backtest_config, market_caps)
+        rows.append({**dataclasses.asdict(config), **result.metrics})
+    return rows
+
+
+def indicators_for(arrays: Dict[str, np.ndarray], config: StrategyConfig) -> BacktestIndicators:
+    """从预计算的指标面板组装某组参数的 BacktestIndicators"""
+    return BacktestIndicators(
+        ma=arrays[f'ma_{config.ma_period}'],
+        bollinger_lower=arrays[f'bb_mean_{config.bollinger_period}']
+        - config.bollinger_std * arrays[f'bb_std_{config.bollinger_period}'],
+    )
+
+
+def _run_chunk(
+    panel_handle: SharedPanelHandle,
+    arrays_handle: SharedArraysHandle,
+    evaluate: Callable[..., List[Any]],
+    configs: List[StrategyConfig],
+    args: tuple
+) -> List[Any]:
+    """子进程入口：映射共享面板与指标后处理一块参数组合"""
+    return evaluate(attach_panel(panel_handle), attach_arrays(arrays_handle), configs, *args)
+
+
+def _check_fields(params: Dict[str, Any]) -> None:
+    """检查参数名是否为 StrategyConfig 字段"""
+    fields = {f.name for f in dataclasses.fields(StrategyConfig)}
+    unknown = set(params) - fields
+    if unknown:
+        raise ValueError(f"未知的 StrategyConfig 字段: {sorted(unknown)}")
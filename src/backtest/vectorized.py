@@ -0,0 +1,360 @@
+"""
+向量化回测模块
+
+在整个行情面板（symbol × date）上用数组运算计算指标与信号：
+    准备条件（T 日）：收盘价低于 MA 至少阈值（按市值区分大盘/小盘），且跌破布林带下轨
+    bollinger_breakout：T 日满足准备条件
+    yang_bao_yin：T 日满足准备条件，T+1 日出现阳包阴
+    break_high：T 日满足准备条件，T+1 日收盘突破 T 日最高价
+信号出现后以 T 日收盘价挂限价买单，有效 order_ttl 个交易日，新信号出现时以新信号价格为准。
+成交后止损价为入场价下方 stop_loss_pct，目标价为 入场价 + 盈亏比 × (入场价 - 止损价)。
+
+撮合只遍历稀疏的信号，成交日与离场日在价格数组上用向量化比较一次找出；
+各股票的候选交易按入场日合并，受可用资金与最大同时持仓数（max_positions）约束。
+指标计算（compute_backtest_indicators）与撮合（simulate）分离，参数扫描时可复用指标。
+
+为避免前视与幸存者偏差，市值可传入按日取值的面板（stock_info.market_cap_panel），
+并可传入成分股掩码（membership.membership_mask）只在股票当日属于股票池时产生信号；
+只传入最新市值快照时，历史日期的大盘/小盘划分使用的是当前市值。
+"""
+import heapq
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import BacktestConfig, StrategyConfig
+from ..data.panel_store import OHLCVPanel
+from ..strategy import indicators
+from ..strategy.patterns import PATTERN_DETECTORS, scan_patterns
+from ..utils import logging
+from .metrics import TRADE_COLUMNS, build_equity_curve, compute_metrics, net_prices
+
+logger = logging.get_logger(__name__)
+
+# 信号编码，同一天出现多种信号时取编码最大者
+SIGNAL_CODES = {'bollinger_breakout': 1, 'break_high': 2, 'yang_bao_yin': 3}
+SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+
+class BacktestIndicators(NamedTuple):
+    """回测所需的指标面板，形状均为 (n_symbols, n_dates)"""
+    ma: np.ndarray
+    bollinger_lower: np.ndarray
+
+
+class SignalPanel(NamedTuple):
+    """信号面板"""
+    code: np.ndarray         # int8，0 表示无信号，其他见 SIGNAL_CODES
+    limit_price: np.ndarray  # 信号对应的挂单价（T 日收盘价），无信号处为 NaN
+
+
+class BacktestResult(NamedTuple):
+    """回测结果"""
+    trades: pd.DataFrame     # 交易明细（TRADE_COLUMNS）
+    equity: pd.Series        # 每日权益曲线
+    metrics: Dict[str, float]
+
+
+def compute_backtest_indicators(
+    panel: OHLCVPanel,
+    config: StrategyConfig
+) -> BacktestIndicators:
+    """
+    在整个面板上计算回测指标
+
+    Args:
+        panel: 行情面板
+        config: 策略配置，使用 ma_period、bollinger_period、bollinger_std
+
+    Returns:
+        BacktestIndicators
+    """
+    close = panel.field('close')
+    bands = indicators.calculate_bollinger_bands_panel(close, config.bollinger_period, config.bollinger_std)
+    return BacktestIndicators(
+        ma=indicators.calculate_sma_panel(close, config.ma_period),
+        bollinger_lower=bands.lower,
+    )
+
+
+def compute_signals(
+    panel: OHLCVPanel,
+    ind: BacktestIndicators,
+    config: StrategyConfig,
+    signal_types: List[str],
+    market_caps: Optional[np.ndarray] = None
+) -> SignalPanel:
+    """
+    计算信号面板
+
+    Args:
+        panel: 行情面板
+        ind: 回测指标
+        config: 策略配置
+        signal_types: 参与交易的信号类型
+        market_caps: 按 panel.symbols 顺序的市值，形状 (n_symbols,) 或按日取值的 (n_symbols, n_dates)；
+            缺失（NaN）或为空时按非大盘股处理
+
+    Returns:
+        SignalPanel
+    """
+    unknown = set(signal_types) - set(SIGNAL_CODES)
+    if unknown:
+        raise ValueError(f"未知信号类型: {sorted(unknown)}")
+
+    close = panel.field('close')
+    n_symbols, n_dates = close.shape
+    if market_caps is None:
+        market_caps = np.full(n_symbols, np.nan)
+    threshold = np.where(market_caps >= config.large_cap_market_cap,
+                         config.threshold_large_cap, config.threshold_small_cap)
+    if threshold.ndim == 1:
+        threshold = threshold[:, None]
+
+    setup = (close < ind.bollinger_lower) & (close <= ind.ma * (1 - threshold))
+    prev_setup = np.zeros_like(setup)
+    prev_setup[:, 1:] = setup[:, :-1]
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+
+    code = np.zeros((n_symbols, n_dates), dtype=np.int8)
+    limit_price = np.full((n_symbols, n_dates), np.nan)
+    # 形态信号的 T+1 日来自稀疏形态事件表
+    events = scan_patterns(panel, [name for name in signal_types if name in PATTERN_DETECTORS])
+    # 按编码从小到大写入，同一天的高优先级信号覆盖低优先级信号
+    for name in sorted(signal_types, key=SIGNAL_CODES.get):
+        if name == 'bollinger_breakout':
+            mask, price = setup, close
+        else:
+            selected = events['pattern'] == name
+            hit = np.zeros((n_symbols, n_dates), dtype=bool)
+            hit[events.loc[selected, 'row'].to_numpy(dtype=np.intp),
+                events.loc[selected, 'day'].to_numpy(dtype=np.intp)] = True
+            mask, price = prev_setup & hit, prev_close
+        code[mask] = SIGNAL_CODES[name]
+        limit_price[mask] = price[mask]
+    return SignalPanel(code=code, limit_price=limit_price)
+
+
+def simulate(
+    panel: OHLCVPanel,
+    ind: BacktestIndicators,
+    config: StrategyConfig,
+    backtest_config: BacktestConfig,
+    market_caps: Optional[np.ndarray] = None,
+    tradable: Optional[np.ndarray] = None
+) -> BacktestResult:
+    """
+    在预先计算的指标上撮合交易
+
+    每只股票同时最多持有一个仓位，持仓期间的信号忽略。
+    限价单在信号次日起生效，当日最低价不高于挂单价即成交，开盘价低于挂单价时按开盘价成交。
+    每笔交易的名义金额为 initial_capital × position_size；成交时可用资金不足（含佣金）
+    或持仓数已达 max_positions 的订单放弃，资金在离场次日起释放。同一日的成交按股票行号顺序处理。
+    入场次日起检查离场：同一日同时触及止损与目标时按止损处理（保守），跳空时按开盘价成交；
+    区间结束仍未离场的仓位按最后收盘价平仓。
+    交易明细中的 entry_price / exit_price 为成交价，pnl、return 与权益曲线扣除双边佣金（commission_rate）。
+
+    Args:
+        panel: 行情面板
+        ind: compute_backtest_indicators 的结果（可在多次撮合间复用）
+        config: 策略配置
+        backtest_config: 回测配置
+        market_caps: 按 panel.symbols 顺序的市值，(n_symbols,) 或按日取值的 (n_symbols, n_dates)
+        tradable: 形状 (n_symbols, n_dates) 的 bool 掩码（如指数成分股掩码），为 False 的日期不产生信号
+
+    Returns:
+        BacktestResult
+    """
+    signals = compute_signals(panel, ind, config, backtest_config.signal_types, market_caps)
+    if tradable is not None:
+        signals.code[~tradable] = 0
+    return simulate_signals(panel, signals, config, backtest_config)
+
+
+def simulate_signals(
+    panel: OHLCVPanel,
+    signals: SignalPanel,
+    config: StrategyConfig,
+    backtest_config: BacktestConfig,
+    window: Optional[tuple] = None
+) -> BacktestResult:
+    """
+    在预先计算的信号面板上撮合交易（撮合规则见 simulate）
+
+    同一份信号可在多个互不相关的区间上分别撮合（如滚动前推的各训练 / 测试窗口），signals 不会被修改。
+
+    Args:
+        panel: 行情面板
+        signals: compute_signals 的结果
+        config: 策略配置
+        backtest_config: 回测配置
+        window: 撮合区间的日期下标 (start, end)，默认由 backtest_config 的 start_date / end_date 决定；
+            区间外的信号忽略，区间结束时仍持仓的按区间内最后收盘价平仓
+
+    Returns:
+        BacktestResult
+    """
+    start, end = window if window is not None else resolve_date_range(panel, backtest_config)
+    code = np.zeros_like(signals.code)
+    code[:, start:end] = signals.code[:, start:end]
+    signals = SignalPanel(code=code, limit_price=signals.limit_price)
+
+    # 字段视图在内存中不连续，逐行撮合前先复制为连续数组
+    open_, high = np.ascontiguousarray(panel.field('open')), np.ascontiguousarray(panel.field('high'))
+    low, close = np.ascontiguousarray(panel.field('low')), np.ascontiguousarray(panel.field('close'))
+    records = _simulate_portfolio(signals, open_, high, low, close, end, config, backtest_config)
+
+    trades = pd.DataFrame(records, columns=TRADE_COLUMNS[:-2])
+    entry_cost, exit_proceeds = net_prices(trades['entry_price'].to_numpy(), trades['exit_price'].to_numpy(),
+                                           backtest_config.commission_rate)
+    equity = build_equity_curve(
+        panel.dates, close, trades['symbol'].to_numpy(), trades['entry_date'].to_numpy(),
+        trades['exit_date'].to_numpy(), entry_cost, exit_proceeds,
+        trades['shares'].to_numpy(), start, end, backtest_config.initial_capital
+    )
+    trades['pnl'] = trades['shares'] * (exit_proceeds - entry_cost)
+    trades['return'] = exit_proceeds / entry_cost - 1
+    trades['symbol'] = [panel.symbols[i] for i in trades['symbol']]
+    trades['signal_type'] = trades['signal_type'].map(SIGNAL_NAMES)
+    for column in ('signal_date', 'entry_date', 'exit_date'):
+        trades[column] = pd.DatetimeIndex(panel.dates[trades[column].to_numpy(dtype=np.intp)])
+
+    metrics = compute_metrics(trades, equity)
+    logger.debug(f"回测完成: {len(trades)} 笔交易, 总收益 {metrics['total_return']:.2%}, "
+                f"最大回撤 {metrics['max_drawdown']:.2%}")
+    return BacktestResult(trades=trades, equity=equity, metrics=metrics)
+
+
+def run_backtest(
+    panel: OHLCVPanel,
+    config: StrategyConfig,
+    backtest_config: BacktestConfig,
+    market_caps: Optional[np.ndarray] = None,
+    tradable: Optional[np.ndarray] = None
+) -> BacktestResult:
+    """计算指标并撮合"""
+    return simulate(panel, compute_backtest_indicators(panel, config), config, backtest_config,
+                    market_caps, tradable)
+
+
+def _simulate_portfolio(
+    signals: SignalPanel,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    end: int,
+    config: StrategyConfig,
+    backtest_config: BacktestConfig
+) -> List[tuple]:
+    """
+    按入场日顺序合并各股票的候选交易，并施加资金与持仓数约束
+
+    每只股票只保留下一笔候选交易；交易被接受后从离场次日起继续找下一笔，
+    被放弃时从其入场日起继续找（原订单作废，后续信号照常处理）。
+
+    Returns:
+        交易记录，格式同 _next_trade
+    """
+    notional = backtest_config.initial_capital * backtest_config.position_size
+    cost = notional * (1 + backtest_config.commission_rate)
+    max_positions = backtest_config.max_positions
+
+    queue = []      # (入场日, 行号, 交易)
+    lasts, signal_days = {}, {}
+
+    def push(row: int, available: int) -> None:
+        trade = _next_trade(row, signal_days[row], signals, open_[row], high[row], low[row], close[row],
+                            lasts[row], backtest_config.order_ttl, config, notional, available)
+        if trade is not None:
+            heapq.heappush(queue, (trade[3], row, trade))
+
+    for row in range(close.shape[0]):
+        valid = np.flatnonzero(~np.isnan(close[row, :end]))
+        if not len(valid):
+            continue
+        lasts[row] = int(valid[-1])
+        signal_days[row] = np.flatnonzero(signals.code[row, :lasts[row] + 1])
+        push(row, 0)
+
+    records = []
+    cash = backtest_config.initial_capital
+    holding = []    # (离场日, 离场净收入)
+    while queue:
+        entry, row, trade = heapq.heappop(queue)
+        while holding and holding[0][0] < entry:
+            cash += heapq.heappop(holding)[1]
+        if cash >= cost and (max_positions is None or len(holding) < max_positions):
+            records.append(trade)
+            cash -= cost
+            proceeds = trade[10] * trade[8] * (1 - backtest_config.commission_rate)
+            heapq.heappush(holding, (trade[7], proceeds))
+            push(row, trade[7] + 1)
+        else:
+            push(row, entry)
+    return records
+
+
+def _next_trade(
+    row: int,
+    signal_days: np.ndarray,
+    signals: SignalPanel,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    last: int,
+    order_ttl: int,
+    config: StrategyConfig,
+    notional: float,
+    available: int
+) -> Optional[tuple]:
+    """
+    找出单只股票在 available 日及之后的信号产生的第一笔成交
+
+    Returns:
+        (row, code, signal, entry, entry_price, stop, target, exit, exit_price, reason, shares)，无成交时为 None
+    """
+    for i in range(int(np.searchsorted(signal_days, available)), len(signal_days)):
+        day = signal_days[i]
+        limit = signals.limit_price[row, day]
+        # 订单从信号次日起生效，直到过期或下一个信号（新鲜原则）出现的当日收盘
+        next_signal = signal_days[i + 1] if i + 1 < len(signal_days) else last
+        expire = min(day + order_ttl, next_signal, last)
+        fills = np.flatnonzero(low[day + 1:expire + 1] <= limit)
+        if not len(fills):
+            continue
+        entry = day + 1 + int(fills[0])
+        entry_price = open_[entry] if open_[entry] <= limit else limit
+        stop = entry_price * (1 - config.stop_loss_pct)
+        target = entry_price + config.risk_reward_ratio * (entry_price - stop)
+
+        stop_hit = low[entry + 1:last + 1] <= stop
+        target_hit = high[entry + 1:last + 1] >= target
+        exits = np.flatnonzero(stop_hit | target_hit)
+        if len(exits):
+            offset = int(exits[0])
+            exit_day = entry + 1 + offset
+            if stop_hit[offset]:
+                exit_price, reason = (open_[exit_day] if open_[exit_day] < stop else stop), 'stop'
+            else:
+                exit_price, reason = (open_[exit_day] if open_[exit_day] > target else target), 'target'
+        else:
+            exit_day, exit_price, reason = last, close[last], 'end'
+
+        return (row, int(signals.code[row, day]), day, entry, entry_price, stop, target,
+                exit_day, exit_price, reason, notional / entry_price)
+    return None
+
+
+def resolve_date_range(panel: OHLCVPanel, backtest_config: BacktestConfig) -> tuple:
+    """回测区间对应的日期下标 [start, end)"""
+    start = 0
+    end = len(panel.dates)
+    if backtest_config.start_date:
+        start = int(np.searchsorted(panel.dates, np.datetime64(backtest_config.start_date), side='left'))
+    if backtest_config.end_date:
+        end = int(np.searchsorted(panel.dates, np.datetime64(backtest_config.end_date), side='right'))
+    return start, end
@@ -0,0 +1,174 @@
+"""
+滚动前推（walk-forward）优化模块
+
+把历史划分为若干 (训练窗口, 测试窗口)，在每个训练窗口上选出最优参数，在紧随其后的测试窗口上做样本外评估，
+各测试窗口的权益拼接为样本外权益曲线。
+
+每组参数的指标与信号只在整段历史上计算一次（滚动窗口的状态自然跨越各折延续，
+不会在每折开头重新预热），再在各折的训练 / 测试窗口上分别独立撮合：
+每个窗口从初始资金、空仓开始，只处理窗口内的信号，窗口结束时仍持仓的按窗口内最后收盘价平仓，
+训练窗口的持仓与资金占用不会带入测试窗口。
+"""
+import dataclasses
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import BacktestConfig, StrategyConfig
+from ..data.panel_store import OHLCVPanel
+from ..utils import logging
+from .metrics import compute_metrics
+from .sweep import indicators_for, map_configs
+from .vectorized import compute_signals, resolve_date_range, simulate_signals
+
+logger = logging.get_logger(__name__)
+
+
+class Fold(NamedTuple):
+    """一折的日期下标区间（左闭右开）"""
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+class WalkForwardResult(NamedTuple):
+    """滚动前推结果"""
+    folds: pd.DataFrame         # 每折一行：区间、选中的参数、训练指标与测试指标
+    oos_equity: pd.Series       # 拼接后的样本外权益曲线
+    oos_metrics: Dict[str, float]
+
+
+def make_folds(
+    n_dates: int,
+    train_size: int,
+    test_size: int,
+    start: int = 0,
+    end: Optional[int] = None,
+    anchored: bool = False
+) -> List[Fold]:
+    """
+    生成滚动窗口
+
+    Args:
+        n_dates: 面板日期数
+        train_size: 训练窗口交易日数
+        test_size: 测试窗口交易日数（也是窗口前推步长）
+        start: 第一个训练窗口的起点下标
+        end: 最后一个测试窗口的终点下标（不含），默认 n_dates
+        anchored: True 时训练窗口起点固定为 start（扩展窗口）
+
+    Returns:
+        Fold 列表
+    """
+    end = n_dates if end is None else end
+    folds = []
+    test_start = start + train_size
+    while test_start + test_size <= end:
+        train_start = start if anchored else test_start - train_size
+        folds.append(Fold(train_start, test_start, test_start, test_start + test_size))
+        test_start += test_size
+    return folds
+
+
+def run_walk_forward(
+    panel: OHLCVPanel,
+    configs: List[StrategyConfig],
+    backtest_config: BacktestConfig,
+    train_size: int,
+    test_size: int,
+    metric: str = 'sharpe',
+    anchored: bool = False,
+    market_caps: Optional[np.ndarray] = None,
+    max_workers: Optional[int] = None
+) -> WalkForwardResult:
+    """
+    滚动前推优化
+
+    Args:
+        panel: 行情面板
+        configs: 候选参数组合
+        backtest_config: 回测配置，start_date / end_date 限定滚动范围
+        train_size: 训练窗口交易日数
+        test_size: 测试窗口交易日数
+        metric: 训练窗口上的选优指标（越大越好）
+        anchored: 是否使用扩展训练窗口
+        market_caps: 按 panel.symbols 顺序的市值
+        max_workers: 进程数
+
+    Returns:
+        WalkForwardResult
+    """
+    start, end = resolve_date_range(panel, backtest_config)
+    folds = make_folds(len(panel.dates), train_size, test_size, start, end, anchored)
+    if not folds:
+        raise ValueError(f"区间内交易日不足一折: 需要 {train_size + test_size}，实际 {end - start}")
+
+    rows = map_configs(panel, configs, evaluate_folds,
+                       (backtest_config, market_caps, folds), max_workers)
+
+    fold_rows = []
+    returns = []
+    trade_returns = []
+    capital = backtest_config.initial_capital
+    for i, fold in enumerate(folds):
+        best = max(rows, key=lambda r: _score(r['train'][i][metric]))
+        test_metrics, test_equity, test_trade_returns = best['test'][i]
+        fold_rows.append({
+            'fold': i,
+            'train_start': pd.Timestamp(panel.dates[fold.train_start]),
+            'train_end': pd.Timestamp(panel.dates[fold.train_end - 1]),
+            'test_start': pd.Timestamp(panel.dates[fold.test_start]),
+            'test_end': pd.Timestamp(panel.dates[fold.test_end - 1]),
+            **dataclasses.asdict(best['config']),
+            f'train_{metric}': best['train'][i][metric],
+            **{f'test_{k}': v for k, v in test_metrics.items()},
+        })
+        # 每个测试窗口都从初始资金起算，拼接时只取日收益率
+        returns.append(np.diff(test_equity, prepend=capital) / np.r_[capital, test_equity[:-1]])
+        trade_returns.append(test_trade_returns)
+
+    oos_dates = np.concatenate([panel.dates[f.test_start:f.test_end] for f in folds])
+    oos_equity = pd.Series(capital * np.cumprod(1 + np.concatenate(returns)),
+                           index=pd.DatetimeIndex(oos_dates, name='date'), name='equity')
+    oos_metrics = compute_metrics(pd.DataFrame({'return': np.concatenate(trade_returns)}), oos_equity)
+    logger.info(f"滚动前推完成: {len(folds)} 折, {len(configs)} 组参数, "
+                f"样本外总收益 {oos_metrics['total_return']:.2%}, 夏普 {oos_metrics['sharpe']:.2f}")
+    return WalkForwardResult(pd.DataFrame(fold_rows), oos_equity, oos_metrics)
+
+
+def evaluate_folds(
+    panel: OHLCVPanel,
+    arrays: Dict[str, np.ndarray],
+    configs: List[StrategyConfig],
+    backtest_config: BacktestConfig,
+    market_caps: Optional[np.ndarray],
+    folds: List[Fold]
+) -> List[Dict[str, Any]]:
+    """
+    每组参数在全历史上计算一次信号，再在各折的训练 / 测试窗口上独立撮合
+
+    Returns:
+        每组参数一项：{'config', 'train': [训练指标], 'test': [(测试指标, 测试权益, 测试交易收益率)]}
+    """
+    rows = []
+    for config in configs:
+        signals = compute_signals(panel, indicators_for(arrays, config), config,
+                                  backtest_config.signal_types, market_caps)
+
+        def window(start: int, end: int):
+            return simulate_signals(panel, signals, config, backtest_config, (start, end))
+
+        tests = [window(f.test_start, f.test_end) for f in folds]
+        rows.append({
+            'config': config,
+            'train': [window(f.train_start, f.train_end).metrics for f in folds],
+            'test': [(r.metrics, r.equity.to_numpy(), r.trades['return'].to_numpy()) for r in tests],
+        })
+    return rows
+
+
+def _score(value: float) -> float:
+    """选优分值，NaN（如无交易时的夏普）排在最后"""
+    return -np.inf if np.isnan(value) else value
@@ -4,7 +4,7 @@
 import pathlib
 import tomllib
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 def load_config(config_path: pathlib.Path) -> Dict[str, Any]:
@@ -34,12 +34,51 @@ def validate_config(config: Dict[str, Any]) -> bool:
 
 def get_monitor_config(config: Dict[str, Any]) -> 'MonitorConfig':
     """获取监控配置"""
-    pass
+    monitor_config = config.get('monitor', {})
+    # 设置默认值
+    return MonitorConfig(
+        interval=monitor_config.get('interval', 10),
+        stocks=monitor_config.get('stocks', []),
+        batch_size=monitor_config.get('batch_size', 500),
+        max_concurrency=monitor_config.get('max_concurrency', 4),
+        queue_size=monitor_config.get('queue_size', 8)
+    )
 
 
 def get_strategy_config(config: Dict[str, Any]) -> 'StrategyConfig':
     """获取策略配置"""
-    pass
+    strategy_config = config.get('strategy', {})
+    # 设置默认值
+    return StrategyConfig(
+        ma_period=strategy_config.get('ma_period', 120),
+        bollinger_period=strategy_config.get('bollinger_period', 20),
+        bollinger_std=strategy_config.get('bollinger_std', 2.0),
+        threshold_large_cap=strategy_config.get('threshold_large_cap', 0.08),
+        threshold_small_cap=strategy_config.get('threshold_small_cap', 0.20),
+        large_cap_market_cap=strategy_config.get('large_cap_market_cap', 3.0e11),
+        risk_reward_ratio=strategy_config.get('risk_reward_ratio', 5.0),
+        stop_loss_pct=strategy_config.get('stop_loss_pct', 0.20)
+    )
+
+
+def get_backtest_config(config: Dict[str, Any]) -> 'BacktestConfig':
+    """获取回测配置"""
+    backtest_config = config.get('backtest', {})
+    # 设置默认值
+    btc = BacktestConfig(
+        start_date=backtest_config.get('start_date') or None,
+        end_date=backtest_config.get('end_date') or None,
+        signal_types=list(backtest_config.get('signal_types', ['yang_bao_yin', 'break_high'])),
+        order_ttl=backtest_config.get('order_ttl', 5),
+        initial_capital=backtest_config.get('initial_capital', 1000000.0),
+        position_size=backtest_config.get('position_size', 0.05),
+        commission_rate=backtest_config.get('commission_rate', 0.0),
+        max_positions=backtest_config.get('max_positions') or None,
+        universe_index=backtest_config.get('universe_index') or None,
+        output_dir=backtest_config.get('output_dir', 'data/backtest')
+    )
+    btc.output_dir = pathlib.Path(__file__).resolve().parent.parent / btc.output_dir
+    return btc
 
 
 def get_feishu_config(config: Dict[str, Any]) -> 'FeishuConfig':
@@ -56,9 +95,21 @@ def get_storage_config(config: Dict[str, Any]) -> 'StorageConfig':
     stc = StorageConfig(
         db_path=storage_config.get('db_path', 'data/stocks.db'),
         enable_history=storage_config.get('enable_history', True),
-        history_days=storage_config.get('history_days', 365)
+        history_days=storage_config.get('history_days', 365),
+        panel_dir=storage_config.get('panel_dir', 'data/panel'),
+        write_chunk_size=storage_config.get('write_chunk_size', 5000),
+        journal_mode=storage_config.get('journal_mode', 'wal'),
+        synchronous=storage_config.get('synchronous', 'normal'),
+        cache_size=storage_config.get('cache_size', -65536),
+        mmap_size=storage_config.get('mmap_size', 268435456),
+        busy_timeout=storage_config.get('busy_timeout', 5000),
+        history_cache_size=storage_config.get('history_cache_size', 1024),
+        universe_dir=storage_config.get('universe_dir', 'data/universe'),
+        universe_ttl_hours=storage_config.get('universe_ttl_hours', 24.0)
     )
     stc.db_path = pathlib.Path(__file__).resolve().parent.parent / stc.db_path
+    stc.panel_dir = pathlib.Path(__file__).resolve().parent.parent / stc.panel_dir
+    stc.universe_dir = pathlib.Path(__file__).resolve().parent.parent / stc.universe_dir
     return stc
 
 
@@ -68,6 +119,8 @@ class MonitorConfig:
     interval: int
     stocks: List[str]
     batch_size: int
+    max_concurrency: int = 4    # 同时进行的批次请求数
+    queue_size: int = 8         # 行情队列容量（满时暂停拉取，形成背压）
 
 
 @dataclass
@@ -80,6 +133,22 @@ class StrategyConfig:
     threshold_small_cap: float  # 小盘股偏离阈值（20%）
     large_cap_market_cap: float # 大盘股市值阈值（3000亿USD）
     risk_reward_ratio: float    # 目标盈亏比
+    stop_loss_pct: float = 0.20 # 止损幅度（入场价下方 20%）
+
+
+@dataclass
+class BacktestConfig:
+    """回测配置数据类"""
+    start_date: Optional[str] = None    # 回测区间（YYYY-MM-DD），为空表示面板全部日期
+    end_date: Optional[str] = None
+    signal_types: List[str] = field(default_factory=lambda: ['yang_bao_yin', 'break_high'])
+    order_ttl: int = 5                  # 限价单在信号后保持有效的交易日数
+    initial_capital: float = 1000000.0  # 初始资金（USD）
+    position_size: float = 0.05         # 每笔交易占初始资金的比例
+    commission_rate: float = 0.0        # 单边佣金费率（成交额比例），买入与卖出各收一次
+    max_positions: Optional[int] = None  # 同时持仓数上限，为空时只受可用资金约束
+    universe_index: Optional[str] = None  # 只在股票当日属于该指数成分股时交易，为空表示不限
+    output_dir: str = 'data/backtest'   # 交易明细与权益曲线输出目录
 
 
 @dataclass
@@ -95,3 +164,14 @@ class StorageConfig:
     db_path: str
     enable_history: bool
     history_days: int
+    panel_dir: str = 'data/panel'  # 列式行情面板（内存映射）目录
+    write_chunk_size: int = 5000   # 批量写入日线时每个事务的行数
+    # SQLite 性能参数（每个连接建立时以 PRAGMA 设置）
+    journal_mode: str = 'wal'      # WAL 模式下读写互不阻塞
+    synchronous: str = 'normal'    # WAL 下 normal 即可保证一致性
+    cache_size: int = -65536       # 页缓存，负数表示 KiB（64MiB）
+    mmap_size: int = 268435456     # 内存映射读取上限（字节）
+    busy_timeout: int = 5000       # 遇到锁时的等待时间（毫秒）
+    history_cache_size: int = 1024 # 历史数据读缓存的条目数上限（0 表示关闭）
+    universe_dir: str = 'data/universe'  # 指数成分股快照目录
+    universe_ttl_hours: float = 24.0     # 成分股快照有效期（小时），过期后台刷新
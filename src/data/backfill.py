@@ -0,0 +1,175 @@
+"""
+日线缺口回补规划模块
+
+用一次查询取出区间内 StockData 已有的 (symbol, date)，与 NYSE 交易日历比对，
+找出每只股票缺失的交易日，把连续缺失合并为日期区间，
+再把缺失区间完全相同的股票合并为同一个下载请求。
+
+请求后数据源没有返回数据的区间记录在 BackfillAttempt 中（未上市、已退市），
+之后规划时视为已处理，不再每次重复请求。
+"""
+import datetime as dt
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from ..utils import logging
+from ..utils.time import get_calendar
+from .db_models import database, BackfillAttempt, StockData
+
+logger = logging.get_logger(__name__)
+
+# 区间结束后至少经过该天数才尝试过的记录才生效：当日数据可能尚未发布，需要之后重试
+ATTEMPT_SETTLE_DAYS = 3
+
+
+class BackfillRequest(NamedTuple):
+    """回补下载请求：symbols 在 [start, end]（含两端）内的交易日全部缺失"""
+    start: dt.date
+    end: dt.date
+    symbols: List[str]
+
+
+def get_sessions(start_date: dt.date, end_date: dt.date) -> np.ndarray:
+    """获取 [start_date, end_date] 内的 NYSE 交易日，datetime64[D] 升序数组"""
+    return get_calendar('US').sessions_in_range(start_date, end_date)
+
+
+def find_missing_sessions(
+    symbols: List[str],
+    start_date: dt.date,
+    end_date: dt.date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算每只股票缺失的交易日
+
+    Args:
+        symbols: 股票代码
+        start_date: 开始日期（含）
+        end_date: 结束日期（含）
+
+    Returns:
+        (sessions, missing)：交易日数组与形状 (len(symbols), len(sessions)) 的缺失掩码，
+        已尝试过且确认无数据的交易日不计为缺失
+    """
+    sessions = get_sessions(start_date, end_date)
+    missing = np.ones((len(symbols), len(sessions)), dtype=bool)
+    if not len(sessions) or not symbols:
+        return sessions, missing
+
+    table = StockData._meta.table_name
+    rows = database.execute_sql(
+        f"SELECT symbol, date FROM {table} WHERE date >= ? AND date <= ?",
+        (str(sessions[0]), str(sessions[-1]))
+    ).fetchall()
+
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    _mask_attempted(missing, sessions, index)
+    if not rows:
+        return sessions, missing
+
+    stored_symbols, stored_dates = zip(*rows)
+    symbol_idx = np.fromiter((index.get(s, -1) for s in stored_symbols), dtype=np.intp, count=len(rows))
+    dates = np.array(stored_dates, dtype='datetime64[D]')
+    date_idx = np.searchsorted(sessions, dates)
+
+    # 只保留请求的股票、且日期恰为交易日的记录
+    date_idx_clipped = np.minimum(date_idx, len(sessions) - 1)
+    keep = (symbol_idx >= 0) & (sessions[date_idx_clipped] == dates)
+    missing[symbol_idx[keep], date_idx_clipped[keep]] = False
+    return sessions, missing
+
+
+def _mask_attempted(missing: np.ndarray, sessions: np.ndarray, index: Dict[str, int]) -> None:
+    """把已尝试过且确认无数据的区间从缺失掩码中去掉（原地修改）"""
+    table = BackfillAttempt._meta.table_name
+    rows = database.execute_sql(
+        f"SELECT symbol, start_date, end_date FROM {table} "
+        f"WHERE end_date >= ? AND start_date <= ? AND attempted_at >= date(end_date, ?)",
+        (str(sessions[0]), str(sessions[-1]), f'+{ATTEMPT_SETTLE_DAYS} days')
+    ).fetchall()
+    for symbol, start, end in rows:
+        row = index.get(symbol)
+        if row is None:
+            continue
+        lo = np.searchsorted(sessions, np.datetime64(start, 'D'), side='left')
+        hi = np.searchsorted(sessions, np.datetime64(end, 'D'), side='right')
+        missing[row, lo:hi] = False
+
+
+def record_attempts(
+    symbols: List[str],
+    start_date: dt.date,
+    end_date: dt.date,
+    attempted_at: dt.date = None
+) -> int:
+    """
+    记录请求过但没有返回数据的区间
+
+    Args:
+        symbols: 没有返回数据的股票
+        start_date: 请求的开始日期（含）
+        end_date: 请求的结束日期（含）
+        attempted_at: 请求日期，默认今天
+
+    Returns:
+        写入的记录数
+    """
+    if not symbols:
+        return 0
+    attempted_at = attempted_at or dt.date.today()
+    table = BackfillAttempt._meta.table_name
+    with database.atomic():
+        database.cursor().executemany(
+            f"INSERT OR REPLACE INTO {table} (symbol, start_date, end_date, attempted_at) VALUES (?, ?, ?, ?)",
+            [(symbol, start_date.isoformat(), end_date.isoformat(), attempted_at.isoformat()) for symbol in symbols]
+        )
+    return len(symbols)
+
+
+def plan_backfill(
+    symbols: List[str],
+    start_date: dt.date,
+    end_date: dt.date,
+    batch_size: int = 20
+) -> List[BackfillRequest]:
+    """
+    规划回补请求：每个请求只覆盖缺失的交易日
+
+    Args:
+        symbols: 股票代码
+        start_date: 开始日期（含）
+        end_date: 结束日期（含）
+        batch_size: 单个请求最多包含的股票数
+
+    Returns:
+        按开始日期排序的回补请求列表
+    """
+    sessions, missing = find_missing_sessions(symbols, start_date, end_date)
+    if not missing.any():
+        logger.info("区间内无缺失数据，无需回补")
+        return []
+
+    # 每行缺失段的起止位置：差分后 +1 为段起点，-1 为段终点（开区间）
+    padded = np.zeros((missing.shape[0], missing.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = missing
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+
+    groups: Dict[tuple, List[str]] = {}
+    for row, start, end in zip(rows, starts, ends):
+        groups.setdefault((start, end - 1), []).append(symbols[row])
+
+    requests = []
+    for (start, end), group in sorted(groups.items()):
+        for i in range(0, len(group), batch_size):
+            requests.append(BackfillRequest(
+                start=sessions[start].astype(dt.date),
+                end=sessions[end].astype(dt.date),
+                symbols=group[i:i + batch_size],
+            ))
+
+    logger.info(f"缺失 {int(missing.sum())} 根日线（{len(symbols)} 只股票 × {len(sessions)} 个交易日），"
+                f"规划 {len(requests)} 个回补请求")
+    return requests
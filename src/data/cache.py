@@ -0,0 +1,126 @@
+"""
+历史数据缓存模块
+
+按 (查询类型, 股票, 日期窗口) 缓存历史数据查询结果的 LRU 缓存。
+每个条目登记其涉及的股票，写入某只股票时只失效与之相关的条目。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, NamedTuple, Set, Tuple
+
+
+class CacheStats(NamedTuple):
+    """缓存统计"""
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_entries: int
+
+
+class HistoryCache:
+    """线程安全、按条目数限制大小的 LRU 缓存"""
+
+    def __init__(self, max_entries: int = 1024):
+        """初始化"""
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.keys_by_symbol: Dict[str, Set[Hashable]] = {}
+        self.symbols_by_key: Dict[Hashable, Tuple[str, ...]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        查询缓存
+
+        Returns:
+            (是否命中, 缓存值)
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, symbols: Iterable[str], value: Any) -> None:
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            symbols: 该条目涉及的股票（用于写入失效）
+            value: 缓存值
+        """
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            symbols = tuple(symbols)
+            self.entries[key] = value
+            self.symbols_by_key[key] = symbols
+            for symbol in symbols:
+                self.keys_by_symbol.setdefault(symbol, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate_symbols(self, symbols: Iterable[str]) -> int:
+        """
+        失效涉及指定股票的全部条目
+
+        Returns:
+            失效的条目数
+        """
+        with self.lock:
+            keys = set()
+            for symbol in symbols:
+                keys |= self.keys_by_symbol.get(symbol, set())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def resize(self, max_entries: int) -> None:
+        """调整容量，超出部分按 LRU 淘汰"""
+        with self.lock:
+            self.max_entries = max_entries
+            while len(self.entries) > max(max_entries, 0):
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """清空缓存（统计保留）"""
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_symbol.clear()
+            self.symbols_by_key.clear()
+
+    def stats(self) -> CacheStats:
+        """获取统计信息"""
+        with self.lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                invalidations=self.invalidations,
+                size=len(self.entries),
+                max_entries=self.max_entries,
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        """删除条目及其股票索引（调用方持有锁）"""
+        del self.entries[key]
+        for symbol in self.symbols_by_key.pop(key, ()):
+            keys = self.keys_by_symbol.get(symbol)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys_by_symbol[symbol]
@@ -9,6 +9,9 @@ from datetime import datetime
 # 创建数据库连接
 database = peewee.SqliteDatabase(None)
 
+# 批量写入 created_at 使用的定宽时间格式（微秒恒为 6 位，文本比较与时间顺序一致）
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
 
 class BaseModel(peewee.Model):
     """基础模型类"""
@@ -34,6 +37,74 @@ class StockData(BaseModel):
         )
 
 
+class StockInfoSnapshot(BaseModel):
+    """股票基本信息日快照模型（市值等，每日批量刷新一次）"""
+    symbol = peewee.CharField(max_length=20)
+    date = peewee.DateField()
+    name = peewee.CharField(max_length=200, null=True)
+    market_cap = peewee.FloatField(null=True)
+    sector = peewee.CharField(max_length=100, null=True)
+    industry = peewee.CharField(max_length=100, null=True)
+    created_at = peewee.DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = database
+        indexes = (
+            (('symbol', 'date'), True),
+        )
+
+
+class StockFeatures(BaseModel):
+    """日线衍生特征模型：每根日线一行，由 data.features 在写入日线后增量维护"""
+    symbol = peewee.CharField(max_length=20)
+    date = peewee.DateField()
+    seq = peewee.IntegerField()             # 该股票的第几根日线（从 0 开始）
+    cum_close = peewee.FloatField()         # 收盘价累计和（含当日）
+    cum_close_sq = peewee.FloatField()      # 收盘价平方累计和
+    cum_volume = peewee.FloatField()        # 成交量累计和
+    ma = peewee.FloatField(null=True)       # 收盘价均线（features.FEATURE_MA_PERIOD 日）
+    bb_mean = peewee.FloatField(null=True)  # 布林带中轨（features.FEATURE_BOLLINGER_PERIOD 日）
+    bb_std = peewee.FloatField(null=True)   # 布林带标准差（总体标准差）
+    prev_high = peewee.FloatField(null=True)
+    prev_low = peewee.FloatField(null=True)
+    avg_volume = peewee.FloatField(null=True)  # 平均成交量（features.FEATURE_VOLUME_PERIOD 日）
+
+    class Meta:
+        database = database
+        indexes = (
+            (('symbol', 'date'), True),
+            (('symbol', 'seq'), True),
+        )
+
+
+class IndexMembership(BaseModel):
+    """指数成分股区间模型：symbol 在 [start_date, end_date) 内属于 index，end_date 为空表示至今"""
+    index = peewee.CharField(max_length=20)
+    symbol = peewee.CharField(max_length=20)
+    start_date = peewee.DateField()
+    end_date = peewee.DateField(null=True)
+
+    class Meta:
+        database = database
+        indexes = (
+            (('index', 'symbol', 'start_date'), True),
+        )
+
+
+class BackfillAttempt(BaseModel):
+    """回补尝试记录模型：symbol 在 [start_date, end_date] 内请求过但数据源没有返回数据（未上市、已退市等）"""
+    symbol = peewee.CharField(max_length=20)
+    start_date = peewee.DateField()
+    end_date = peewee.DateField()
+    attempted_at = peewee.DateField()
+
+    class Meta:
+        database = database
+        indexes = (
+            (('symbol', 'start_date', 'end_date'), True),
+        )
+
+
 class SignalRecord(BaseModel):
     """交易信号记录模型"""
     signal_id = peewee.CharField(max_length=50, primary_key=True)
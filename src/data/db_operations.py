@@ -5,30 +5,43 @@
 """
 from datetime import date
 from ..utils import logging
-from typing import Optional, List
+from typing import Optional, List, NamedTuple, Dict, Any
 from datetime import datetime
-from .db_models import database, StockData, SignalRecord, OrderRecord, PositionRecord
+from .db_models import TIMESTAMP_FORMAT, database, StockData, StockInfoSnapshot, StockFeatures, IndexMembership, BackfillAttempt, SignalRecord, OrderRecord, PositionRecord
+from .cache import HistoryCache, CacheStats
 from ..types.common import TradingSignal, Order, Position
+from ..config.settings import StorageConfig
+import numpy as np
 import pandas as pd
+import itertools
+import json
+import time
 import traceback
 
 logger = logging.get_logger(__name__)
 
-def init_database(db_path: str):
+# 历史数据读缓存，写入日线时按股票失效
+history_cache = HistoryCache()
+
+def init_database(db_path: str, pragmas: Optional[Dict[str, Any]] = None):
     """
     初始化数据库并创建表结构
 
+    peewee 为每个线程维护独立连接（首次使用时自动打开），pragmas 在每个新连接建立时生效；
+    WAL 模式下一个线程的写事务不会阻塞其他线程的读取。
+
     Args:
         db_path: 数据库文件路径
+        pragmas: 连接参数，见 build_sqlite_pragmas
     """
     try:
-        database.init(db_path)
-        database.create_tables([StockData, SignalRecord, OrderRecord, PositionRecord])
+        database.init(db_path, pragmas=pragmas or {})
+        database.create_tables([StockData, StockInfoSnapshot, StockFeatures, IndexMembership, BackfillAttempt, SignalRecord, OrderRecord, PositionRecord])
         logger.info(f"数据库初始化成功: {db_path}")
 
         # 打印表结构信息
         logger.info("数据库表:")
-        for model_class in [StockData, SignalRecord, OrderRecord, PositionRecord]:
+        for model_class in [StockData, StockInfoSnapshot, StockFeatures, IndexMembership, BackfillAttempt, SignalRecord, OrderRecord, PositionRecord]:
             logger.info(f"  - {model_class.__name__}")
 
     except Exception as e:
@@ -36,18 +49,77 @@ def init_database(db_path: str):
         raise
 
 
+def init_from_config(storage_config: StorageConfig) -> None:
+    """
+    按存储配置初始化数据库（连接参数见 build_sqlite_pragmas）并设置历史数据缓存容量
+
+    各入口（应用主程序、持久化工具）加载配置后都应调用本函数，而不是直接调用 init_database。
+
+    Args:
+        storage_config: 存储配置
+    """
+    init_database(storage_config.db_path, build_sqlite_pragmas(storage_config))
+    history_cache.resize(storage_config.history_cache_size)
+
+
+def build_sqlite_pragmas(storage_config: StorageConfig) -> Dict[str, Any]:
+    """
+    由存储配置生成 SQLite PRAGMA
+
+    Args:
+        storage_config: 存储配置
+
+    Returns:
+        pragmas 字典
+    """
+    return {
+        'journal_mode': storage_config.journal_mode,
+        'synchronous': storage_config.synchronous,
+        'cache_size': storage_config.cache_size,
+        'mmap_size': storage_config.mmap_size,
+        'busy_timeout': storage_config.busy_timeout,
+    }
+
+
 # ==================== 股票数据操作 ====================
 
+# 批量写入时每个事务的默认行数
+DEFAULT_WRITE_CHUNK_SIZE = 5000
+
+STOCK_COLUMNS = ['symbol', 'date', 'open', 'high', 'low', 'close', 'volume']
+
+
+# 判断价格是否变化的相对容差（忽略数据源重复下载时的末位浮动）
+PRICE_RTOL = 1e-9
+
+
+class WriteResult(NamedTuple):
+    """批量写入统计"""
+    rows: int             # 提交写入的行数
+    affected: int         # 实际插入/替换的行数
+    seconds: float
+    rows_per_sec: float
+
+
+class UpsertResult(NamedTuple):
+    """变更检测写入统计"""
+    inserted: int
+    updated: int
+    unchanged: int
+
+
 def save_stocks_data(
     data: pd.DataFrame,
     overwrite: bool = False,
+    chunk_size: int = DEFAULT_WRITE_CHUNK_SIZE,
 ) -> bool:
     """
     批量保存股票的历史日线数据（多日）
 
     Args:
         data: DataFrame, 必须包含 symbol, date, open, high, low, close, volume 列
-        overwrite: True = 覆盖重复的记录；False = 只插入不存在的记录
+        overwrite: True = 更新值有变化的已有记录（见 upsert_stocks_data）；False = 只插入不存在的记录
+        chunk_size: 每个事务写入的行数
 
     Returns:
         bool: 是否成功
@@ -57,41 +129,22 @@ def save_stocks_data(
         return True
 
     try:
-        data = data.rename(columns=str.lower)
-
-        # 字段检查
-        required = ['symbol', 'date', 'open', 'high', 'low', 'close', 'volume']
-        missing = [col for col in required if col not in data.columns]
-        if missing:
-            raise ValueError(f"缺少必要字段: {missing}")
-
-        insert_df = data[required].copy()
+        insert_df = _prepare_stock_frame(data)
 
-        # 数据清洗：过滤掉关键字段为 NaN 的行
-        insert_df = insert_df.dropna(subset=['open', 'high', 'low', 'close'])
-        insert_df['volume'] = insert_df['volume'].fillna(0).astype('int64')
-        insert_df['date'] = insert_df['date'].dt.date
-        insert_df['created_at'] = datetime.now()
-
-
-        records = insert_df.to_dict('records')
-
-        if not records:
+        if insert_df.empty:
             logger.info(f"过滤后无有效数据")
             return True
 
-        with StockData._meta.database.atomic():
-            if overwrite:
-                # 覆盖模式：冲突时替换整个记录
-                query = StockData.insert_many(records)
-                saved_count = query.on_conflict_replace().execute()
-            else:
-                # 增量模式：只插入不存在的记录
-                query = StockData.insert_many(records)
-                saved_count = query.on_conflict_ignore().execute()
+        if overwrite:
+            upserted = upsert_stocks_data(insert_df, chunk_size=chunk_size)
+            logger.info(f"保存 {len(insert_df)} 条数据成功，新增 {upserted.inserted}，"
+                        f"更新 {upserted.updated}，未变化 {upserted.unchanged}")
+            return True
 
+        result = bulk_write_stocks_data(insert_df, overwrite=False, chunk_size=chunk_size)
 
-        logger.info(f"保存 {len(records)} 条数据成功，影响记录数：{saved_count}")
+        logger.info(f"保存 {result.rows} 条数据成功，影响记录数：{result.affected}，"
+                    f"耗时 {result.seconds:.2f}s（{result.rows_per_sec:.0f} 行/秒）")
         return True
 
     except Exception as e:
@@ -99,6 +152,164 @@ def save_stocks_data(
         return False
 
 
+def bulk_write_stocks_data(
+    data: pd.DataFrame,
+    overwrite: bool = False,
+    chunk_size: int = DEFAULT_WRITE_CHUNK_SIZE,
+) -> WriteResult:
+    """
+    绕过 ORM 批量写入日线：列数组按块切片后组成参数元组，用 executemany 写入，每块一个事务
+
+    除输入列数组外，额外内存只与 chunk_size 成正比。
+
+    Args:
+        data: 已清洗的 DataFrame（见 _prepare_stock_frame）
+        overwrite: True = INSERT OR REPLACE；False = INSERT OR IGNORE
+        chunk_size: 每个事务写入的行数
+
+    Returns:
+        WriteResult
+    """
+    table = StockData._meta.table_name
+    verb = 'INSERT OR REPLACE' if overwrite else 'INSERT OR IGNORE'
+    sql = (f"{verb} INTO {table} (symbol, date, open, high, low, close, volume, created_at) "
+           f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+    started = time.perf_counter()
+    affected = _executemany_in_chunks(sql, data, chunk_size, key_first=True)
+    seconds = time.perf_counter() - started
+    return WriteResult(
+        rows=len(data),
+        affected=affected,
+        seconds=seconds,
+        rows_per_sec=len(data) / seconds if seconds > 0 else float('inf'),
+    )
+
+
+def upsert_stocks_data(
+    data: pd.DataFrame,
+    chunk_size: int = DEFAULT_WRITE_CHUNK_SIZE,
+) -> UpsertResult:
+    """
+    变更检测式写入：与库中已有日线向量化比较，只插入新记录、只更新值确有变化的记录
+
+    已有且未变化的记录不会被改写（created_at 也保持不变）。
+
+    Args:
+        data: 已清洗的 DataFrame（见 _prepare_stock_frame）
+        chunk_size: 每个事务写入的行数
+
+    Returns:
+        UpsertResult
+    """
+    stored = _load_stored_bars(data)
+    merged = data.merge(stored, on=['symbol', 'date'], how='left', suffixes=('', '_stored'))
+
+    is_new = merged['close_stored'].isna().to_numpy()
+    changed = np.zeros(len(merged), dtype=bool)
+    for col in ('open', 'high', 'low', 'close'):
+        changed |= ~np.isclose(merged[col].to_numpy(dtype='float64'),
+                               merged[f'{col}_stored'].to_numpy(dtype='float64'),
+                               rtol=PRICE_RTOL, atol=0.0)
+    changed |= merged['volume'].to_numpy(dtype='float64') != merged['volume_stored'].to_numpy(dtype='float64')
+    changed &= ~is_new
+
+    inserted = updated = 0
+    if is_new.any():
+        inserted = bulk_write_stocks_data(data[is_new], overwrite=False, chunk_size=chunk_size).affected
+    if changed.any():
+        table = StockData._meta.table_name
+        sql = (f"UPDATE {table} SET open = ?, high = ?, low = ?, close = ?, volume = ?, created_at = ? "
+               f"WHERE symbol = ? AND date = ?")
+        updated = _executemany_in_chunks(sql, data[changed], chunk_size, key_first=False)
+
+    return UpsertResult(
+        inserted=inserted,
+        updated=updated,
+        unchanged=int(len(data) - is_new.sum() - changed.sum()),
+    )
+
+
+def _load_stored_bars(data: pd.DataFrame) -> pd.DataFrame:
+    """一次查询取出与 data 相同股票、相同日期区间内已存储的日线"""
+    return _query_history_frame(
+        data['symbol'].unique().tolist(),
+        start_date=data['date'].min().date(),
+        end_date=data['date'].max().date(),
+    )
+
+
+def _executemany_in_chunks(
+    sql: str,
+    data: pd.DataFrame,
+    chunk_size: int,
+    key_first: bool
+) -> int:
+    """
+    按块执行 executemany，每块一个事务
+
+    Args:
+        sql: 带占位符的语句
+        data: 已清洗的 DataFrame
+        chunk_size: 每块行数
+        key_first: True 参数顺序为 (symbol, date, OHLCV, created_at)；
+                   False 为 (OHLCV, created_at, symbol, date)，供 UPDATE ... WHERE 使用
+
+    Returns:
+        受影响的行数
+    """
+    symbols = data['symbol'].to_numpy(dtype=object)
+    dates = data['date'].to_numpy(dtype='datetime64[D]')
+    prices = [data[col].to_numpy(dtype='float64') for col in ('open', 'high', 'low', 'close')]
+    volumes = data['volume'].to_numpy(dtype='int64')
+    created_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+
+    total = len(data)
+    affected = 0
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        keys = [symbols[start:stop].tolist(), np.datetime_as_string(dates[start:stop], unit='D').tolist()]
+        values = [
+            *(col[start:stop].tolist() for col in prices),
+            volumes[start:stop].tolist(),
+            itertools.repeat(created_at, stop - start),
+        ]
+        params = zip(*keys, *values) if key_first else zip(*values, *keys)
+        try:
+            with database.atomic():
+                cursor = database.cursor()
+                cursor.executemany(sql, params)
+                affected += max(cursor.rowcount, 0)
+        finally:
+            history_cache.invalidate_symbols(set(keys[0]))
+    return affected
+
+
+def _prepare_stock_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    日线数据清洗：统一小写列名、检查字段、过滤关键字段为 NaN 的行
+
+    Raises:
+        ValueError: 缺少必要字段
+    """
+    data = data.rename(columns=str.lower)
+
+    # 字段检查
+    missing = [col for col in STOCK_COLUMNS if col not in data.columns]
+    if missing:
+        raise ValueError(f"缺少必要字段: {missing}")
+
+    # 数据清洗：过滤掉关键字段为 NaN 的行
+    insert_df = data[STOCK_COLUMNS].dropna(subset=['open', 'high', 'low', 'close'])
+    dates = pd.to_datetime(insert_df['date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return insert_df.assign(
+        date=dates,
+        volume=insert_df['volume'].fillna(0).astype('int64'),
+    )
+
+
 def get_stock_history_data(
     symbol: str,
     start_date: Optional[date] = None,
@@ -113,29 +324,163 @@ def get_stock_history_data(
         end_date: 结束日期
 
     Returns:
-        DataFrame 包含历史数据
+        StockData 列表（按日期降序）；每次调用返回新对象，修改它们不会影响缓存
     """
-    try:
-        query = StockData.select().where(
-            (StockData.symbol == symbol) &
-            (StockData.date >= start_date) if start_date else True &
-            (StockData.date <= end_date) if end_date else True
-        ).order_by(StockData.date.desc())
+    key = ('history', symbol, start_date, end_date)
+    found, rows = history_cache.get(key)
+    if found:
+        return _to_stock_records(rows)
 
-        records = list(query)
-
-        if not records:
+    try:
+        condition = StockData.symbol == symbol
+        if start_date:
+            condition &= StockData.date >= start_date
+        if end_date:
+            condition &= StockData.date <= end_date
+        query = StockData.select().where(condition).order_by(StockData.date.desc())
+
+        # 缓存不可变的行元组，而不是可被调用方修改的模型对象
+        rows = tuple(query.tuples())
+        history_cache.put(key, (symbol,), rows)
+
+        if not rows:
             logger.warning(f"未找到 {symbol} 的历史数据")
             return []
 
-        logger.info(f"查询到 {symbol} {len(records)} 条记录")
-        return records
+        logger.info(f"查询到 {symbol} {len(rows)} 条记录")
+        return _to_stock_records(rows)
 
     except Exception as e:
         logger.error(f"获取 {symbol} 数据失败: {traceback.format_exc()}")
         return []
 
 
+def _to_stock_records(rows: tuple) -> List[StockData]:
+    """由缓存的行元组（字段顺序同 StockData._meta.sorted_field_names）构造新的 StockData 对象"""
+    names = StockData._meta.sorted_field_names
+    records = []
+    for row in rows:
+        record = StockData(__no_default__=1, **dict(zip(names, row)))
+        record._dirty.clear()
+        records.append(record)
+    return records
+
+
+def get_stocks_history_frame(
+    symbols: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    pivot: bool = False
+) -> pd.DataFrame:
+    """
+    批量获取多只股票的历史数据（单次查询，不创建模型对象）
+
+    股票列表以一个 JSON 参数传入（json_each），不受 SQLite 参数个数限制；
+    结果经原始游标读出后按列转换为 NumPy 数组。
+
+    Args:
+        symbols: 股票代码列表
+        start_date: 开始日期（含）
+        end_date: 结束日期（含）
+        pivot: False 返回长表；True 返回按日期对齐的宽表，列为 (字段, 股票) 二级索引
+
+    Returns:
+        DataFrame，长表按 symbol、date 升序
+    """
+    key = ('frame', tuple(symbols), start_date, end_date, pivot)
+    found, frame = history_cache.get(key)
+    if found:
+        # pandas 写时复制：浅拷贝即可隔离调用方的修改
+        return frame.copy(deep=False)
+
+    frame = _query_history_frame(symbols, start_date, end_date)
+    if pivot:
+        frame = frame.pivot(index='date', columns='symbol', values=STOCK_COLUMNS[2:])
+    history_cache.put(key, symbols, frame)
+    return frame.copy(deep=False)
+
+
+def _query_history_frame(
+    symbols: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> pd.DataFrame:
+    """单次查询多只股票的历史日线（不经过缓存），返回按 symbol、date 升序的长表"""
+    table = StockData._meta.table_name
+    sql = (f"SELECT symbol, date, open, high, low, close, volume FROM {table} "
+           f"WHERE symbol IN (SELECT value FROM json_each(?))")
+    params = [json.dumps(list(symbols))]
+    if start_date:
+        sql += " AND date >= ?"
+        params.append(start_date.strftime('%Y-%m-%d'))
+    if end_date:
+        sql += " AND date <= ?"
+        params.append(end_date.strftime('%Y-%m-%d'))
+    sql += " ORDER BY symbol, date"
+
+    rows = database.execute_sql(sql, params).fetchall()
+    columns = list(zip(*rows)) if rows else [()] * len(STOCK_COLUMNS)
+    frame = pd.DataFrame({
+        'symbol': np.array(columns[0], dtype=object),
+        'date': np.array(columns[1], dtype='datetime64[D]').astype('datetime64[ns]'),
+        'open': np.array(columns[2], dtype=np.float64),
+        'high': np.array(columns[3], dtype=np.float64),
+        'low': np.array(columns[4], dtype=np.float64),
+        'close': np.array(columns[5], dtype=np.float64),
+        'volume': np.array(columns[6], dtype=np.int64),
+    })
+    return frame
+
+
+def get_ma_distance_frame(
+    symbols: List[str],
+    ma_period: int,
+    as_of: Optional[date] = None
+) -> pd.DataFrame:
+    """
+    在 SQLite 中用窗口函数计算每只股票最新收盘价相对 N 日均线的偏离（不加载历史数据）
+
+    每只股票取截至 as_of 的最近 ma_period 条日线（ROW_NUMBER 按日期倒序编号），
+    与 screening.check_composite 的口径一致：按交易记录计数，不足 ma_period 条的股票 n_bars 小于周期。
+
+    Args:
+        symbols: 股票代码列表
+        ma_period: 均线周期
+        as_of: 判断日（含），为空时使用各股票的最新数据
+
+    Returns:
+        以 symbol 为索引，列 date / close / ma / n_bars / distance（close / ma - 1）；无数据的股票不出现
+    """
+    table = StockData._meta.table_name
+    sql = (f"WITH ranked AS ("
+           f"SELECT symbol, date, close, ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) AS rn "
+           f"FROM {table} WHERE symbol IN (SELECT value FROM json_each(?))")
+    params: List[Any] = [json.dumps(list(symbols))]
+    if as_of:
+        sql += " AND date <= ?"
+        params.append(as_of.strftime('%Y-%m-%d'))
+    sql += (") SELECT symbol, MAX(CASE WHEN rn = 1 THEN date END), MAX(CASE WHEN rn = 1 THEN close END), "
+            "AVG(close), COUNT(*) FROM ranked WHERE rn <= ? GROUP BY symbol")
+    params.append(ma_period)
+
+    rows = database.execute_sql(sql, params).fetchall()
+    columns = list(zip(*rows)) if rows else [()] * 5
+    close = np.array(columns[2], dtype=np.float64)
+    ma = np.array(columns[3], dtype=np.float64)
+    return pd.DataFrame({
+        'date': np.array(columns[1], dtype='datetime64[D]').astype('datetime64[ns]'),
+        'close': close,
+        'ma': ma,
+        'n_bars': np.array(columns[4], dtype=np.int64),
+        'distance': close / ma - 1,
+    }, index=pd.Index(np.array(columns[0], dtype=object), name='symbol'))
+
+
+def get_history_cache_stats() -> CacheStats:
+    """获取历史数据缓存的命中/未命中/淘汰/失效统计"""
+    return history_cache.stats()
+
+
 def get_stocks_latest_data(symbols: list[str], date: date) -> List[StockData] | None:
     """
     获取所有股票最新的一条日线数据
@@ -0,0 +1,209 @@
+"""
+日线衍生特征模块
+
+StockFeatures 为每根日线保存收盘价、收盘价平方与成交量的累计和（前缀和），
+任意 N 日均值 = (cum[t] - cum[t-N]) / N，因此写入新日线后只需读取每只股票最近 N 行的累计和
+即可递推出新行，不必重新计算全部历史。表中同时物化常用特征（均线、布林带均值 / 标准差、
+前一日高低点、平均成交量），筛选与信号按 (symbol, date) 索引一次查询即可取得。
+
+写入更早日期的日线（回补缺口、覆盖更新）会使其后的累计和失效，
+update_features 会删除该日期及之后的特征行并从该处重新递推。
+"""
+import datetime as dt
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils import logging
+from .db_models import database, StockData, StockFeatures
+
+logger = logging.get_logger(__name__)
+
+# 物化特征的窗口（与 StrategyConfig 的默认周期一致）
+FEATURE_MA_PERIOD = 120
+FEATURE_BOLLINGER_PERIOD = 20
+FEATURE_VOLUME_PERIOD = 20
+
+FEATURE_COLUMNS = ['ma', 'bb_mean', 'bb_std', 'prev_high', 'prev_low', 'avg_volume']
+STATE_COLUMNS = ['seq', 'cum_close', 'cum_close_sq', 'cum_volume']
+
+# 递推新行时需要回看的已存储行数
+_LOOKBACK = max(FEATURE_MA_PERIOD, FEATURE_BOLLINGER_PERIOD, FEATURE_VOLUME_PERIOD)
+
+
+def earliest_dates(data: pd.DataFrame) -> Dict[str, dt.date]:
+    """
+    每只股票本次写入的最早日期（传给 update_features）
+
+    Args:
+        data: 日线长表，包含 symbol / date 列（大小写不限）
+    """
+    if data is None or data.empty:
+        return {}
+    data = data.rename(columns=str.lower)
+    dates = pd.to_datetime(data['date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    earliest = dates.groupby(data['symbol']).min()
+    return {symbol: ts.date() for symbol, ts in earliest.items()}
+
+
+def update_features(start_dates: Dict[str, dt.date], chunk_size: int = 5000) -> int:
+    """
+    增量更新特征表
+
+    Args:
+        start_dates: symbol -> 本次写入的最早日线日期，该日期及之后的特征会重新递推
+        chunk_size: 每个事务写入的行数
+
+    Returns:
+        写入的特征行数
+    """
+    if not start_dates:
+        return 0
+    table = StockFeatures._meta.table_name
+    with database.atomic():
+        database.cursor().executemany(
+            f"DELETE FROM {table} WHERE symbol = ? AND date >= ?",
+            [(symbol, start.isoformat()) for symbol, start in start_dates.items()]
+        )
+
+    symbols = list(start_dates)
+    tails = _load_tails(symbols)
+    bars = _load_bars(symbols)
+
+    rows = []
+    for symbol, frame in bars.groupby('symbol', sort=False):
+        rows.extend(_extend_symbol(symbol, frame, tails.get(symbol)))
+
+    sql = (f"INSERT INTO {table} (symbol, date, {', '.join(STATE_COLUMNS)}, {', '.join(FEATURE_COLUMNS)}) "
+           f"VALUES ({', '.join('?' * (2 + len(STATE_COLUMNS) + len(FEATURE_COLUMNS)))})")
+    for start in range(0, len(rows), chunk_size):
+        with database.atomic():
+            # SQLite 把 NaN 存为 NULL（窗口未满的特征）
+            database.cursor().executemany(sql, rows[start:start + chunk_size])
+    logger.info(f"特征表更新: {len(start_dates)} 只股票, {len(rows)} 行")
+    return len(rows)
+
+
+def rebuild_features(symbols: List[str]) -> int:
+    """从头重算指定股票的全部特征"""
+    return update_features({symbol: dt.date.min for symbol in symbols})
+
+
+def load_features(symbols: List[str], as_of: Optional[dt.date] = None) -> pd.DataFrame:
+    """
+    读取每只股票截至 as_of 的最新一行特征（按 (symbol, date) 索引逐股定位）
+
+    Args:
+        symbols: 股票代码列表
+        as_of: 判断日（含），为空时取各股票最新一行
+
+    Returns:
+        以 symbol 为索引，列 date + FEATURE_COLUMNS；无特征的股票不出现
+    """
+    table = StockFeatures._meta.table_name
+    condition = "AND date <= ?" if as_of else ""
+    sql = (f"SELECT f.symbol, f.date, {', '.join('f.' + c for c in FEATURE_COLUMNS)} FROM {table} f "
+           f"WHERE f.symbol IN (SELECT value FROM json_each(?)) AND f.date = "
+           f"(SELECT MAX(date) FROM {table} WHERE symbol = f.symbol {condition})")
+    params = [json.dumps(list(symbols))] + ([as_of.isoformat()] if as_of else [])
+    rows = database.execute_sql(sql, params).fetchall()
+    columns = list(zip(*rows)) if rows else [()] * (2 + len(FEATURE_COLUMNS))
+    frame = pd.DataFrame(
+        {name: np.array(values, dtype=np.float64) for name, values in zip(FEATURE_COLUMNS, columns[2:])},
+        index=pd.Index(np.array(columns[0], dtype=object), name='symbol'),
+    )
+    frame.insert(0, 'date', np.array(columns[1], dtype='datetime64[D]').astype('datetime64[ns]'))
+    return frame
+
+
+def _load_tails(symbols: List[str]) -> Dict[str, np.ndarray]:
+    """每只股票已存储的最近 _LOOKBACK 行累计和，返回 symbol -> (date, seq, cum_close, cum_close_sq, cum_volume)"""
+    table = StockFeatures._meta.table_name
+    sql = (f"SELECT symbol, date, {', '.join(STATE_COLUMNS)} FROM ("
+           f"SELECT *, ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY seq DESC) AS rn FROM {table} "
+           f"WHERE symbol IN (SELECT value FROM json_each(?))) WHERE rn <= ? ORDER BY symbol, seq")
+    rows = database.execute_sql(sql, (json.dumps(symbols), _LOOKBACK)).fetchall()
+    tails: Dict[str, list] = {}
+    for symbol, *values in rows:
+        tails.setdefault(symbol, []).append(values)
+    return {symbol: np.array(values, dtype=object) for symbol, values in tails.items()}
+
+
+def _load_bars(symbols: List[str]) -> pd.DataFrame:
+    """读取每只股票最后一行特征当日（提供前一日高低点）及之后的日线；无特征的股票读取全部日线"""
+    data_table = StockData._meta.table_name
+    feature_table = StockFeatures._meta.table_name
+    sql = (f"SELECT s.symbol, s.date, s.high, s.low, s.close, s.volume FROM {data_table} s "
+           f"JOIN json_each(?) j ON s.symbol = j.value "
+           f"WHERE s.date >= COALESCE((SELECT MAX(date) FROM {feature_table} WHERE symbol = s.symbol), '') "
+           f"ORDER BY s.symbol, s.date")
+    rows = database.execute_sql(sql, (json.dumps(symbols),)).fetchall()
+    columns = list(zip(*rows)) if rows else [()] * 6
+    return pd.DataFrame({
+        'symbol': np.array(columns[0], dtype=object),
+        'date': np.array(columns[1], dtype=object),
+        'high': np.array(columns[2], dtype=np.float64),
+        'low': np.array(columns[3], dtype=np.float64),
+        'close': np.array(columns[4], dtype=np.float64),
+        'volume': np.array(columns[5], dtype=np.float64),
+    })
+
+
+def _extend_symbol(symbol: str, bars: pd.DataFrame, tail: Optional[np.ndarray]) -> List[tuple]:
+    """
+    由已存储的累计和尾部递推一只股票的新特征行
+
+    Args:
+        symbol: 股票代码
+        bars: 日线（若已有特征，第一行为最后一行特征当日）
+        tail: _load_tails 的结果，为空表示从头计算
+    """
+    dates = bars['date'].to_numpy()
+    high, low = bars['high'].to_numpy(), bars['low'].to_numpy()
+    close, volume = bars['close'].to_numpy(), bars['volume'].to_numpy()
+
+    if tail is not None:
+        # 第一行日线已有特征，只作为前一日高低点的来源
+        prev_high, prev_low = high[:-1], low[:-1]
+        dates, close, volume = dates[1:], close[1:], volume[1:]
+        base_seq = int(tail[-1, 1]) + 1
+        history = tail[:, 2:].astype(np.float64)
+    else:
+        prev_high, prev_low = np.r_[np.nan, high[:-1]], np.r_[np.nan, low[:-1]]
+        base_seq = 0
+        history = np.empty((0, 3))
+    if not len(dates):
+        return []
+
+    cums = history[-1] if len(history) else np.zeros(3)
+    new = cums + np.cumsum(np.column_stack([close, close * close, volume]), axis=0)
+    prefix = np.vstack([history, new])
+    if base_seq == len(history):
+        # 全部历史都在 prefix 中：最前补上 seq = -1 的零行，使窗口恰好填满的第一行也能相减
+        prefix = np.vstack([np.zeros((1, 3)), prefix])
+    offset = len(prefix) - len(new)   # new[i] 在 prefix 中的位置
+
+    def window_sum(column: int, period: int) -> np.ndarray:
+        """每个新行的 period 日窗口和，历史不足时为 NaN"""
+        positions = offset + np.arange(len(new))
+        start = positions - period
+        sums = np.full(len(new), np.nan)
+        valid = start >= 0
+        sums[valid] = prefix[positions[valid], column] - prefix[start[valid], column]
+        return sums
+
+    ma = window_sum(0, FEATURE_MA_PERIOD) / FEATURE_MA_PERIOD
+    bb_mean = window_sum(0, FEATURE_BOLLINGER_PERIOD) / FEATURE_BOLLINGER_PERIOD
+    variance = window_sum(1, FEATURE_BOLLINGER_PERIOD) / FEATURE_BOLLINGER_PERIOD - bb_mean * bb_mean
+    bb_std = np.sqrt(np.maximum(variance, 0.0))
+    avg_volume = window_sum(2, FEATURE_VOLUME_PERIOD) / FEATURE_VOLUME_PERIOD
+
+    seq = base_seq + np.arange(len(new))
+    return list(zip(
+        [symbol] * len(new), dates.tolist(), seq.tolist(), *new.T.tolist(),
+        ma.tolist(), bb_mean.tolist(), bb_std.tolist(), prev_high.tolist(), prev_low.tolist(), avg_volume.tolist()
+    ))
@@ -2,9 +2,12 @@
 市场数据获取模块
 """
 import pandas as pd
+import yfinance as yf
 from datetime import datetime
 from typing import Dict, List, Any, Optional, TypedDict
 
+from ..utils import time as trading_time
+
 
 class OHLCData(TypedDict):
     """OHLC数据结构"""
@@ -47,17 +50,48 @@ def fetch_ohlc_batch(
     symbols: List[str]
 ) -> Dict[str, OHLCData]:
     """批量获取最新OHLC数据"""
-    pass
+    data = yf.download(tickers=symbols, period='1d', interval='1d', group_by='ticker',
+                       progress=False, threads=False)
+    if data.empty:
+        return {}
+
+    result = {}
+    available = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        bars = data[symbol].dropna(subset=['Close'])
+        if bars.empty:
+            continue
+        latest = bars.iloc[-1]
+        result[symbol] = OHLCData(
+            open=float(latest['Open']),
+            high=float(latest['High']),
+            low=float(latest['Low']),
+            close=float(latest['Close']),
+            volume=int(latest['Volume']) if pd.notna(latest['Volume']) else 0,
+            timestamp=bars.index[-1].isoformat(),
+        )
+    return result
 
 
 def fetch_market_cap(symbol: str) -> float:
-    """获取股票市值"""
-    pass
+    """获取股票市值（单只股票的网络请求，批量场景请读取 stock_info 快照）"""
+    market_cap = yf.Ticker(symbol).fast_info.get('marketCap')
+    return float(market_cap) if market_cap is not None else float('nan')
 
 
 def fetch_stock_info(symbol: str) -> StockInfo:
-    """获取股票基本信息"""
-    pass
+    """获取股票基本信息（单只股票的网络请求，批量场景请读取 stock_info 快照）"""
+    info = yf.Ticker(symbol).info or {}
+    market_cap = info.get('marketCap')
+    return StockInfo(
+        symbol=symbol,
+        name=info.get('longName') or info.get('shortName') or symbol,
+        market_cap=float(market_cap) if market_cap is not None else float('nan'),
+        sector=info.get('sector') or '',
+        industry=info.get('industry') or '',
+    )
 
 
 def get_trading_dates(
@@ -65,9 +99,10 @@ def get_trading_dates(
     end_date: datetime
 ) -> List[datetime]:
     """获取交易日期列表"""
-    pass
+    sessions = trading_time.get_calendar('US').sessions_in_range(start_date, end_date)
+    return [datetime.combine(d, datetime.min.time()) for d in sessions.astype(object)]
 
 
 def is_trading_day(date: datetime) -> bool:
     """判断是否为交易日"""
-    pass
+    return trading_time.is_trading_day(date)
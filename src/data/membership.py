@@ -0,0 +1,198 @@
+"""
+指数成分股时点（point-in-time）查询模块
+
+IndexMembership 表以区间 [start_date, end_date) 记录每只股票属于某指数的时段。
+某指数的全部区间一次性读入内存（按指数缓存，写入时失效），
+membership_mask 用差分数组把区间铺到 symbol × date 面板上，一次调用得到整个面板的成员掩码，
+回测按当日成分股筛选时不会引入幸存者偏差。
+"""
+import datetime as dt
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils import logging
+from .db_models import database, IndexMembership
+
+logger = logging.get_logger(__name__)
+
+# 区间终点为空（至今仍是成分股）时使用的哨兵日期
+OPEN_END = np.datetime64('9999-12-31', 'D')
+
+_intervals: Dict[str, 'MembershipIntervals'] = {}
+_lock = threading.Lock()
+
+
+class MembershipIntervals(NamedTuple):
+    """某指数的全部成分股区间（按 symbol、start 排序）"""
+    symbols: np.ndarray     # object
+    starts: np.ndarray      # datetime64[D]，含
+    ends: np.ndarray        # datetime64[D]，不含
+
+
+def normalize_index(index: str) -> str:
+    """统一指数名：'SP500'、'S&P 500' -> 'sp500'，'NASDAQ-100' -> 'nasdaq100'"""
+    return ''.join(ch for ch in index.lower() if ch.isalnum())
+
+
+def load_intervals(index: str) -> MembershipIntervals:
+    """读取指数的全部区间（进程内缓存）"""
+    index = normalize_index(index)
+    with _lock:
+        cached = _intervals.get(index)
+    if cached is not None:
+        return cached
+
+    table = IndexMembership._meta.table_name
+    rows = database.execute_sql(
+        f'SELECT symbol, start_date, end_date FROM {table} WHERE "index" = ? ORDER BY symbol, start_date',
+        (index,)
+    ).fetchall()
+    if rows:
+        symbols, starts, ends = zip(*rows)
+        intervals = MembershipIntervals(
+            symbols=np.array(symbols, dtype=object),
+            starts=np.array(starts, dtype='datetime64[D]'),
+            ends=np.array([e if e is not None else OPEN_END for e in ends], dtype='datetime64[D]'),
+        )
+    else:
+        intervals = MembershipIntervals(
+            np.array([], dtype=object), np.array([], dtype='datetime64[D]'), np.array([], dtype='datetime64[D]')
+        )
+    with _lock:
+        _intervals[index] = intervals
+    return intervals
+
+
+def membership_mask(
+    index: str,
+    symbols: List[str],
+    dates: Iterable
+) -> np.ndarray:
+    """
+    计算 symbol × date 面板的成分股掩码
+
+    Args:
+        index: 指数名
+        symbols: 股票代码
+        dates: 升序日期（datetime64 数组、DatetimeIndex 或 date 列表）
+
+    Returns:
+        形状 (len(symbols), len(dates)) 的 bool 数组
+    """
+    dates = _to_days(dates)
+    intervals = load_intervals(index)
+    mask = np.zeros((len(symbols), len(dates)), dtype=bool)
+    if not len(intervals.symbols) or not len(dates) or not symbols:
+        return mask
+
+    position = {symbol: i for i, symbol in enumerate(symbols)}
+    rows = np.fromiter((position.get(s, -1) for s in intervals.symbols), dtype=np.intp,
+                       count=len(intervals.symbols))
+    keep = rows >= 0
+    rows = rows[keep]
+    # 区间 [start, end) 对应日期下标 [lo, hi)
+    lo = np.searchsorted(dates, intervals.starts[keep], side='left')
+    hi = np.searchsorted(dates, intervals.ends[keep], side='left')
+    valid = lo < hi
+
+    diff = np.zeros((len(symbols), len(dates) + 1), dtype=np.int32)
+    np.add.at(diff, (rows[valid], lo[valid]), 1)
+    np.add.at(diff, (rows[valid], hi[valid]), -1)
+    return np.cumsum(diff[:, :-1], axis=1) > 0
+
+
+def is_member(index: str, symbol: str, date: dt.date) -> bool:
+    """判断股票在某日是否为指数成分股"""
+    return bool(membership_mask(index, [symbol], [date])[0, 0])
+
+
+def members_on(index: str, date: dt.date) -> List[str]:
+    """获取指数在某日的成分股"""
+    intervals = load_intervals(index)
+    day = _to_days([date])[0]
+    active = (intervals.starts <= day) & (intervals.ends > day)
+    return list(dict.fromkeys(intervals.symbols[active]))
+
+
+def record_snapshot(index: str, symbols: Iterable[str], as_of: dt.date) -> int:
+    """
+    根据某日的成分股快照更新区间：新调入的股票开启区间，已调出的股票关闭区间
+
+    Args:
+        index: 指数名
+        symbols: as_of 当日的全部成分股
+        as_of: 快照日期
+
+    Returns:
+        变动（调入 + 调出）的股票数
+    """
+    index = normalize_index(index)
+    current = set(symbols)
+    with database.atomic():
+        open_rows = (IndexMembership
+                     .select(IndexMembership.symbol)
+                     .where((IndexMembership.index == index) & IndexMembership.end_date.is_null()))
+        opened = {row.symbol for row in open_rows}
+        added = sorted(current - opened)
+        removed = sorted(opened - current)
+        if removed:
+            (IndexMembership
+             .update(end_date=as_of)
+             .where((IndexMembership.index == index)
+                    & IndexMembership.end_date.is_null()
+                    & IndexMembership.symbol.in_(removed))
+             .execute())
+        if added:
+            IndexMembership.insert_many(
+                [{'index': index, 'symbol': s, 'start_date': as_of, 'end_date': None} for s in added]
+            ).on_conflict_ignore().execute()
+    if added or removed:
+        invalidate(index)
+        logger.info(f"{index} 成分股变动 ({as_of}): 调入 {len(added)} 只, 调出 {len(removed)} 只")
+    return len(added) + len(removed)
+
+
+def save_intervals(index: str, intervals: pd.DataFrame, replace: bool = True) -> int:
+    """
+    批量导入历史区间
+
+    Args:
+        index: 指数名
+        intervals: 含 symbol、start_date、end_date（可为空）列的 DataFrame
+        replace: 是否先删除该指数已有的区间
+
+    Returns:
+        写入的区间数
+    """
+    index = normalize_index(index)
+    frame = intervals[['symbol', 'start_date', 'end_date']].copy()
+    frame['start_date'] = pd.to_datetime(frame['start_date']).dt.date
+    end_dates = pd.to_datetime(frame['end_date'])
+    frame['end_date'] = [d.date() if not pd.isna(d) else None for d in end_dates]
+    rows = [{'index': index, **row} for row in frame.to_dict('records')]
+    with database.atomic():
+        if replace:
+            IndexMembership.delete().where(IndexMembership.index == index).execute()
+        for i in range(0, len(rows), 500):
+            IndexMembership.insert_many(rows[i:i + 500]).on_conflict_replace().execute()
+    invalidate(index)
+    return len(rows)
+
+
+def invalidate(index: Optional[str] = None) -> None:
+    """清除区间缓存，index 为空时清除全部"""
+    with _lock:
+        if index is None:
+            _intervals.clear()
+        else:
+            _intervals.pop(normalize_index(index), None)
+
+
+def _to_days(dates: Iterable) -> np.ndarray:
+    """日期转换为 datetime64[D] 数组"""
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype('datetime64[D]')
+    return pd.DatetimeIndex(list(dates)).values.astype('datetime64[D]')
@@ -0,0 +1,319 @@
+"""
+列式行情面板存储模块
+
+将 StockData 表中的日线数据整理为 symbol × date × field 的三维数组，
+以 NumPy .npy 文件落盘，读取时通过内存映射打开，不复制、不创建逐行对象。
+
+目录结构:
+    panel_dir/
+        meta.json   # 股票列表、已用日期数、容量、同步水位
+        dates.npy   # datetime64[D]，长度为日期容量
+        ohlcv.npy   # float64，形状为 (股票容量, 日期容量, 字段数)
+"""
+import datetime as dt
+import json
+import os
+import pathlib
+import shutil
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils import logging
+from .db_models import TIMESTAMP_FORMAT, database, StockData
+
+logger = logging.get_logger(__name__)
+
+# 字段顺序即数组最后一维的顺序
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# 预留容量的增长步长，避免每日追加都重新分配文件
+DATE_CAPACITY_CHUNK = 256
+SYMBOL_CAPACITY_CHUNK = 64
+
+# 增量同步时在水位之前重读的时间窗口：写入较慢、提交晚于水位的记录（created_at 更早）也能被读到，
+# 重复应用的记录按 (symbol, date) 覆盖，结果不变
+WATERMARK_OVERLAP = dt.timedelta(minutes=10)
+
+# created_at 补齐为定宽文本（ORM 写入的整秒时间没有小数部分），与 TIMESTAMP_FORMAT 一致
+_CREATED_AT_KEY = "substr(created_at || '.000000', 1, 26)"
+
+_META_FILE = 'meta.json'
+_DATES_FILE = 'dates.npy'
+_DATA_FILE = 'ohlcv.npy'
+
+
+class OHLCVPanel(NamedTuple):
+    """行情面板（只读内存映射视图）"""
+    symbols: List[str]
+    dates: np.ndarray   # datetime64[D]，形状 (n_dates,)
+    data: np.ndarray    # float64，形状 (n_symbols, n_dates, len(PANEL_FIELDS))
+
+    def field(self, name: str) -> np.ndarray:
+        """获取单个字段的二维视图，形状 (n_symbols, n_dates)"""
+        return self.data[:, :, PANEL_FIELDS.index(name)]
+
+    def symbol_index(self) -> Dict[str, int]:
+        """股票代码到行号的映射"""
+        return {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def to_frame(self, row: int) -> pd.DataFrame:
+        """
+        取单只股票的日线 DataFrame（按日期升序，去掉无数据的日期）
+
+        Args:
+            row: 股票所在行号，见 symbol_index()
+
+        Returns:
+            以日期为索引、列为 PANEL_FIELDS 的 DataFrame
+        """
+        frame = pd.DataFrame(
+            np.array(self.data[row]),
+            index=pd.DatetimeIndex(self.dates, name='date'),
+            columns=list(PANEL_FIELDS),
+        )
+        return frame.dropna(how='all')
+
+
+def panel_from_frame(symbol: str, data: pd.DataFrame) -> OHLCVPanel:
+    """
+    把单只股票的日线 DataFrame 包装为单行面板（to_frame 的逆操作），缺少的字段为 NaN
+
+    Args:
+        symbol: 股票代码
+        data: 以日期为索引的日线数据（按日期升序）
+
+    Returns:
+        内存中的 OHLCVPanel
+    """
+    values = np.full((1, len(data), len(PANEL_FIELDS)), np.nan)
+    for i, name in enumerate(PANEL_FIELDS):
+        if name in data.columns:
+            values[0, :, i] = data[name].to_numpy(dtype=np.float64)
+    return OHLCVPanel([symbol], data.index.values.astype('datetime64[D]'), values)
+
+
+def open_panel(panel_dir: pathlib.Path) -> Optional[OHLCVPanel]:
+    """
+    以只读内存映射方式打开行情面板
+
+    Args:
+        panel_dir: 面板存储目录
+
+    Returns:
+        OHLCVPanel，如果面板尚未构建返回 None
+    """
+    panel_dir = pathlib.Path(panel_dir)
+    meta = _read_meta(panel_dir)
+    if meta is None:
+        logger.warning(f"行情面板不存在: {panel_dir}")
+        return None
+
+    n_symbols = len(meta['symbols'])
+    n_dates = meta['n_dates']
+    dates = np.load(panel_dir / _DATES_FILE, mmap_mode='r')
+    data = np.load(panel_dir / _DATA_FILE, mmap_mode='r')
+
+    return OHLCVPanel(
+        symbols=meta['symbols'],
+        dates=dates[:n_dates],
+        data=data[:n_symbols, :n_dates],
+    )
+
+
+def sync_panel_store(panel_dir: pathlib.Path, rebuild: bool = False) -> int:
+    """
+    从 StockData 表增量同步行情面板
+
+    以 created_at 作为同步水位，只读取上次同步之后写入（或被覆盖）的记录，并重读水位前 WATERMARK_OVERLAP 内的记录。
+    新日期追加在末尾时原地写入；出现早于已有最后日期的新日期（历史回补）时全量重建。
+
+    Args:
+        panel_dir: 面板存储目录
+        rebuild: True = 忽略水位，全量重建
+
+    Returns:
+        本次写入面板的记录数
+    """
+    panel_dir = pathlib.Path(panel_dir)
+    meta = None if rebuild else _read_meta(panel_dir)
+    if meta is None:
+        return _rebuild_panel(panel_dir)
+
+    rows = _fetch_rows(meta['watermark'])
+    if not rows[0].size:
+        logger.info("行情面板已是最新")
+        return 0
+
+    symbols, dates, values, watermark = rows
+    n_dates = meta['n_dates']
+    stored_dates = np.load(panel_dir / _DATES_FILE, mmap_mode='r')[:n_dates]
+
+    new_dates = np.setdiff1d(np.unique(dates), stored_dates)
+    if new_dates.size and n_dates and new_dates[0] < stored_dates[-1]:
+        logger.info(f"检测到历史日期回补（{new_dates[0]}），全量重建行情面板")
+        return _rebuild_panel(panel_dir)
+
+    symbol_list = list(meta['symbols'])
+    known = set(symbol_list)
+    symbol_list.extend(s for s in dict.fromkeys(symbols.tolist()) if s not in known)
+
+    all_dates = np.concatenate([stored_dates, new_dates])
+    _ensure_capacity(panel_dir, meta, len(symbol_list), len(all_dates))
+
+    dates_file = np.load(panel_dir / _DATES_FILE, mmap_mode='r+')
+    dates_file[n_dates:len(all_dates)] = new_dates
+    dates_file.flush()
+
+    data_file = np.load(panel_dir / _DATA_FILE, mmap_mode='r+')
+    _scatter(data_file, symbol_list, all_dates, symbols, dates, values)
+    data_file.flush()
+
+    meta.update(symbols=symbol_list, n_dates=len(all_dates), watermark=watermark)
+    _write_meta(panel_dir, meta)
+
+    logger.info(f"行情面板增量同步 {len(symbols)} 条记录，新增日期 {new_dates.size} 个")
+    return len(symbols)
+
+
+def _rebuild_panel(panel_dir: pathlib.Path) -> int:
+    """全量重建行情面板，写入临时目录后整体替换"""
+    symbols, dates, values, watermark = _fetch_rows(None)
+
+    symbol_list = list(dict.fromkeys(symbols.tolist()))
+    all_dates = np.unique(dates)
+    symbol_capacity = _round_up(len(symbol_list), SYMBOL_CAPACITY_CHUNK)
+    date_capacity = _round_up(len(all_dates), DATE_CAPACITY_CHUNK)
+
+    tmp_dir = panel_dir.with_name(panel_dir.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    dates_file = np.lib.format.open_memmap(
+        tmp_dir / _DATES_FILE, mode='w+', dtype='datetime64[D]', shape=(date_capacity,)
+    )
+    dates_file[:] = np.datetime64('NaT')
+    dates_file[:len(all_dates)] = all_dates
+    dates_file.flush()
+
+    data_file = np.lib.format.open_memmap(
+        tmp_dir / _DATA_FILE, mode='w+', dtype=np.float64,
+        shape=(symbol_capacity, date_capacity, len(PANEL_FIELDS))
+    )
+    data_file[:] = np.nan
+    _scatter(data_file, symbol_list, all_dates, symbols, dates, values)
+    data_file.flush()
+    del dates_file, data_file
+
+    _write_meta(tmp_dir, {
+        'symbols': symbol_list,
+        'n_dates': len(all_dates),
+        'symbol_capacity': symbol_capacity,
+        'date_capacity': date_capacity,
+        'watermark': watermark,
+    })
+
+    shutil.rmtree(panel_dir, ignore_errors=True)
+    os.replace(tmp_dir, panel_dir)
+
+    logger.info(f"行情面板全量重建完成: {len(symbol_list)} 只股票, {len(all_dates)} 个交易日")
+    return len(symbols)
+
+
+def _fetch_rows(watermark: Optional[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[str]]:
+    """
+    读取 StockData 原始行，返回 (symbols, dates, values, 新水位)
+
+    水位为 TIMESTAMP_FORMAT 定宽文本（旧版 meta 中的 isoformat 水位同样可解析），比较时从水位回退 WATERMARK_OVERLAP；
+    窗口内的记录会被重复应用，写入是幂等的。
+    """
+    table = StockData._meta.table_name
+    sql = f"SELECT symbol, date, open, high, low, close, volume, {_CREATED_AT_KEY} FROM {table}"
+    params = ()
+    if watermark:
+        since = dt.datetime.fromisoformat(watermark) - WATERMARK_OVERLAP
+        sql += f" WHERE {_CREATED_AT_KEY} >= ?"
+        params = (since.strftime(TIMESTAMP_FORMAT),)
+
+    rows = database.execute_sql(sql, params).fetchall()
+    if not rows:
+        return np.array([], dtype=object), np.array([], dtype='datetime64[D]'), np.empty((0, len(PANEL_FIELDS))), watermark
+
+    columns = list(zip(*rows))
+    symbols = np.array(columns[0], dtype=object)
+    dates = np.array(columns[1], dtype='datetime64[D]')
+    values = np.column_stack([np.array(col, dtype=np.float64) for col in columns[2:7]])
+    return symbols, dates, values, max(columns[7])
+
+
+def _scatter(
+    data: np.ndarray,
+    symbol_list: List[str],
+    all_dates: np.ndarray,
+    symbols: np.ndarray,
+    dates: np.ndarray,
+    values: np.ndarray
+) -> None:
+    """按 (symbol, date) 坐标把记录写入面板数组"""
+    index = {symbol: i for i, symbol in enumerate(symbol_list)}
+    symbol_idx = np.fromiter((index[s] for s in symbols), dtype=np.intp, count=len(symbols))
+    date_idx = np.searchsorted(all_dates, dates)
+    data[symbol_idx, date_idx] = values
+
+
+def _ensure_capacity(panel_dir: pathlib.Path, meta: Dict, n_symbols: int, n_dates: int) -> None:
+    """容量不足时按步长扩容数据文件（复制已有数据后替换）"""
+    symbol_capacity = meta['symbol_capacity']
+    date_capacity = meta['date_capacity']
+    if n_symbols <= symbol_capacity and n_dates <= date_capacity:
+        return
+
+    new_symbol_capacity = max(symbol_capacity, _round_up(n_symbols, SYMBOL_CAPACITY_CHUNK))
+    new_date_capacity = max(date_capacity, _round_up(n_dates, DATE_CAPACITY_CHUNK))
+    logger.info(f"行情面板扩容: ({symbol_capacity}, {date_capacity}) -> ({new_symbol_capacity}, {new_date_capacity})")
+
+    old_dates = np.load(panel_dir / _DATES_FILE, mmap_mode='r')
+    dates_file = np.lib.format.open_memmap(
+        panel_dir / (_DATES_FILE + '.tmp'), mode='w+', dtype='datetime64[D]', shape=(new_date_capacity,)
+    )
+    dates_file[:] = np.datetime64('NaT')
+    dates_file[:date_capacity] = old_dates
+    dates_file.flush()
+
+    old_data = np.load(panel_dir / _DATA_FILE, mmap_mode='r')
+    data_file = np.lib.format.open_memmap(
+        panel_dir / (_DATA_FILE + '.tmp'), mode='w+', dtype=np.float64,
+        shape=(new_symbol_capacity, new_date_capacity, len(PANEL_FIELDS))
+    )
+    data_file[:] = np.nan
+    data_file[:symbol_capacity, :date_capacity] = old_data
+    data_file.flush()
+    del old_dates, old_data, dates_file, data_file
+
+    os.replace(panel_dir / (_DATES_FILE + '.tmp'), panel_dir / _DATES_FILE)
+    os.replace(panel_dir / (_DATA_FILE + '.tmp'), panel_dir / _DATA_FILE)
+    meta.update(symbol_capacity=new_symbol_capacity, date_capacity=new_date_capacity)
+    _write_meta(panel_dir, meta)
+
+
+def _read_meta(panel_dir: pathlib.Path) -> Optional[Dict]:
+    """读取面板元数据，不存在返回 None"""
+    meta_path = panel_dir / _META_FILE
+    if not meta_path.exists():
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_meta(panel_dir: pathlib.Path, meta: Dict) -> None:
+    """原子写入面板元数据"""
+    tmp_path = panel_dir / (_META_FILE + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, panel_dir / _META_FILE)
+
+
+def _round_up(n: int, chunk: int) -> int:
+    """向上取整到步长的整数倍（至少一个步长）"""
+    return max(chunk, -(-n // chunk) * chunk)
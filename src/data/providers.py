@@ -0,0 +1,190 @@
+"""
+日线数据源模块
+
+持久化任务通过 DataProvider 下载日线，返回统一的长表格式：
+symbol, date, open, high, low, close, volume（每行一只股票一天）。
+YFinanceProvider 为线上数据源；SyntheticProvider 在本地生成随机行情，
+可模拟网络延迟与限流，用于离线压测持久化流程。
+"""
+import logging
+import random
+import threading
+import time
+import datetime as dt
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+LONG_COLUMNS = ['symbol', 'date', 'open', 'high', 'low', 'close', 'volume']
+
+
+class ThrottledError(Exception):
+    """数据源限流（HTTP 429 等）"""
+
+
+class DataProvider(ABC):
+    """日线数据源基类"""
+
+    @abstractmethod
+    def download(
+        self,
+        tickers: List[str],
+        start: dt.date,
+        end: dt.date
+    ) -> pd.DataFrame:
+        """
+        下载 [start, end] 区间（含两端）的日线
+
+        Raises:
+            ThrottledError: 被数据源限流
+        """
+        pass
+
+
+class YFinanceProvider(DataProvider):
+    """yfinance 数据源"""
+
+    def download(
+        self,
+        tickers: List[str],
+        start: dt.date,
+        end: dt.date
+    ) -> pd.DataFrame:
+        """
+        下载日线，yfinance 的 end 为开区间，这里补一天
+
+        区间内没有数据（未上市、已退市、当日数据尚未发布）时返回空表，不视为限流。
+        """
+        # yf.download 会吞掉单只股票的异常，只写入 yfinance 日志，从日志中识别限流
+        collector = _ThreadErrorCollector()
+        yf_logger = logging.getLogger('yfinance')
+        yf_logger.addHandler(collector)
+        try:
+            data = yf.download(
+                tickers=tickers,
+                start=start.strftime('%Y-%m-%d'),
+                end=(end + dt.timedelta(days=1)).strftime('%Y-%m-%d'),
+                interval='1d',
+                group_by='ticker',
+                progress=False,
+                threads=False,
+            )
+        except Exception as e:
+            if is_rate_limit_error(e):
+                raise ThrottledError(str(e)) from e
+            raise
+        finally:
+            yf_logger.removeHandler(collector)
+
+        throttled = [message for message in collector.messages if is_rate_limit_message(message)]
+        if throttled:
+            raise ThrottledError(f"批次被限流: {tickers[0]} 等 {len(tickers)} 只: {throttled[0]}")
+        if data is None or data.empty:
+            return pd.DataFrame(columns=LONG_COLUMNS)
+        return to_long_format(data, tickers)
+
+
+class _ThreadErrorCollector(logging.Handler):
+    """收集当前线程写入的 ERROR 日志（多个下载线程共用 yfinance 日志器）"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.thread = threading.get_ident()
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread == self.thread:
+            self.messages.append(record.getMessage())
+
+
+class SyntheticProvider(DataProvider):
+    """本地随机行情数据源（离线压测用）"""
+
+    def __init__(self, latency: float = 0.5, throttle_probability: float = 0.0, seed: int = None):
+        """
+        初始化
+
+        Args:
+            latency: 每次下载的模拟耗时（秒）
+            throttle_probability: 每次下载被限流的概率
+            seed: 随机种子
+        """
+        self.latency = latency
+        self.throttle_probability = throttle_probability
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def download(
+        self,
+        tickers: List[str],
+        start: dt.date,
+        end: dt.date
+    ) -> pd.DataFrame:
+        """生成工作日随机游走行情"""
+        with self.lock:
+            throttled = self.random.random() < self.throttle_probability
+            seed = self.random.getrandbits(32)
+        time.sleep(self.latency)
+        if throttled:
+            raise ThrottledError("模拟限流")
+
+        dates = pd.bdate_range(start, end)
+        rng = np.random.default_rng(seed)
+        shape = (len(tickers), len(dates))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, shape), axis=1))
+        open_ = close * (1 + rng.normal(0, 0.01, shape))
+        spread = np.abs(rng.normal(0, 0.01, shape)) * close
+
+        return pd.DataFrame({
+            'symbol': np.repeat(tickers, len(dates)),
+            'date': np.tile(dates, len(tickers)),
+            'open': open_.ravel(),
+            'high': (np.maximum(open_, close) + spread).ravel(),
+            'low': (np.minimum(open_, close) - spread).ravel(),
+            'close': close.ravel(),
+            'volume': rng.integers(1e5, 1e7, shape).ravel(),
+        }, columns=LONG_COLUMNS)
+
+
+def to_long_format(data: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    """
+    yf.download(group_by='ticker') 的宽表转换为长表
+
+    Args:
+        data: 列为 (Ticker, Price) 二级索引、行索引为日期的 DataFrame
+        tickers: 请求的股票代码
+
+    Returns:
+        LONG_COLUMNS 列的长表，已去掉收盘价缺失的行
+    """
+    available = set(data.columns.get_level_values(0))
+    frames = []
+    for symbol in tickers:
+        if symbol not in available:
+            continue
+        frame = data[symbol].rename(columns=str.lower).dropna(subset=['close'])
+        if frame.empty:
+            continue
+        frame = frame.rename_axis('date').reset_index()
+        frame['symbol'] = symbol
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=LONG_COLUMNS)
+    result = pd.concat(frames, ignore_index=True)
+    dates = pd.to_datetime(result['date'])
+    result['date'] = dates.dt.tz_localize(None) if dates.dt.tz is not None else dates
+    return result[LONG_COLUMNS]
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """判断异常是否为限流"""
+    return type(error).__name__ == 'YFRateLimitError' or is_rate_limit_message(str(error))
+
+
+def is_rate_limit_message(message: str) -> bool:
+    """判断错误信息是否为限流（HTTP 429 / YFRateLimitError）"""
+    return 'Too Many Requests' in message or 'Rate limit' in message or 'YFRateLimitError' in message
@@ -0,0 +1,160 @@
+"""
+共享内存行情面板模块
+
+把 OHLCVPanel 的数据复制到一块 multiprocessing.shared_memory 中，
+子进程通过可 pickle 的 SharedPanelHandle 按名字映射同一块内存，
+进程池分发任务时只传递句柄，不复制、不 pickle 价格数组。
+SharedArrays 以同样方式共享一组任意的 float64 数组（如预计算的指标面板）。
+"""
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .panel_store import OHLCVPanel
+
+
+class SharedPanelHandle(NamedTuple):
+    """共享面板句柄（可 pickle）"""
+    name: str
+    shape: Tuple[int, ...]
+    symbols: List[str]
+    dates: np.ndarray
+
+
+class SharedPanel:
+    """共享内存中的行情面板，创建者负责释放（支持 with 语句）"""
+
+    def __init__(self, panel: OHLCVPanel):
+        """
+        把面板复制到共享内存
+
+        Args:
+            panel: 行情面板（可以是内存映射视图）
+        """
+        data = np.asarray(panel.data, dtype=np.float64)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        array = np.ndarray(data.shape, dtype=np.float64, buffer=self.shm.buf)
+        array[:] = data
+        self.handle = SharedPanelHandle(
+            name=self.shm.name,
+            shape=data.shape,
+            symbols=list(panel.symbols),
+            dates=np.asarray(panel.dates),
+        )
+        self.panel = OHLCVPanel(self.handle.symbols, self.handle.dates, array)
+
+    def close(self) -> None:
+        """释放共享内存"""
+        if self.shm is not None:
+            self.panel = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self) -> 'SharedPanel':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+# 子进程内已映射的共享内存，按名字缓存，同一进程处理多个任务时只映射一次
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, object]] = {}
+
+
+def attach_panel(handle: SharedPanelHandle) -> OHLCVPanel:
+    """
+    在当前进程映射共享面板（只读使用）
+
+    Args:
+        handle: SharedPanel.handle
+
+    Returns:
+        数据直接指向共享内存的 OHLCVPanel
+    """
+    cached: Optional[tuple] = _attached.get(handle.name)
+    if cached is not None:
+        return cached[1]
+    shm = _open_untracked(handle.name)
+    data = np.ndarray(handle.shape, dtype=np.float64, buffer=shm.buf)
+    data.flags.writeable = False
+    panel = OHLCVPanel(handle.symbols, handle.dates, data)
+    _attached[handle.name] = (shm, panel)
+    return panel
+
+
+class SharedArraysHandle(NamedTuple):
+    """共享数组组句柄（可 pickle）：名字 -> (字节偏移, 形状)"""
+    name: str
+    layout: Dict[str, Tuple[int, Tuple[int, ...]]]
+
+
+class SharedArrays:
+    """把一组 float64 数组连续放入同一块共享内存，创建者负责释放（支持 with 语句）"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        复制数组到共享内存
+
+        Args:
+            arrays: 名字 -> 数组
+        """
+        layout = {}
+        offset = 0
+        for key, array in arrays.items():
+            layout[key] = (offset, tuple(np.shape(array)))
+            offset += int(np.prod(np.shape(array), dtype=np.int64)) * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.handle = SharedArraysHandle(name=self.shm.name, layout=layout)
+        self.arrays = _view_arrays(self.shm, layout)
+        for key, array in arrays.items():
+            self.arrays[key][...] = array
+
+    def close(self) -> None:
+        """释放共享内存"""
+        if self.shm is not None:
+            self.arrays = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def attach_arrays(handle: SharedArraysHandle) -> Dict[str, np.ndarray]:
+    """在当前进程映射共享数组组（只读使用）"""
+    cached: Optional[tuple] = _attached.get(handle.name)
+    if cached is not None:
+        return cached[1]
+    shm = _open_untracked(handle.name)
+    arrays = _view_arrays(shm, handle.layout)
+    for array in arrays.values():
+        array.flags.writeable = False
+    _attached[handle.name] = (shm, arrays)
+    return arrays
+
+
+def _view_arrays(
+    shm: shared_memory.SharedMemory,
+    layout: Dict[str, Tuple[int, Tuple[int, ...]]]
+) -> Dict[str, np.ndarray]:
+    """按布局在共享内存上构造数组视图"""
+    return {
+        key: np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=offset)
+        for key, (offset, shape) in layout.items()
+    }
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    """映射已有的共享内存，由创建者负责 unlink"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 没有 track 参数；进程池子进程与创建者共用同一个资源跟踪器，
+        # 重复登记不会导致提前回收
+        return shared_memory.SharedMemory(name=name)
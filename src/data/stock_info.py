@@ -0,0 +1,127 @@
+"""
+股票基本信息快照模块
+
+持久化工具每日批量刷新一次 StockInfoSnapshot（市值、行业等），
+筛选时通过 load_latest_stock_info 一次性把每只股票最新的快照读入内存字典，
+监控热路径上不再逐只发起网络请求。
+回测使用 market_cap_panel 按日取当时最近的快照，历史日期不会用到之后的市值。
+"""
+import datetime as dt
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils import logging
+from .db_models import TIMESTAMP_FORMAT, database, StockInfoSnapshot
+from .market_data import StockInfo
+
+logger = logging.get_logger(__name__)
+
+INFO_COLUMNS = ['symbol', 'date', 'name', 'market_cap', 'sector', 'industry', 'created_at']
+
+
+def save_stock_info_snapshot(infos: List[StockInfo], as_of: dt.date) -> int:
+    """
+    保存某日的股票信息快照（同一股票同一日重复保存时覆盖）
+
+    Returns:
+        写入的行数
+    """
+    if not infos:
+        return 0
+    created_at = dt.datetime.now().strftime(TIMESTAMP_FORMAT)
+    rows = [
+        (info['symbol'], as_of.isoformat(), info['name'],
+         None if info['market_cap'] is None or math.isnan(info['market_cap']) else info['market_cap'],
+         info['sector'], info['industry'], created_at)
+        for info in infos
+    ]
+    table = StockInfoSnapshot._meta.table_name
+    sql = (f"INSERT OR REPLACE INTO {table} ({', '.join(INFO_COLUMNS)}) "
+           f"VALUES ({', '.join('?' * len(INFO_COLUMNS))})")
+    with database.atomic():
+        database.cursor().executemany(sql, rows)
+    return len(rows)
+
+
+def get_snapshot_symbols(as_of: dt.date) -> set:
+    """获取某日已有快照的股票"""
+    table = StockInfoSnapshot._meta.table_name
+    rows = database.execute_sql(f"SELECT symbol FROM {table} WHERE date = ?", (as_of.isoformat(),)).fetchall()
+    return {row[0] for row in rows}
+
+
+def load_latest_stock_info(symbols: Optional[List[str]] = None) -> Dict[str, StockInfo]:
+    """
+    一次查询读取每只股票最新的信息快照
+
+    Args:
+        symbols: 股票代码，为空时读取全部
+
+    Returns:
+        symbol -> StockInfo，无快照的股票不在结果中
+    """
+    table = StockInfoSnapshot._meta.table_name
+    sql = (f"SELECT s.symbol, s.name, s.market_cap, s.sector, s.industry FROM {table} s "
+           f"JOIN (SELECT symbol, MAX(date) AS date FROM {table} GROUP BY symbol) latest "
+           f"ON s.symbol = latest.symbol AND s.date = latest.date")
+    rows = database.execute_sql(sql).fetchall()
+    wanted = set(symbols) if symbols is not None else None
+    infos = {}
+    for symbol, name, market_cap, sector, industry in rows:
+        if wanted is not None and symbol not in wanted:
+            continue
+        infos[symbol] = StockInfo(
+            symbol=symbol,
+            name=name or symbol,
+            market_cap=market_cap if market_cap is not None else float('nan'),
+            sector=sector or '',
+            industry=industry or '',
+        )
+    logger.info(f"加载股票信息快照: {len(infos)} 只")
+    return infos
+
+
+def market_cap_array(infos: Dict[str, StockInfo], symbols: List[str]) -> np.ndarray:
+    """按 symbols 顺序取市值，缺失为 NaN（供面板向量化计算使用）"""
+    return np.array(
+        [infos[s]['market_cap'] if s in infos else np.nan for s in symbols],
+        dtype=np.float64
+    )
+
+
+def market_cap_panel(symbols: List[str], dates: np.ndarray) -> np.ndarray:
+    """
+    按日取值的市值面板：每个日期取该日及之前最近一次快照的市值（point-in-time，回测无前视）
+
+    Args:
+        symbols: 股票代码
+        dates: 升序日期（datetime64）
+
+    Returns:
+        形状 (len(symbols), len(dates)) 的数组，该日之前没有快照时为 NaN
+    """
+    dates = np.asarray(dates).astype('datetime64[D]')
+    result = np.full((len(symbols), len(dates)), np.nan)
+    if not len(symbols) or not len(dates):
+        return result
+    table = StockInfoSnapshot._meta.table_name
+    rows = database.execute_sql(
+        f"SELECT symbol, date, market_cap FROM {table} WHERE date <= ? AND market_cap IS NOT NULL",
+        (str(dates[-1]),)
+    ).fetchall()
+    position = {symbol: i for i, symbol in enumerate(symbols)}
+    rows = [row for row in rows if row[0] in position]
+    if not rows:
+        return result
+
+    frame = pd.DataFrame(rows, columns=['symbol', 'date', 'market_cap'])
+    wide = frame.pivot(index='date', columns='symbol', values='market_cap').sort_index().ffill()
+    snapshot_dates = pd.DatetimeIndex(wide.index).values.astype('datetime64[D]')
+    latest = np.searchsorted(snapshot_dates, dates, side='right') - 1
+    known = latest >= 0
+    columns = [position[symbol] for symbol in wide.columns]
+    result[np.ix_(columns, np.flatnonzero(known))] = wide.to_numpy().T[:, latest[known]]
+    return result
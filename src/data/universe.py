@@ -0,0 +1,203 @@
+"""
+指数成分股（股票池）管理模块
+
+每次从网络获取的成分股列表按日期保存为快照（<index>_<YYYYMMDD>.json），读取时使用最新快照：
+快照超过有效期时返回旧快照并在后台线程刷新，网络不可用时继续使用最后一份快照，
+只有本地没有任何快照时才同步等待网络。成员判断基于 frozenset。
+"""
+import datetime as dt
+import json
+import pathlib
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+from ..utils import logging
+from ..utils import third_api
+
+logger = logging.get_logger(__name__)
+
+DEFAULT_UNIVERSE_DIR = pathlib.Path(__file__).resolve().parent / 'universe'
+
+# 指数名 -> 成分股获取函数（失败时返回空列表）
+INDEX_FETCHERS: Dict[str, Callable[[], List[str]]] = {
+    'nasdaq100': third_api.get_nasdaq_companies,
+    'sp500': third_api.get_sp500_companies,
+}
+
+DEFAULT_INDEXES = ('nasdaq100', 'sp500')
+
+
+class UniverseSnapshot(NamedTuple):
+    """某一日的指数成分股快照"""
+    index: str
+    as_of: dt.date
+    fetched_at: dt.datetime
+    symbols: FrozenSet[str]
+    ordered: tuple          # 保留数据源顺序的成分股
+
+
+class UniverseManager:
+    """指数成分股快照管理器（线程安全）"""
+
+    def __init__(
+        self,
+        universe_dir: pathlib.Path = None,
+        ttl_hours: float = 24.0,
+        fetchers: Dict[str, Callable[[], List[str]]] = None
+    ):
+        """
+        初始化
+
+        Args:
+            universe_dir: 快照目录，默认 src/data/universe
+            ttl_hours: 快照有效期（小时）
+            fetchers: 指数名到成分股获取函数的映射，默认 INDEX_FETCHERS
+        """
+        self.universe_dir = pathlib.Path(universe_dir) if universe_dir is not None else DEFAULT_UNIVERSE_DIR
+        self.ttl = dt.timedelta(hours=ttl_hours)
+        self.fetchers = fetchers if fetchers is not None else dict(INDEX_FETCHERS)
+        self.snapshots: Dict[str, UniverseSnapshot] = {}
+        self.refreshing: Dict[str, threading.Thread] = {}
+        self.lock = threading.Lock()
+
+    def configure(self, universe_dir: pathlib.Path, ttl_hours: float) -> None:
+        """修改快照目录与有效期，清空内存中的快照"""
+        with self.lock:
+            self.universe_dir = pathlib.Path(universe_dir)
+            self.ttl = dt.timedelta(hours=ttl_hours)
+            self.snapshots.clear()
+
+    def get_snapshot(self, index: str) -> Optional[UniverseSnapshot]:
+        """
+        获取指数的最新快照
+
+        快照过期时立即返回旧快照并启动后台刷新；本地无快照时同步获取。
+
+        Returns:
+            快照，本地无快照且网络获取失败时返回 None
+        """
+        snapshot = self._latest(index)
+        if snapshot is None:
+            return self.refresh(index)
+        if dt.datetime.now() - snapshot.fetched_at > self.ttl:
+            self.refresh_in_background(index)
+        return snapshot
+
+    def get_symbols(self, indexes: Iterable[str] = DEFAULT_INDEXES) -> List[str]:
+        """获取多个指数成分股的并集，按指数顺序与数据源顺序去重"""
+        symbols: Dict[str, None] = {}
+        for index in indexes:
+            snapshot = self.get_snapshot(index)
+            if snapshot is not None:
+                symbols.update(dict.fromkeys(snapshot.ordered))
+        return list(symbols)
+
+    def members(self, index: str) -> FrozenSet[str]:
+        """获取指数的成分股集合"""
+        snapshot = self.get_snapshot(index)
+        return snapshot.symbols if snapshot is not None else frozenset()
+
+    def is_member(self, index: str, symbol: str) -> bool:
+        """判断股票是否属于指数"""
+        return symbol in self.members(index)
+
+    def refresh(self, index: str) -> Optional[UniverseSnapshot]:
+        """
+        从网络获取成分股并保存为当日快照
+
+        Returns:
+            新快照；获取失败时返回已有的最新快照（可能为 None）
+        """
+        fetcher = self.fetchers.get(index)
+        if fetcher is None:
+            raise ValueError(f"未知指数: {index}")
+        try:
+            symbols = fetcher()
+        except Exception as e:
+            logger.error(f"获取 {index} 成分股失败: {e}")
+            symbols = []
+        if not symbols:
+            logger.warning(f"{index} 成分股获取失败，继续使用本地快照")
+            return self._latest(index)
+
+        now = dt.datetime.now()
+        ordered = tuple(dict.fromkeys(symbols))
+        snapshot = UniverseSnapshot(index, now.date(), now, frozenset(ordered), ordered)
+        self._save(snapshot)
+        with self.lock:
+            self.snapshots[index] = snapshot
+        logger.info(f"{index} 成分股快照已更新: {len(ordered)} 只")
+        return snapshot
+
+    def refresh_in_background(self, index: str) -> None:
+        """在后台线程刷新快照，同一指数同时只有一个刷新线程"""
+        with self.lock:
+            thread = self.refreshing.get(index)
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(target=self.refresh, args=(index,), name=f'universe-{index}')
+            self.refreshing[index] = thread
+        thread.start()
+
+    def list_snapshots(self, index: str) -> List[dt.date]:
+        """列出本地保存的快照日期（升序）"""
+        dates = []
+        for path in self.universe_dir.glob(f'{index}_*.json'):
+            try:
+                dates.append(dt.datetime.strptime(path.stem.rsplit('_', 1)[1], '%Y%m%d').date())
+            except ValueError:
+                continue
+        return sorted(dates)
+
+    def load_snapshot(self, index: str, as_of: dt.date) -> Optional[UniverseSnapshot]:
+        """读取指定日期的快照"""
+        path = self._snapshot_path(index, as_of)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        ordered = tuple(payload['symbols'])
+        return UniverseSnapshot(
+            index=index,
+            as_of=as_of,
+            fetched_at=dt.datetime.fromisoformat(payload['fetched_at']),
+            symbols=frozenset(ordered),
+            ordered=ordered,
+        )
+
+    def _latest(self, index: str) -> Optional[UniverseSnapshot]:
+        """内存中的最新快照，没有时从磁盘读取最后一份"""
+        with self.lock:
+            snapshot = self.snapshots.get(index)
+        if snapshot is not None:
+            return snapshot
+        dates = self.list_snapshots(index)
+        if not dates:
+            return None
+        snapshot = self.load_snapshot(index, dates[-1])
+        with self.lock:
+            current = self.snapshots.get(index)
+            if current is None or current.fetched_at < snapshot.fetched_at:
+                self.snapshots[index] = snapshot
+            return self.snapshots[index]
+
+    def _save(self, snapshot: UniverseSnapshot) -> None:
+        """保存快照（先写临时文件再替换，避免读到半个文件）"""
+        self.universe_dir.mkdir(parents=True, exist_ok=True)
+        path = self._snapshot_path(snapshot.index, snapshot.as_of)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'index': snapshot.index,
+                'as_of': snapshot.as_of.isoformat(),
+                'fetched_at': snapshot.fetched_at.isoformat(),
+                'symbols': list(snapshot.ordered),
+            }, f)
+        tmp.replace(path)
+
+    def _snapshot_path(self, index: str, as_of: dt.date) -> pathlib.Path:
+        """快照文件路径"""
+        return self.universe_dir / f'{index}_{as_of:%Y%m%d}.json'
+
+
+universe_manager = UniverseManager()
@@ -5,15 +5,41 @@ import argparse
 import pathlib
 from typing import Dict, Any
 
+from .config import settings
+from .utils import logging
+
+logger = logging.get_logger(__name__)
+
+DEFAULT_CONFIG_PATH = pathlib.Path(__file__).resolve().parent / "config" / "config.toml"
+
 
 def main() -> None:
     """应用主入口"""
-    pass
+    args = parse_args()
+    config = settings.load_config(pathlib.Path(args.config))
+    init_storage(config)
+    if args.mode == 'monitor':
+        run_in_monitor_mode(config)
+    elif args.mode == 'backtest':
+        run_in_backtest_mode(config)
+    else:
+        run_in_analysis_mode(config)
 
 
 def parse_args() -> argparse.Namespace:
     """解析命令行参数"""
-    pass
+    parser = argparse.ArgumentParser(description='stock_trade')
+    parser.add_argument('--mode', choices=['monitor', 'backtest', 'analysis'], default='monitor',
+                        help='运行模式')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_PATH), help='配置文件路径')
+    return parser.parse_args()
+
+
+def init_storage(config: Dict[str, Any]) -> None:
+    """按存储配置初始化数据库与历史数据缓存，各运行模式共用"""
+    from .data import db_operations
+
+    db_operations.init_from_config(settings.get_storage_config(config))
 
 
 def run_in_monitor_mode(config: Dict[str, Any]) -> None:
@@ -23,7 +49,34 @@ def run_in_monitor_mode(config: Dict[str, Any]) -> None:
 
 def run_in_backtest_mode(config: Dict[str, Any]) -> None:
     """回测模式运行"""
-    pass
+    from .backtest import vectorized
+    from .data import membership, panel_store, stock_info
+
+    strategy_config = settings.get_strategy_config(config)
+    backtest_config = settings.get_backtest_config(config)
+    storage_config = settings.get_storage_config(config)
+
+    panel = panel_store.open_panel(storage_config.panel_dir)
+    if panel is None:
+        logger.error(f"行情面板不存在: {storage_config.panel_dir}，请先运行持久化任务")
+        return
+
+    # 按日取值的市值与成分股掩码，避免前视与幸存者偏差
+    market_caps = stock_info.market_cap_panel(panel.symbols, panel.dates)
+    tradable = None
+    if backtest_config.universe_index:
+        tradable = membership.membership_mask(backtest_config.universe_index, panel.symbols, panel.dates)
+
+    result = vectorized.run_backtest(panel, strategy_config, backtest_config, market_caps, tradable)
+    logger.info(f"回测完成: {len(result.trades)} 笔交易")
+
+    output_dir = pathlib.Path(backtest_config.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    result.trades.to_csv(output_dir / 'trades.csv', index=False)
+    result.equity.to_csv(output_dir / 'equity.csv')
+    for name, value in result.metrics.items():
+        logger.info(f"  {name}: {value:.4f}" if isinstance(value, float) else f"  {name}: {value}")
+    logger.info(f"回测报告已保存: {output_dir}")
 
 
 def run_in_analysis_mode(config: Dict[str, Any]) -> None:
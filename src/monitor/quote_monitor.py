@@ -1,10 +1,37 @@
 """
 行情监控模块
+
+基于 asyncio 的行情拉取：每轮（sweep）把股票列表分批，在并发上限内同时拉取各批次，
+结果放入有界队列，由消费者协程依次交给回调处理。队列满时拉取协程阻塞，形成背压。
+一轮结束（全部批次拉取完成且回调处理完毕）后才安排下一轮，两轮不会重叠。
 """
-from typing import List, Dict, Any, Callable
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Callable, NamedTuple, Optional
 
 from ..types.common import OHLCData
 from ..config.settings import MonitorConfig
+from ..data import market_data
+from ..utils import logging
+
+logger = logging.get_logger(__name__)
+
+# 模块级函数使用的默认批次大小
+DEFAULT_BATCH_SIZE = 500
+
+_monitor: Optional['QuoteMonitor'] = None
+
+
+class SweepStats(NamedTuple):
+    """单轮行情拉取统计"""
+    started_at: datetime
+    latency: float      # 秒，含回调处理时间
+    n_batches: int
+    n_failed: int
+    n_quotes: int
 
 
 def start_quote_monitor(
@@ -13,12 +40,13 @@ def start_quote_monitor(
     on_data_received: Callable[[Dict[str, OHLCData]], None]
 ) -> None:
     """启动行情监控"""
-    pass
+    fetch_quotes_in_loop(stocks, interval, on_data_received)
 
 
 def stop_quote_monitor() -> None:
     """停止行情监控"""
-    pass
+    if _monitor is not None:
+        _monitor.stop()
 
 
 def fetch_quotes_in_loop(
@@ -26,8 +54,11 @@ def fetch_quotes_in_loop(
     interval: int,
     callback: Callable
 ) -> None:
-    """循环获取行情"""
-    pass
+    """循环获取行情（阻塞直到 stop_quote_monitor 被调用）"""
+    global _monitor
+    _monitor = QuoteMonitor(MonitorConfig(interval=interval, stocks=stocks, batch_size=DEFAULT_BATCH_SIZE))
+    _monitor.add_callback('data', callback)
+    _monitor.start()
 
 
 def split_stocks_into_batches(
@@ -35,34 +66,149 @@ def split_stocks_into_batches(
     batch_size: int
 ) -> List[List[str]]:
     """将股票列表分批"""
-    pass
+    return [stocks[i:i + batch_size] for i in range(0, len(stocks), batch_size)]
 
 
 class QuoteMonitor:
     """行情监控器"""
 
-    def __init__(self, config: MonitorConfig):
-        """初始化"""
+    def __init__(
+        self,
+        config: MonitorConfig,
+        fetcher: Callable[[List[str]], Dict[str, OHLCData]] = None
+    ):
+        """
+        初始化
+
+        Args:
+            config: 监控配置
+            fetcher: 单批次行情拉取函数（阻塞），默认 market_data.fetch_ohlc_batch
+        """
         self.config = config
         self.is_running = False
         self.callbacks = {}
+        self.fetcher = fetcher or market_data.fetch_ohlc_batch
+        self.sweep_stats = deque(maxlen=144)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
 
     def start(self) -> None:
-        """启动监控"""
-        pass
+        """启动监控（阻塞直到 stop() 被调用）"""
+        asyncio.run(self.run())
 
     def stop(self) -> None:
-        """停止监控"""
-        pass
+        """停止监控，可从其他线程调用"""
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
 
     def add_callback(
         self,
         event: str,
         callback: Callable
     ) -> None:
-        """添加回调函数"""
-        pass
+        """
+        添加回调函数
+
+        Args:
+            event: 'data' 接收每个批次的 Dict[str, OHLCData]；'sweep' 接收每轮的 SweepStats
+            callback: 普通函数或协程函数
+        """
+        self.callbacks.setdefault(event, []).append(callback)
 
     def is_running(self) -> bool:
         """判断是否运行中"""
         return self.is_running
+
+    async def run(self) -> None:
+        """按配置的间隔循环执行拉取，直到 stop() 被调用"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self.is_running = True
+        interval = self.config.interval * 60
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.queue_size)
+        consumer = asyncio.create_task(self._consume(queue))
+        executor = ThreadPoolExecutor(max_workers=self.config.max_concurrency)
+        logger.info(f"行情监控启动: {len(self.config.stocks)} 只股票, 间隔 {self.config.interval} 分钟")
+
+        try:
+            while not self._stop_event.is_set():
+                stats = await self.sweep(queue, executor)
+                if stats.latency > interval:
+                    logger.warning(f"本轮耗时 {stats.latency:.1f}s 超过间隔 {interval}s，下一轮立即开始")
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=max(0.0, interval - stats.latency))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            consumer.cancel()
+            executor.shutdown(wait=False)
+            self.is_running = False
+            logger.info("行情监控已停止")
+
+    async def sweep(
+        self,
+        queue: asyncio.Queue,
+        executor: Optional[ThreadPoolExecutor] = None
+    ) -> SweepStats:
+        """
+        执行一轮拉取：并发拉取全部批次，等待队列中的结果全部被回调处理
+
+        Args:
+            queue: 行情队列（有界）
+            executor: 执行阻塞拉取的线程池，默认使用事件循环的默认线程池
+
+        Returns:
+            本轮统计
+        """
+        loop = asyncio.get_running_loop()
+        started_at = datetime.now()
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        batches = split_stocks_into_batches(self.config.stocks, self.config.batch_size)
+
+        async def fetch(batch: List[str]) -> Optional[int]:
+            async with semaphore:
+                try:
+                    quotes = await loop.run_in_executor(executor, self.fetcher, batch)
+                except Exception as e:
+                    logger.error(f"拉取批次失败（{batch[0]} 等 {len(batch)} 只）: {e}")
+                    return None
+                # 在信号量内入队：队列满时占住并发名额，暂停后续拉取
+                await queue.put(quotes)
+                return len(quotes)
+
+        results = await asyncio.gather(*(fetch(batch) for batch in batches))
+        await queue.join()
+
+        stats = SweepStats(
+            started_at=started_at,
+            latency=time.perf_counter() - start,
+            n_batches=len(batches),
+            n_failed=sum(1 for r in results if r is None),
+            n_quotes=sum(r for r in results if r),
+        )
+        self.sweep_stats.append(stats)
+        logger.info(f"本轮行情拉取完成: {stats.n_quotes} 条, 失败批次 {stats.n_failed}/{stats.n_batches}, "
+                    f"耗时 {stats.latency:.2f}s")
+        await self._dispatch('sweep', stats)
+        return stats
+
+    async def _consume(self, queue: asyncio.Queue) -> None:
+        """从队列取出行情交给回调"""
+        while True:
+            quotes = await queue.get()
+            try:
+                await self._dispatch('data', quotes)
+            finally:
+                queue.task_done()
+
+    async def _dispatch(self, event: str, payload: Any) -> None:
+        """调用事件回调，单个回调异常不影响其他回调"""
+        for callback in self.callbacks.get(event, []):
+            try:
+                result = callback(payload)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.exception(f"回调处理失败 ({event}): {e}")
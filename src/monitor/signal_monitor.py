@@ -1,11 +1,28 @@
 """
 信号监控模块
 """
-from typing import List, Callable
+import datetime as dt
+from typing import List, Callable, Dict, Optional
+import numpy as np
+import pandas as pd
 
 from ..strategy.base import BaseStrategy
+from ..strategy.incremental import IndicatorState
+from ..strategy.parallel_screening import screen_universe
+from ..strategy.screening import prefilter_by_ma_distance
+from ..strategy.signals import TriggerLevels, compute_trigger_levels, find_trigger_candidates, \
+    generate_signals_frame, signals_to_dicts
 from ..notification.base import BaseNotifier
-from ..types.common import TradingSignal
+from ..data.panel_store import OHLCVPanel, PANEL_FIELDS
+from ..data.market_data import StockInfo
+from ..data import db_operations, stock_info
+from ..types.common import TradingSignal, OHLCData
+from ..utils import logging
+
+logger = logging.get_logger(__name__)
+
+# 面板中没有的股票从数据库加载日线时的回看自然日数（覆盖 MA120 与 MACD / RSI 预热）
+DB_HISTORY_DAYS = 365
 
 
 def start_signal_monitor(
@@ -58,6 +75,71 @@ class SignalMonitor:
         self.config = config
         self.is_running = False
         self.signal_filters = []
+        self.panel: Optional[OHLCVPanel] = None
+        self.trigger_levels: Optional[TriggerLevels] = None
+        self.symbol_index: Dict[str, int] = {}
+        self.trigger_index: Optional[pd.Index] = None
+        self.history_end = 0    # 面板中 as_of 之前的日线列数（增量指标的初始化范围）
+        self.indicator_states: Dict[str, IndicatorState] = {}
+        self.latest_quotes: Dict[str, OHLCData] = {}
+        self.stock_infos: Dict[str, StockInfo] = {}
+        self.screen_results: Optional[pd.DataFrame] = None
+
+    def prepare_day(
+        self,
+        panel: OHLCVPanel,
+        as_of: Optional[np.datetime64] = None,
+        stock_infos: Optional[Dict[str, StockInfo]] = None
+    ) -> None:
+        """
+        开盘前预计算当日触发价位，并预加载股票信息（市值）供筛选使用
+
+        Args:
+            panel: 行情面板（日线历史）
+            as_of: 交易日，默认为面板最后一日之后
+            stock_infos: 股票信息，默认从数据库读取最新快照
+        """
+        self.panel = panel
+        self.symbol_index = panel.symbol_index()
+        self.stock_infos = stock_infos if stock_infos is not None else stock_info.load_latest_stock_info(panel.symbols)
+        market_caps = stock_info.market_cap_array(self.stock_infos, panel.symbols)
+        self.trigger_levels = compute_trigger_levels(panel, self.config, as_of, market_caps)
+        self.trigger_index = pd.Index(self.trigger_levels.symbols)
+        self.history_end = len(panel.dates) if as_of is None else \
+            int(np.searchsorted(panel.dates, np.datetime64(as_of, 'D')))
+        self.indicator_states = {}
+        logger.info(f"触发价位预计算完成: {len(self.symbol_index)} 只股票")
+
+    def screen(
+        self,
+        as_of: Optional[np.datetime64] = None,
+        max_workers: Optional[int] = None,
+        prefilter: bool = True
+    ) -> pd.DataFrame:
+        """
+        对面板中的股票并行执行综合筛选（需先调用 prepare_day）
+
+        Args:
+            as_of: 判断日，默认面板最后一日
+            max_workers: 进程数
+            prefilter: 是否先在数据库中按 MA 偏离预过滤，只筛选幸存者（也只有幸存者的日线发布到共享内存）
+
+        Returns:
+            以 symbol 为索引，列 passed / reason
+        """
+        symbols = self.panel.symbols
+        if prefilter:
+            day = pd.Timestamp(as_of).date() if as_of is not None else None
+            symbols = prefilter_by_ma_distance(symbols, self.config, self.stock_infos, day)
+            logger.info(f"数据库预过滤: {len(symbols)}/{len(self.panel.symbols)} 只进入筛选")
+        market_caps = stock_info.market_cap_array(self.stock_infos, self.panel.symbols)
+        self.screen_results = screen_universe(self.panel, self.config, as_of, market_caps, symbols,
+                                              max_workers=max_workers)
+        return self.screen_results
+
+    def on_quotes(self, quotes: Dict[str, OHLCData]) -> None:
+        """接收行情回调，缓存最新行情"""
+        self.latest_quotes.update(quotes)
 
     def start(self) -> None:
         """启动监控"""
@@ -67,13 +149,110 @@ class SignalMonitor:
         """停止监控"""
         pass
 
-    def run_once(self) -> List[TradingSignal]:
-        """执行一次检查"""
-        pass
+    def run_once(self, quotes: Optional[Dict[str, OHLCData]] = None) -> List[TradingSignal]:
+        """
+        执行一次检查
+
+        先用预计算的触发价位向量化筛出越过价位的股票，只对这些股票执行完整的 strategy.analyze。
+        候选股票不在行情面板中时（如未调用 prepare_day），一次批量查询从数据库加载它们的日线。
+
+        Args:
+            quotes: 最新行情，默认使用 on_quotes 缓存的行情
+
+        Returns:
+            通过过滤器的信号列表
+        """
+        quotes = quotes if quotes is not None else self.latest_quotes
+        if not quotes:
+            return []
+
+        if self.trigger_levels is None:
+            logger.warning("未预计算触发价位，将对全部股票执行分析")
+            candidates = list(quotes)
+        else:
+            candidates = find_trigger_candidates(self.trigger_levels, quotes, self.trigger_index)
+        logger.info(f"本轮候选股票 {len(candidates)}/{len(quotes)}")
+
+        histories = self._load_histories([s for s in candidates if s not in self.symbol_index], quotes)
+        signals = []
+        for symbol in candidates:
+            data = self._build_data(symbol, quotes[symbol], histories.get(symbol))
+            signal = self.strategy.analyze(symbol, data)
+            if signal:
+                snapshot = self.peek_indicators(symbol, quotes[symbol]['close'])
+                signal['indicators'] = {**snapshot, **(signal.get('indicators') or {})}
+            if signal and all(f(signal) for f in self.signal_filters):
+                signals.append(signal)
+        return signals
+
+    def peek_indicators(self, symbol: str, price: float) -> Dict[str, float]:
+        """
+        以盘中临时价格评估该股票的均线、布林带、RSI、MACD（O(1)，不修改已提交状态）
+
+        增量状态在当日首次用到该股票时由 as_of 之前的日线初始化，之后每次行情刷新只做一步递推。
+
+        Args:
+            symbol: 股票代码
+            price: 盘中最新价
+
+        Returns:
+            指标快照；股票不在面板中时返回空字典
+        """
+        state = self.indicator_states.get(symbol)
+        if state is None:
+            if self.panel is None or symbol not in self.symbol_index:
+                return {}
+            close = self.panel.field('close')[self.symbol_index[symbol], :self.history_end]
+            state = self.indicator_states[symbol] = IndicatorState.from_history(close, self.config)
+        return state.peek(price)
+
+    def run_batch(self, quotes: Optional[Dict[str, OHLCData]] = None) -> List[TradingSignal]:
+        """
+        批量执行一次检查：以最新行情为当日临时 K 线，一次向量化计算全部股票的全部信号类型
+
+        Args:
+            quotes: 最新行情，默认使用 on_quotes 缓存的行情
+
+        Returns:
+            通过过滤器的信号列表（同一股票同时出现多个信号时全部返回，优先级高的在前）
+        """
+        quotes = quotes if quotes is not None else self.latest_quotes
+        if not quotes or self.panel is None:
+            return []
+        market_caps = stock_info.market_cap_array(self.stock_infos, self.panel.symbols)
+        frame = generate_signals_frame(self.panel, self.config, market_caps=market_caps, quotes=quotes)
+        logger.info(f"本轮批量信号 {len(frame)} 个（{len(quotes)} 只股票）")
+        return [signal for signal in signals_to_dicts(frame) if all(f(signal) for f in self.signal_filters)]
 
     def add_signal_filter(
         self,
         filter_func: Callable[[TradingSignal], bool]
     ) -> None:
         """添加信号过滤器"""
-        pass
+        self.signal_filters.append(filter_func)
+
+    def _load_histories(self, symbols: List[str], quotes: Dict[str, OHLCData]) -> Dict[str, pd.DataFrame]:
+        """
+        单次查询从数据库加载多只股票最近 DB_HISTORY_DAYS 天的日线
+
+        Returns:
+            symbol -> 以日期为索引、列为 PANEL_FIELDS 的 DataFrame；数据库中没有数据的股票不在结果中
+        """
+        if not symbols:
+            return {}
+        latest = max(pd.Timestamp(quotes[s]['timestamp']) for s in symbols).date()
+        frame = db_operations.get_stocks_history_frame(symbols, start_date=latest - dt.timedelta(days=DB_HISTORY_DAYS))
+        frame = frame.astype({'volume': np.float64}).set_index('date')
+        return {symbol: group[list(PANEL_FIELDS)] for symbol, group in frame.groupby('symbol', sort=False)}
+
+    def _build_data(self, symbol: str, quote: OHLCData, history: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """拼接日线历史与当日临时K线，history 为空时从行情面板取"""
+        bar = pd.DataFrame(
+            [{field: quote[field] for field in PANEL_FIELDS}],
+            index=pd.DatetimeIndex([pd.Timestamp(quote['timestamp']).normalize()], name='date'),
+        )
+        if history is None:
+            if self.panel is None or symbol not in self.symbol_index:
+                return bar
+            history = self.panel.to_frame(self.symbol_index[symbol])
+        return pd.concat([history[history.index < bar.index[0]], bar])
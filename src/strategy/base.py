@@ -28,7 +28,7 @@ class BaseStrategy(ABC):
 
     @abstractmethod
     def calculate_position_size(self, signal: TradingSignal, capital: float) -> float:
-        """计算仓位大小"""
+        """计算仓位大小（投入金额）"""
         pass
 
 
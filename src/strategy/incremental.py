@@ -0,0 +1,414 @@
+"""
+增量指标计算模块
+
+为盘中行情提供 O(1) 的指标更新：先用已存储的日线历史初始化状态，
+收盘后用 update() 提交日线，盘中用 peek() 以临时价格评估当日指标而不修改已提交状态。
+
+递推公式与 indicators 模块的面板内核一致：EMA/RSI/MACD 与 calculate_* 结果逐元素相同，
+SMA/标准差使用滚动和与 Welford 递推，与全量计算在浮点误差范围内一致。
+缺失值（NaN）按与 calculate_* 相同的语义处理：含 NaN 的滚动窗口结果为 NaN；
+EMA 在 NaN 处沿用上一值，并在下一个有效值到来时按间隔衰减旧值权重（pandas ignore_na=False）。
+"""
+import math
+from collections import deque
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+import pandas as pd
+
+NAN = float('nan')
+
+
+class RollingStats(NamedTuple):
+    """滚动窗口统计值"""
+    mean: float
+    std: float
+
+
+class BandValue(NamedTuple):
+    """布林带单点取值"""
+    upper: float
+    middle: float
+    lower: float
+
+
+class MACDValue(NamedTuple):
+    """MACD单点取值"""
+    macd: float
+    signal: float
+    histogram: float
+
+
+class IncrementalSMA:
+    """增量简单移动平均"""
+
+    def __init__(self, period: int):
+        """初始化"""
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0    # 窗口内有效值之和
+        self.n_missing = 0  # 窗口内 NaN 个数
+
+    @classmethod
+    def from_history(cls, data: Iterable[float], period: int) -> 'IncrementalSMA':
+        """用历史收盘价初始化"""
+        indicator = cls(period)
+        for value in _floats(data):
+            indicator.update(value)
+        return indicator
+
+    @property
+    def value(self) -> float:
+        """当前已提交的均值"""
+        return self._mean(len(self.window), self.n_missing, self.total)
+
+    def update(self, value: float) -> float:
+        """提交一个新值"""
+        if len(self.window) == self.period:
+            self._remove(self.window[0])
+        self.window.append(value)
+        if math.isnan(value):
+            self.n_missing += 1
+        else:
+            self.total += value
+        return self.value
+
+    def peek(self, value: float) -> float:
+        """以临时值评估，不修改状态"""
+        size, n_missing, total = len(self.window), self.n_missing, self.total
+        if size == self.period:
+            outgoing = self.window[0]
+            size -= 1
+            if math.isnan(outgoing):
+                n_missing -= 1
+            else:
+                total -= outgoing
+        if math.isnan(value):
+            n_missing += 1
+        else:
+            total += value
+        return self._mean(size + 1, n_missing, total)
+
+    def _remove(self, outgoing: float) -> None:
+        """移出窗口中最旧的值"""
+        if math.isnan(outgoing):
+            self.n_missing -= 1
+        else:
+            self.total -= outgoing
+
+    def _mean(self, size: int, n_missing: int, total: float) -> float:
+        """窗口未满或含 NaN 时返回 NaN"""
+        return total / self.period if size == self.period and n_missing == 0 else NAN
+
+
+class IncrementalEMA:
+    """增量指数移动平均（adjust=False）"""
+
+    def __init__(self, period: int = None, alpha: float = None, min_periods: int = None):
+        """初始化，period 与 alpha 二选一"""
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1)
+        self.min_periods = min_periods if min_periods is not None else period
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    @classmethod
+    def from_history(cls, data: Iterable[float], period: int) -> 'IncrementalEMA':
+        """用历史收盘价初始化"""
+        indicator = cls(period)
+        for value in _floats(data):
+            indicator.update(value)
+        return indicator
+
+    @property
+    def value(self) -> float:
+        """当前已提交的均值"""
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+    def update(self, value: float) -> float:
+        """提交一个新值（NaN 只衰减旧值权重）"""
+        self.weighted, self.old_wt = self._next(value)
+        self.nobs += not math.isnan(value)
+        return self.value
+
+    def peek(self, value: float) -> float:
+        """以临时值评估，不修改状态"""
+        nobs = self.nobs + (not math.isnan(value))
+        return self._next(value)[0] if nobs >= self.min_periods else NAN
+
+    def _next(self, value: float) -> Tuple[float, float]:
+        """递推一步，返回 (weighted, old_wt)（与 indicators._ewm_mean 相同的运算顺序）"""
+        if math.isnan(self.weighted):
+            return value, self.old_wt
+        old_wt = self.old_wt * (1.0 - self.alpha)
+        if math.isnan(value):
+            return self.weighted, old_wt
+        if self.weighted == value:
+            return self.weighted, 1.0
+        return (old_wt * self.weighted + self.alpha * value) / (old_wt + self.alpha), 1.0
+
+
+class IncrementalStd:
+    """增量滚动标准差（Welford 递推，总体标准差 ddof=0）"""
+
+    def __init__(self, period: int):
+        """初始化"""
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.count = 0      # 窗口内有效值个数（NaN 占位但不参与 Welford 递推）
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @classmethod
+    def from_history(cls, data: Iterable[float], period: int) -> 'IncrementalStd':
+        """用历史收盘价初始化"""
+        indicator = cls(period)
+        for value in _floats(data):
+            indicator.update(value)
+        return indicator
+
+    @property
+    def value(self) -> RollingStats:
+        """当前已提交的均值与标准差"""
+        return self._stats(self.count, self.mean, self.m2)
+
+    def update(self, value: float) -> RollingStats:
+        """提交一个新值"""
+        outgoing = self.window[0] if len(self.window) == self.period else None
+        self.count, self.mean, self.m2 = self._next(outgoing, value)
+        self.window.append(value)
+        return self._stats(self.count, self.mean, self.m2)
+
+    def peek(self, value: float) -> RollingStats:
+        """以临时值评估，不修改状态"""
+        outgoing = self.window[0] if len(self.window) == self.period else None
+        return self._stats(*self._next(outgoing, value))
+
+    def _next(self, outgoing: float, value: float) -> Tuple[int, float, float]:
+        """移出最旧值（窗口已满时）并加入新值，返回 (有效值个数, mean, m2)"""
+        n, mean, m2 = self.count, self.mean, self.m2
+        if outgoing is not None and not math.isnan(outgoing):
+            n -= 1
+            if n == 0:
+                mean, m2 = 0.0, 0.0
+            else:
+                delta = outgoing - mean
+                mean -= delta / n
+                m2 -= delta * (outgoing - mean)
+        if not math.isnan(value):
+            n += 1
+            delta = value - mean
+            mean += delta / n
+            m2 += delta * (value - mean)
+        return n, mean, m2
+
+    def _stats(self, n: int, mean: float, m2: float) -> RollingStats:
+        """窗口未满或含 NaN（有效值不足 period 个）时返回 NaN"""
+        if n < self.period:
+            return RollingStats(NAN, NAN)
+        return RollingStats(mean, math.sqrt(max(m2, 0.0) / n))
+
+
+class IncrementalBollinger:
+    """增量布林带"""
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        """初始化"""
+        self.std_dev = std_dev
+        self.stats = IncrementalStd(period)
+
+    @classmethod
+    def from_history(cls, data: Iterable[float], period: int = 20, std_dev: float = 2.0) -> 'IncrementalBollinger':
+        """用历史收盘价初始化"""
+        indicator = cls(period, std_dev)
+        for value in _floats(data):
+            indicator.update(value)
+        return indicator
+
+    @property
+    def value(self) -> BandValue:
+        """当前已提交的布林带"""
+        return self._bands(self.stats.value)
+
+    def update(self, value: float) -> BandValue:
+        """提交一个新值"""
+        return self._bands(self.stats.update(value))
+
+    def peek(self, value: float) -> BandValue:
+        """以临时值评估，不修改状态"""
+        return self._bands(self.stats.peek(value))
+
+    def _bands(self, stats: RollingStats) -> BandValue:
+        """均值与标准差换算为上中下轨"""
+        return BandValue(
+            upper=stats.mean + self.std_dev * stats.std,
+            middle=stats.mean,
+            lower=stats.mean - self.std_dev * stats.std,
+        )
+
+
+class IncrementalRSI:
+    """增量RSI（Wilder 平滑）"""
+
+    def __init__(self, period: int = 14):
+        """初始化"""
+        self.prev_close = NAN
+        self.started = False    # 是否已有第一根 K 线（之后每根 K 线都产生一个涨跌幅）
+        self.avg_gain = IncrementalEMA(alpha=1.0 / period, min_periods=period)
+        self.avg_loss = IncrementalEMA(alpha=1.0 / period, min_periods=period)
+
+    @classmethod
+    def from_history(cls, data: Iterable[float], period: int = 14) -> 'IncrementalRSI':
+        """用历史收盘价初始化"""
+        indicator = cls(period)
+        for value in _floats(data):
+            indicator.update(value)
+        return indicator
+
+    @property
+    def value(self) -> float:
+        """当前已提交的RSI"""
+        return _rsi(self.avg_gain.value, self.avg_loss.value)
+
+    def update(self, value: float) -> float:
+        """提交一个新收盘价（与前一日任一为 NaN 时涨跌幅为 NaN）"""
+        if self.started:
+            delta = value - self.prev_close
+            self.avg_gain.update(_clip(delta))
+            self.avg_loss.update(_clip(-delta))
+        self.started = True
+        self.prev_close = value
+        return self.value
+
+    def peek(self, value: float) -> float:
+        """以临时价格评估，不修改状态"""
+        if not self.started:
+            return NAN
+        delta = value - self.prev_close
+        return _rsi(self.avg_gain.peek(_clip(delta)), self.avg_loss.peek(_clip(-delta)))
+
+
+class IncrementalMACD:
+    """增量MACD"""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        """初始化"""
+        self.fast = IncrementalEMA(fast_period)
+        self.slow = IncrementalEMA(slow_period)
+        self.signal = IncrementalEMA(signal_period)
+
+    @classmethod
+    def from_history(
+        cls,
+        data: Iterable[float],
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9
+    ) -> 'IncrementalMACD':
+        """用历史收盘价初始化"""
+        indicator = cls(fast_period, slow_period, signal_period)
+        for value in _floats(data):
+            indicator.update(value)
+        return indicator
+
+    @property
+    def value(self) -> MACDValue:
+        """当前已提交的MACD"""
+        macd = self.fast.value - self.slow.value
+        return _macd(macd, self.signal.value)
+
+    def update(self, value: float) -> MACDValue:
+        """提交一个新收盘价"""
+        macd = self.fast.update(value) - self.slow.update(value)
+        return _macd(macd, self.signal.update(macd))
+
+    def peek(self, value: float) -> MACDValue:
+        """以临时价格评估，不修改状态"""
+        macd = self.fast.peek(value) - self.slow.peek(value)
+        return _macd(macd, self.signal.peek(macd))
+
+
+class IndicatorState:
+    """单只股票的增量指标集合（均线、布林带、RSI、MACD）"""
+
+    def __init__(self, ma_period: int = 120, bollinger_period: int = 20, bollinger_std: float = 2.0):
+        """初始化"""
+        self.sma = IncrementalSMA(ma_period)
+        self.bollinger = IncrementalBollinger(bollinger_period, bollinger_std)
+        self.rsi = IncrementalRSI()
+        self.macd = IncrementalMACD()
+
+    @classmethod
+    def from_history(cls, close: Iterable[float], config) -> 'IndicatorState':
+        """
+        用已存储的日线收盘价初始化
+
+        Args:
+            close: 按日期升序排列的收盘价
+            config: StrategyConfig，提供 ma_period / bollinger_period / bollinger_std
+
+        Returns:
+            IndicatorState
+        """
+        state = cls(config.ma_period, config.bollinger_period, config.bollinger_std)
+        for value in _floats(close):
+            state.update(value)
+        return state
+
+    def update(self, close: float) -> Dict[str, float]:
+        """提交一根日线"""
+        self.sma.update(close)
+        self.bollinger.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        return self.snapshot()
+
+    def peek(self, price: float) -> Dict[str, float]:
+        """以盘中临时价格评估全部指标，不修改已提交状态"""
+        return self._as_dict(
+            self.sma.peek(price),
+            self.bollinger.peek(price),
+            self.rsi.peek(price),
+            self.macd.peek(price),
+        )
+
+    def snapshot(self) -> Dict[str, float]:
+        """已提交状态下的全部指标"""
+        return self._as_dict(self.sma.value, self.bollinger.value, self.rsi.value, self.macd.value)
+
+    @staticmethod
+    def _as_dict(ma: float, bands: BandValue, rsi: float, macd: MACDValue) -> Dict[str, float]:
+        """组装指标快照"""
+        return {
+            'ma': ma,
+            'bollinger_upper': bands.upper,
+            'bollinger_middle': bands.middle,
+            'bollinger_lower': bands.lower,
+            'rsi': rsi,
+            'macd': macd.macd,
+            'macd_signal': macd.signal,
+            'macd_histogram': macd.histogram,
+        }
+
+
+def _floats(data: Iterable[float]) -> Iterable[float]:
+    """转换为 float，缺失值统一为 NaN（与 calculate_* 的输入一致，不跳过）"""
+    return (NAN if pd.isna(value) else float(value) for value in data)
+
+
+def _clip(delta: float) -> float:
+    """max(delta, 0)，NaN 保持为 NaN"""
+    return delta if math.isnan(delta) or delta > 0 else 0.0
+
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    """由平均涨跌幅计算RSI"""
+    if math.isnan(avg_gain) or math.isnan(avg_loss):
+        return NAN
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else NAN
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def _macd(macd: float, signal: float) -> MACDValue:
+    """组装MACD取值"""
+    return MACDValue(macd=macd, signal=signal, histogram=macd - signal)
@@ -1,8 +1,14 @@
 """
 技术指标计算模块
+
+逐序列函数（calculate_*）与面板函数（calculate_*_panel）共用同一组二维数组内核，
+面板函数一次性计算全部股票，结果与逐序列函数逐元素一致。
+面板数组形状为 (n_symbols, n_dates)，时间沿最后一维递增，缺失值为 NaN。
 """
+import numpy as np
 import pandas as pd
-from typing import NamedTuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import NamedTuple, Tuple
 
 
 class BollingerBands(NamedTuple):
@@ -19,12 +25,26 @@ class MACD(NamedTuple):
     histogram: pd.Series
 
 
+class BollingerBandsPanel(NamedTuple):
+    """布林带面板数据，形状 (n_symbols, n_dates)"""
+    upper: np.ndarray
+    middle: np.ndarray
+    lower: np.ndarray
+
+
+class MACDPanel(NamedTuple):
+    """MACD面板数据，形状 (n_symbols, n_dates)"""
+    macd: np.ndarray
+    signal: np.ndarray
+    histogram: np.ndarray
+
+
 def calculate_sma(
     data: pd.Series,
     period: int
 ) -> pd.Series:
     """计算简单移动平均线"""
-    pass
+    return _to_series(calculate_sma_panel(_to_panel(data), period), data)
 
 
 def calculate_ema(
@@ -32,7 +52,7 @@ def calculate_ema(
     period: int
 ) -> pd.Series:
     """计算指数移动平均线"""
-    pass
+    return _to_series(calculate_ema_panel(_to_panel(data), period), data)
 
 
 def calculate_bollinger_bands(
@@ -41,7 +61,8 @@ def calculate_bollinger_bands(
     std_dev: float = 2.0
 ) -> BollingerBands:
     """计算布林带"""
-    pass
+    bands = calculate_bollinger_bands_panel(_to_panel(data), period, std_dev)
+    return BollingerBands(*(_to_series(band, data) for band in bands))
 
 
 def calculate_rsi(
@@ -49,7 +70,7 @@ def calculate_rsi(
     period: int = 14
 ) -> pd.Series:
     """计算RSI指标"""
-    pass
+    return _to_series(calculate_rsi_panel(_to_panel(data), period), data)
 
 
 def calculate_macd(
@@ -59,20 +80,267 @@ def calculate_macd(
     signal_period: int = 9
 ) -> MACD:
     """计算MACD指标"""
-    pass
+    result = calculate_macd_panel(_to_panel(data), fast_period, slow_period, signal_period)
+    return MACD(*(_to_series(line, data) for line in result))
+
+
+# ==================== 面板（多股票）指标 ====================
+
+def calculate_sma_panel(
+    prices: np.ndarray,
+    period: int
+) -> np.ndarray:
+    """
+    批量计算简单移动平均线
+
+    Args:
+        prices: 价格面板，形状 (n_symbols, n_dates)
+        period: 周期
+
+    Returns:
+        同形状数组；窗口未满或窗口内含 NaN 的位置为 NaN
+    """
+    prices = _as_panel(prices)
+    result = np.full(prices.shape, np.nan)
+    if prices.shape[1] >= period:
+        result[:, period - 1:] = sliding_window_view(prices, period, axis=1).mean(axis=-1)
+    return result
+
+
+def calculate_ema_panel(
+    prices: np.ndarray,
+    period: int
+) -> np.ndarray:
+    """
+    批量计算指数移动平均线
+
+    span=period，非调整递推（adjust=False），至少累计 period 个有效值后才输出。
+    每只股票从自身第一个有效值开始递推，上市前的 NaN 不影响结果。
+
+    Args:
+        prices: 价格面板，形状 (n_symbols, n_dates)
+        period: 周期
+
+    Returns:
+        同形状数组
+    """
+    return _ewm_mean(_as_panel(prices), alpha=2.0 / (period + 1), min_periods=period)
+
+
+def calculate_bollinger_bands_panel(
+    prices: np.ndarray,
+    period: int = 20,
+    std_dev: float = 2.0
+) -> BollingerBandsPanel:
+    """
+    批量计算布林带（总体标准差，ddof=0）
+
+    Args:
+        prices: 价格面板，形状 (n_symbols, n_dates)
+        period: 周期
+        std_dev: 标准差倍数
+
+    Returns:
+        BollingerBandsPanel
+    """
+    middle, std = calculate_rolling_mean_std_panel(prices, period)
+    return BollingerBandsPanel(
+        upper=middle + std_dev * std,
+        middle=middle,
+        lower=middle - std_dev * std,
+    )
+
+
+def calculate_rolling_mean_std_panel(
+    prices: np.ndarray,
+    period: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量计算滚动均值与总体标准差（ddof=0），布林带为 mean ± k * std
+
+    Args:
+        prices: 价格面板，形状 (n_symbols, n_dates)
+        period: 周期
+
+    Returns:
+        (mean, std)，前 period - 1 列为 NaN
+    """
+    prices = _as_panel(prices)
+    mean = np.full(prices.shape, np.nan)
+    std = np.full(prices.shape, np.nan)
+    if prices.shape[1] >= period:
+        windows = sliding_window_view(prices, period, axis=1)
+        mean[:, period - 1:] = windows.mean(axis=-1)
+        std[:, period - 1:] = windows.std(axis=-1)
+    return mean, std
+
+
+def calculate_rsi_panel(
+    prices: np.ndarray,
+    period: int = 14
+) -> np.ndarray:
+    """
+    批量计算RSI指标（Wilder 平滑，alpha=1/period）
+
+    Args:
+        prices: 价格面板，形状 (n_symbols, n_dates)
+        period: 周期
+
+    Returns:
+        同形状数组，取值 0-100
+    """
+    prices = _as_panel(prices)
+    delta = np.full(prices.shape, np.nan)
+    delta[:, 1:] = np.diff(prices, axis=1)
+
+    avg_gain = _ewm_mean(np.clip(delta, 0, None), alpha=1.0 / period, min_periods=period)
+    avg_loss = _ewm_mean(np.clip(-delta, 0, None), alpha=1.0 / period, min_periods=period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - 100 / (1 + rs)
+
+
+def calculate_macd_panel(
+    prices: np.ndarray,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9
+) -> MACDPanel:
+    """
+    批量计算MACD指标
+
+    Args:
+        prices: 价格面板，形状 (n_symbols, n_dates)
+        fast_period: 快线周期
+        slow_period: 慢线周期
+        signal_period: 信号线周期
+
+    Returns:
+        MACDPanel
+    """
+    prices = _as_panel(prices)
+    macd = calculate_ema_panel(prices, fast_period) - calculate_ema_panel(prices, slow_period)
+    signal = calculate_ema_panel(macd, signal_period)
+    return MACDPanel(macd=macd, signal=signal, histogram=macd - signal)
+
+
+def detect_bullish_engulfing_panel(
+    open_: np.ndarray,
+    close: np.ndarray
+) -> np.ndarray:
+    """
+    批量识别阳包阴：前一日阴线，当日阳线，当日开盘价不高于前一日收盘价且收盘价不低于前一日开盘价
+
+    Args:
+        open_: 开盘价面板，形状 (n_symbols, n_dates)
+        close: 收盘价面板
+
+    Returns:
+        bool 面板，第一列恒为 False
+    """
+    open_, close = _as_panel(open_), _as_panel(close)
+    mask = np.zeros(close.shape, dtype=bool)
+    prev_open, prev_close = open_[:, :-1], close[:, :-1]
+    curr_open, curr_close = open_[:, 1:], close[:, 1:]
+    mask[:, 1:] = (
+        (prev_close < prev_open)
+        & (curr_close > curr_open)
+        & (curr_open <= prev_close)
+        & (curr_close >= prev_open)
+    )
+    return mask
+
+
+def detect_break_high_panel(
+    high: np.ndarray,
+    close: np.ndarray
+) -> np.ndarray:
+    """
+    批量识别突破前高：当日收盘价高于前一日最高价
+
+    Args:
+        high: 最高价面板，形状 (n_symbols, n_dates)
+        close: 收盘价面板
+
+    Returns:
+        bool 面板，第一列恒为 False
+    """
+    high, close = _as_panel(high), _as_panel(close)
+    mask = np.zeros(close.shape, dtype=bool)
+    mask[:, 1:] = close[:, 1:] > high[:, :-1]
+    return mask
+
+
+def _ewm_mean(
+    values: np.ndarray,
+    alpha: float,
+    min_periods: int
+) -> np.ndarray:
+    """
+    指数加权均值内核（adjust=False），沿时间轴递推、按股票向量化
+
+    缺失值处理与 pandas ewm(adjust=False, ignore_na=False) 相同：
+    序列起点为第一个有效值；中间的 NaN 延续上一值，并按间隔衰减旧值权重。
+    """
+    n_symbols, n_dates = values.shape
+    result = np.full(values.shape, np.nan)
+    weighted = np.full(n_symbols, np.nan)
+    old_wt = np.ones(n_symbols)
+    nobs = np.zeros(n_symbols, dtype=np.int64)
+    old_wt_factor = 1.0 - alpha
+
+    for t in range(n_dates):
+        cur = values[:, t]
+        is_obs = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+        nobs += is_obs
+
+        old_wt = np.where(started, old_wt * old_wt_factor, old_wt)
+        update = started & is_obs
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(update & (weighted != cur), blended, weighted)
+        old_wt = np.where(update, 1.0, old_wt)
+        weighted = np.where(~started & is_obs, cur, weighted)
+
+        result[:, t] = np.where(nobs >= min_periods, weighted, np.nan)
+
+    return result
+
+
+def _as_panel(prices: np.ndarray) -> np.ndarray:
+    """转换为 float64 二维面板"""
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.ndim != 2:
+        raise ValueError(f"面板数组必须为二维 (n_symbols, n_dates)，实际维度: {prices.ndim}")
+    return prices
+
+
+def _to_panel(data: pd.Series) -> np.ndarray:
+    """单序列转换为单行面板"""
+    return data.to_numpy(dtype=np.float64, na_value=np.nan)[np.newaxis, :]
+
+
+def _to_series(values: np.ndarray, data: pd.Series) -> pd.Series:
+    """单行面板结果还原为与输入同索引的序列"""
+    return pd.Series(values[0], index=data.index, name=data.name)
 
 
 def is_bullish_engulfing(
     prev_candle: pd.Series,
     curr_candle: pd.Series
 ) -> bool:
-    """判断是否为阳包阴形态"""
-    pass
+    """判断是否为阳包阴形态（与 detect_bullish_engulfing_panel 相同的判断）"""
+    open_ = np.array([[prev_candle['open'], curr_candle['open']]], dtype=np.float64)
+    close = np.array([[prev_candle['close'], curr_candle['close']]], dtype=np.float64)
+    return bool(detect_bullish_engulfing_panel(open_, close)[0, 1])
 
 
 def is_break_high(
     prev_candle: pd.Series,
     curr_candle: pd.Series
 ) -> bool:
-    """判断是否突破前一日高点"""
-    pass
+    """判断是否突破前一日高点（与 detect_break_high_panel 相同的判断）"""
+    high = np.array([[prev_candle['high'], curr_candle['high']]], dtype=np.float64)
+    close = np.array([[prev_candle['close'], curr_candle['close']]], dtype=np.float64)
+    return bool(detect_break_high_panel(high, close)[0, 1])
@@ -0,0 +1,122 @@
+"""
+并行筛选模块
+
+对全市场股票并行执行综合筛选（screening.check_composite）。
+日线面板（指定 symbols 时只取这些股票的行）通过 SharedPanel 发布到共享内存一次，股票按连续分片分配到进程池，
+任务只传递面板句柄、行号与市值，子进程只返回每只股票的 (是否通过, 原因)，不传递 DataFrame。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data.panel_store import OHLCVPanel
+from ..data.shared_panel import SharedPanel, SharedPanelHandle, attach_panel
+from ..utils import logging
+from .screening import check_composite
+
+logger = logging.get_logger(__name__)
+
+
+def screen_universe(
+    panel: OHLCVPanel,
+    config,
+    as_of: Optional[np.datetime64] = None,
+    market_caps: Optional[np.ndarray] = None,
+    symbols: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    n_shards: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    并行执行综合筛选
+
+    Args:
+        panel: 行情面板
+        config: StrategyConfig
+        as_of: 判断日，只使用该日及之前的数据，默认面板最后一日
+        market_caps: 按 panel.symbols 顺序的市值，默认全部未知（按非大盘股处理）
+        symbols: 待筛选的股票，默认面板全部股票，不在面板中的股票忽略
+        max_workers: 进程数，默认 CPU 核数；为 1 时在当前进程执行
+        n_shards: 分片数，默认为进程数的 4 倍
+
+    Returns:
+        以 symbol 为索引，列 passed / reason
+    """
+    end = len(panel.dates) if as_of is None else \
+        int(np.searchsorted(panel.dates, np.datetime64(as_of, 'D'), side='right'))
+    if market_caps is None:
+        market_caps = np.full(len(panel.symbols), np.nan)
+    max_workers = max_workers or os.cpu_count() or 1
+    if symbols is None:
+        rows = np.arange(len(panel.symbols))
+    else:
+        index = panel.symbol_index()
+        rows = np.array([index[s] for s in symbols if s in index], dtype=np.intp)
+        if max_workers > 1 and len(rows) < len(panel.symbols):
+            # 只把待筛选的行（如预过滤的幸存者）发布到共享内存，复制量随待筛选股票数而不是面板规模增长
+            panel = OHLCVPanel([panel.symbols[i] for i in rows], panel.dates, panel.data[rows])
+            market_caps = np.asarray(market_caps)[rows]
+            rows = np.arange(len(rows))
+
+    n_shards = min(n_shards or max_workers * 4, len(rows)) or 1
+    shards = [s for s in np.array_split(rows, n_shards) if len(s)]
+    args = [(s.tolist(), market_caps[s].tolist()) for s in shards]
+
+    results = []
+    if max_workers == 1:
+        for shard_rows, caps in args:
+            results.extend(screen_rows(panel, shard_rows, caps, config, end))
+    else:
+        with SharedPanel(panel) as shared, ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_run_shard, shared.handle, shard_rows, caps, config, end)
+                       for shard_rows, caps in args]
+            for future in futures:
+                results.extend(future.result())
+
+    frame = pd.DataFrame(results, columns=['passed', 'reason'],
+                         index=pd.Index([panel.symbols[i] for i in rows], name='symbol'))
+    logger.info(f"并行筛选完成: {int(frame['passed'].sum())}/{len(frame)} 只通过, {len(shards)} 个分片")
+    return frame
+
+
+def screen_rows(
+    panel: OHLCVPanel,
+    rows: List[int],
+    market_caps: List[float],
+    config,
+    end: int
+) -> List[Tuple[bool, str]]:
+    """
+    逐只股票执行综合筛选
+
+    Args:
+        panel: 行情面板
+        rows: 股票行号
+        market_caps: 与 rows 对应的市值
+        config: StrategyConfig
+        end: 判断日下标 + 1
+
+    Returns:
+        与 rows 对应的 (是否通过, 原因)
+    """
+    close = panel.field('close')
+    results = []
+    for row, market_cap in zip(rows, market_caps):
+        series = close[row, :end]
+        # 与 OHLCVPanel.to_frame 一致：去掉无数据的日期
+        result = check_composite(series[~np.isnan(series)], market_cap, config)
+        results.append((result.passed, result.reason))
+    return results
+
+
+def _run_shard(
+    handle: SharedPanelHandle,
+    rows: List[int],
+    market_caps: List[float],
+    config,
+    end: int
+) -> List[Tuple[bool, str]]:
+    """子进程入口：映射共享面板后筛选一个分片"""
+    return screen_rows(attach_panel(handle), rows, market_caps, config, end)
@@ -0,0 +1,99 @@
+"""
+K 线形态扫描模块
+
+在整个 (股票 × 日期) 面板上一次性识别阳包阴（yang_bao_yin）与突破前高（break_high），
+返回稀疏的事件表：每个形态出现一次为一行，附带当日与前一日的价格。
+向量化回测（vectorized.compute_signals）按事件的 row / day 定位面板位置；
+generate_signals_frame（及 generate_*_signal）扫描信号日前后两根 K 线的事件。
+"""
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..data.panel_store import OHLCVPanel, panel_from_frame
+from . import indicators
+
+# 形态名 -> 识别函数 (open, high, low, close) -> bool 面板（第一列恒为 False）
+PATTERN_DETECTORS: Dict[str, Callable[..., np.ndarray]] = {
+    'yang_bao_yin': lambda open_, high, low, close: indicators.detect_bullish_engulfing_panel(open_, close),
+    'break_high': lambda open_, high, low, close: indicators.detect_break_high_panel(high, close),
+}
+
+EVENT_COLUMNS = [
+    'symbol', 'date', 'pattern', 'row', 'day', 'open', 'high', 'low', 'close',
+    'prev_open', 'prev_high', 'prev_low', 'prev_close',
+]
+
+
+def scan_patterns(
+    panel: OHLCVPanel,
+    patterns: Sequence[str] = ('yang_bao_yin', 'break_high'),
+    start: int = 0,
+    end: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    扫描全部股票全部日期的 K 线形态
+
+    Args:
+        panel: 行情面板
+        patterns: 形态名，见 PATTERN_DETECTORS
+        start: 只保留日期下标不小于 start 的事件
+        end: 只保留日期下标小于 end 的事件，默认面板全部日期
+
+    Returns:
+        事件表（EVENT_COLUMNS），row / day 为面板行号与日期下标，按 date、symbol、pattern 排序
+    """
+    unknown = set(patterns) - set(PATTERN_DETECTORS)
+    if unknown:
+        raise ValueError(f"未知形态: {sorted(unknown)}")
+    end = len(panel.dates) if end is None else end
+    if not patterns:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    fields = [panel.field(name) for name in ('open', 'high', 'low', 'close')]
+
+    rows, days, codes = [], [], []
+    for code, name in enumerate(patterns):
+        mask = PATTERN_DETECTORS[name](*fields)
+        row, day = np.nonzero(mask[:, start:end])
+        rows.append(row)
+        days.append(day + start)
+        codes.append(np.full(len(row), code, dtype=np.intp))
+    row, day, code = np.concatenate(rows), np.concatenate(days), np.concatenate(codes)
+    order = np.lexsort((code, row, day))
+    row, day, code = row[order], day[order], code[order]
+
+    events = pd.DataFrame({
+        'symbol': np.asarray(panel.symbols, dtype=object)[row],
+        'date': pd.DatetimeIndex(panel.dates[day]),
+        'pattern': np.asarray(patterns, dtype=object)[code],
+        'row': row,
+        'day': day,
+    })
+    for name, values in zip(('open', 'high', 'low', 'close'), fields):
+        events[name] = values[row, day]
+        events[f'prev_{name}'] = values[row, day - 1]
+    return events[EVENT_COLUMNS]
+
+
+def scan_frame(
+    symbol: str,
+    data: pd.DataFrame,
+    patterns: Sequence[str] = ('yang_bao_yin', 'break_high'),
+    start: int = 0
+) -> pd.DataFrame:
+    """
+    扫描单只股票的日线（按日期升序，需包含 open / high / low / close）
+
+    Args:
+        symbol: 股票代码
+        data: 日线数据
+        patterns: 形态名
+        start: 只保留位置不小于 start 的事件（负数表示从末尾倒数）
+
+    Returns:
+        事件表，day 为 data 中的位置
+    """
+    if start < 0:
+        start = max(len(data) + start, 0)
+    return scan_patterns(panel_from_frame(symbol, data), patterns, start=start)
@@ -1,10 +1,26 @@
 """
 股票筛选模块
 """
-from typing import List
+import datetime as dt
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
 import pandas as pd
 
 from ..data.market_data import StockInfo
+from ..data import db_operations
+from ..data import membership
+from ..data import universe
+from ..types.common import MarketCapCategory
+
+# 中盘股市值下限（USD），大盘股市值下限见 StrategyConfig.large_cap_market_cap
+MID_CAP_MARKET_CAP = 1.0e10
+LARGE_CAP_MARKET_CAP = 3.0e11
+
+
+class ScreenResult(NamedTuple):
+    """筛选结果：是否通过及原因"""
+    passed: bool
+    reason: str
 
 
 def screen_by_ma_distance(
@@ -14,8 +30,31 @@ def screen_by_ma_distance(
     threshold: float,
     direction: str = "below"
 ) -> bool:
-    """根据移动平均线距离筛选"""
-    pass
+    """
+    根据移动平均线距离筛选
+
+    Args:
+        symbol: 股票代码
+        data: 日线数据，需包含 close 列
+        ma_period: 均线周期
+        threshold: 偏离阈值（如 0.08 表示 8%）
+        direction: below 要求收盘价低于均线至少 threshold，above 要求高于均线至少 threshold
+
+    Returns:
+        是否通过筛选，数据不足 ma_period 根时返回 False
+    """
+    close = data['close']
+    if len(close) < ma_period:
+        return False
+    window = close.iloc[-ma_period:]
+    if window.isna().any():
+        return False
+    distance = window.iloc[-1] / window.mean() - 1
+    if direction == "below":
+        return bool(distance <= -threshold)
+    if direction == "above":
+        return bool(distance >= threshold)
+    raise ValueError(f"未知方向: {direction}")
 
 
 def screen_by_bollinger_breakout(
@@ -31,33 +70,120 @@ def screen_by_market_cap(
     threshold: float,
     category: str = "large_cap"
 ) -> bool:
-    """根据市值筛选"""
-    pass
+    """根据市值筛选：threshold 为大盘股市值下限，category 为要求的市值分类"""
+    return classify_market_cap(market_cap, large_threshold=threshold) == category
 
 
 def screen_by_index_constituent(
     symbol: str,
-    index: str = "SP500"
+    index: str = "SP500",
+    date: Optional[dt.date] = None
 ) -> bool:
-    """根据指数成分股筛选"""
-    pass
+    """
+    根据指数成分股筛选
+
+    Args:
+        symbol: 股票代码
+        index: 指数名
+        date: 判断日期，为空时使用最新成分股快照；回测时传入当日以避免幸存者偏差
+    """
+    if date is None:
+        return universe.universe_manager.is_member(membership.normalize_index(index), symbol)
+    return membership.is_member(index, symbol, date)
 
 
 def screen_composite(
     symbol: str,
     data: pd.DataFrame,
-    stock_info: StockInfo,
+    stock_info: Optional[StockInfo],
     config
 ) -> bool:
-    """综合筛选"""
-    pass
+    """
+    综合筛选：按市值选择偏离阈值，要求收盘价低于 MA 至少该阈值
 
+    Args:
+        symbol: 股票代码
+        data: 日线数据
+        stock_info: 股票信息（来自预加载的 stock_info 快照），缺失时按非大盘股处理
+        config: StrategyConfig
+    """
+    market_cap = stock_info['market_cap'] if stock_info is not None else float('nan')
+    return check_composite(data['close'].to_numpy(dtype=np.float64), market_cap, config).passed
 
-def classify_market_cap(market_cap: float) -> str:
-    """分类市值：large_cap / mid_cap / small_cap"""
-    pass
 
+def check_composite(close: np.ndarray, market_cap: float, config) -> ScreenResult:
+    """
+    综合筛选的数组版本，附带未通过的原因（screen_composite 与并行筛选共用）
 
-def get_index_constituents(index: str) -> List[str]:
-    """获取指数成分股列表"""
-    pass
+    Args:
+        close: 截至判断日的收盘价序列（按日期升序，不含无数据的日期）
+        market_cap: 市值，未知时为 NaN
+        config: StrategyConfig
+
+    Returns:
+        ScreenResult
+    """
+    category = classify_market_cap(market_cap, large_threshold=config.large_cap_market_cap)
+    threshold = config.threshold_large_cap if category == "large_cap" else config.threshold_small_cap
+    if len(close) < config.ma_period:
+        return ScreenResult(False, f"数据不足: {len(close)}/{config.ma_period}")
+    window = close[-config.ma_period:]
+    if np.isnan(window).any():
+        return ScreenResult(False, "均线窗口内有缺失值")
+    distance = window[-1] / window.mean() - 1
+    if distance > -threshold:
+        return ScreenResult(False, f"{category} 偏离 MA{config.ma_period} {distance:.2%}，未达 -{threshold:.1%}")
+    return ScreenResult(True, f"{category} 偏离 MA{config.ma_period} {distance:.2%}")
+
+
+def prefilter_by_ma_distance(
+    symbols: List[str],
+    config,
+    stock_infos: Optional[Dict[str, StockInfo]] = None,
+    as_of: Optional[dt.date] = None
+) -> List[str]:
+    """
+    综合筛选的数据库预过滤：在 SQLite 中计算全部股票的 MA 偏离，只返回通过的股票
+
+    与 check_composite 的条件相同（数据足够且收盘价低于 MA 至少按市值选择的阈值），
+    幸存者再进入基于面板的筛选与信号计算，其余股票不加载历史数据。
+
+    Args:
+        symbols: 股票代码列表
+        config: StrategyConfig
+        stock_infos: 股票信息（市值），缺失时按非大盘股处理
+        as_of: 判断日，为空时使用各股票的最新数据
+
+    Returns:
+        通过预过滤的股票（保持 symbols 中的顺序）
+    """
+    frame = db_operations.get_ma_distance_frame(symbols, config.ma_period, as_of)
+    stock_infos = stock_infos or {}
+    market_caps = np.array([stock_infos[s]['market_cap'] if s in stock_infos else np.nan for s in frame.index],
+                           dtype=np.float64)
+    thresholds = np.where(market_caps >= config.large_cap_market_cap,
+                          config.threshold_large_cap, config.threshold_small_cap)
+    passed = (frame['n_bars'].to_numpy() >= config.ma_period) & (frame['distance'].to_numpy() <= -thresholds)
+    survivors = set(frame.index[passed])
+    return [s for s in symbols if s in survivors]
+
+
+def classify_market_cap(
+    market_cap: float,
+    large_threshold: float = LARGE_CAP_MARKET_CAP,
+    mid_threshold: float = MID_CAP_MARKET_CAP
+) -> MarketCapCategory:
+    """分类市值：large_cap / mid_cap / small_cap，市值未知（NaN）时归为 small_cap"""
+    if market_cap >= large_threshold:
+        return "large_cap"
+    if market_cap >= mid_threshold:
+        return "mid_cap"
+    return "small_cap"
+
+
+def get_index_constituents(index: str, date: Optional[dt.date] = None) -> List[str]:
+    """获取指数成分股列表，date 为空时使用最新成分股快照，否则返回该日的成分股"""
+    if date is None:
+        snapshot = universe.universe_manager.get_snapshot(membership.normalize_index(index))
+        return list(snapshot.ordered) if snapshot is not None else []
+    return membership.members_on(index, date)
@@ -1,51 +1,272 @@
 """
 信号生成模块
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, NamedTuple, Sequence
+import numpy as np
 import pandas as pd
 
-from ..types.common import TradingSignal
+from ..types.common import TradingSignal, OHLCData
+from ..data.panel_store import OHLCVPanel, panel_from_frame
+from . import indicators
 from .indicators import BollingerBands
+from .patterns import PATTERN_DETECTORS, scan_patterns
+
+# 信号类型，按优先级从低到高（同一股票同时出现多个信号时综合信号取优先级最高者）
+SIGNAL_TYPES = ('bollinger_breakout', 'break_high', 'yang_bao_yin')
+
+# 信号价格所在的 T 日距最后一根 K 线的根数：布林带突破当日即 T 日，形态信号的 T 日为前一日
+SETUP_LAG = {
+    'bollinger_breakout': 0,
+    'break_high': 1,
+    'yang_bao_yin': 1,
+}
+
+# generate_signals_frame 的列（ma 及之后为 T 日指标快照）
+SIGNAL_FRAME_COLUMNS = [
+    'symbol', 'signal_type', 'signal_time', 'entry_price', 'stop_loss', 'target_price',
+    'risk_reward_ratio', 'confidence', 'ma', 'bollinger_lower', 'setup_close', 'setup_high',
+]
+
+# 各类信号的置信度：形态确认（T+1）的信号高于单日跌破布林带
+SIGNAL_CONFIDENCE = {
+    'bollinger_breakout': 0.5,
+    'break_high': 0.7,
+    'yang_bao_yin': 0.8,
+}
+
+
+class TriggerLevels(NamedTuple):
+    """
+    开盘前预计算的触发价位，数组与 symbols 一一对应
+
+    每个价位都是对应信号成立的必要条件，价格未越过任何价位的股票当日不可能出信号。
+    数据不足、前一日不满足准备条件或形态不满足的位置为 NaN（比较结果恒为 False）。
+    """
+    symbols: List[str]
+    bollinger_price: np.ndarray   # 现价低于该值时，计入当日收盘后将跌破布林带下轨且低于均线阈值
+    engulf_price: np.ndarray      # 前一日满足准备条件且为阴线时的前一日开盘价，现价不低于该值才可能形成阳包阴
+    break_high_price: np.ndarray  # 前一日满足准备条件时的前一日最高价，现价高于该值即突破
 
 
 def generate_bollinger_breakout_signal(
     data: pd.DataFrame,
-    config
+    config,
+    symbol: str = "",
+    market_cap: float = float('nan')
 ) -> Optional[TradingSignal]:
-    """生成布林带突破信号"""
-    pass
+    """
+    生成布林带突破信号：最后一根 K 线（T 日）收盘跌破布林带下轨且低于均线至少按市值选择的阈值
+
+    Args:
+        data: 日线数据（按日期升序，最后一行为 T 日）
+        config: StrategyConfig
+        symbol: 股票代码
+        market_cap: 市值，用于选择均线偏离阈值，未知时按非大盘股处理
+
+    Returns:
+        信号，不满足时返回 None
+    """
+    return _generate_frame_signal(('bollinger_breakout',), data, config, symbol, market_cap)
 
 
 def generate_yang_bao_yin_signal(
     data: pd.DataFrame,
-    config
+    config,
+    symbol: str = "",
+    market_cap: float = float('nan')
 ) -> Optional[TradingSignal]:
-    """生成阳包阴信号"""
-    pass
+    """
+    生成阳包阴信号：T 日满足布林带与均线条件，T+1 日（最后一根 K 线）出现阳包阴
+
+    Args:
+        data: 日线数据（按日期升序，最后一行为 T+1 日）
+        config: StrategyConfig
+        symbol: 股票代码
+        market_cap: 市值，用于选择均线偏离阈值，未知时按非大盘股处理
+
+    Returns:
+        信号，不满足时返回 None
+    """
+    return _generate_frame_signal(('yang_bao_yin',), data, config, symbol, market_cap)
 
 
 def generate_break_high_signal(
     data: pd.DataFrame,
-    config
+    config,
+    symbol: str = "",
+    market_cap: float = float('nan')
 ) -> Optional[TradingSignal]:
-    """生成突破高点信号"""
-    pass
+    """
+    生成突破高点信号：T 日满足布林带与均线条件，T+1 日收盘价突破 T 日最高价
+
+    Args:
+        data: 日线数据（按日期升序，最后一行为 T+1 日）
+        config: StrategyConfig
+        symbol: 股票代码
+        market_cap: 市值，未知时按非大盘股处理
+
+    Returns:
+        信号，不满足时返回 None
+    """
+    return _generate_frame_signal(('break_high',), data, config, symbol, market_cap)
 
 
 def generate_composite_signal(
     data: pd.DataFrame,
-    config
+    config,
+    symbol: str = "",
+    market_cap: float = float('nan')
 ) -> Optional[TradingSignal]:
-    """生成综合信号"""
-    pass
+    """生成综合信号：同时出现多个信号时取优先级最高者（见 SIGNAL_TYPES）"""
+    return _generate_frame_signal(SIGNAL_TYPES, data, config, symbol, market_cap)
+
+
+def generate_signals_frame(
+    panel: OHLCVPanel,
+    config,
+    as_of: Optional[np.datetime64] = None,
+    market_caps: Optional[np.ndarray] = None,
+    quotes: Optional[Dict[str, OHLCData]] = None,
+    signal_types: Sequence[str] = SIGNAL_TYPES
+) -> pd.DataFrame:
+    """
+    一次向量化计算全部股票在某一交易日的全部信号
+
+    只截取最近 max(ma_period, bollinger_period) + 1 根日线计算指标；
+    价格、止损与目标价由 calculate_* 对数组批量计算，不为未出信号的股票创建任何对象。
+
+    Args:
+        panel: 行情面板
+        config: StrategyConfig
+        as_of: 信号日；无 quotes 时取面板中不晚于该日的最后一日，默认面板最后一日
+        market_caps: 按 panel.symbols 顺序的市值，缺失（NaN）或为空时按非大盘股处理
+        quotes: 盘中行情，作为信号日的临时 K 线追加在信号日之前的日线之后（无行情的股票该日为 NaN）
+        signal_types: 参与计算的信号类型
+
+    Returns:
+        每个出现的信号一行（SIGNAL_FRAME_COLUMNS），按 symbol 排序，同一股票优先级高的在前
+    """
+    unknown = set(signal_types) - set(SIGNAL_TYPES)
+    if unknown:
+        raise ValueError(f"未知信号类型: {sorted(unknown)}")
+    n_symbols = len(panel.symbols)
+    width = max(config.ma_period, config.bollinger_period) + 1
+
+    if quotes:
+        times = [pd.Timestamp(quote['timestamp']) for quote in quotes.values()]
+        day = np.datetime64(as_of, 'D') if as_of is not None else np.datetime64(max(times).date(), 'D')
+        end = int(np.searchsorted(panel.dates, day, side='left'))
+    else:
+        end = len(panel.dates) if as_of is None else \
+            int(np.searchsorted(panel.dates, np.datetime64(as_of, 'D'), side='right'))
+    start = max(end - width + (1 if quotes else 0), 0)
+    fields = {name: np.array(panel.field(name)[:, start:end]) for name in ('open', 'high', 'low', 'close')}
+    signal_times = np.full(n_symbols, panel.dates[end - 1] if end else np.datetime64('NaT'), dtype='datetime64[ns]')
+    if quotes:
+        index = panel.symbol_index()
+        bar = {name: np.full((n_symbols, 1), np.nan) for name in fields}
+        signal_times[:] = np.datetime64(day, 'ns')
+        for symbol, quote in quotes.items():
+            row = index.get(symbol)
+            if row is None:
+                continue
+            for name in fields:
+                bar[name][row, 0] = quote[name]
+            signal_times[row] = np.datetime64(pd.Timestamp(quote['timestamp']).tz_localize(None), 'ns')
+        fields = {name: np.concatenate([fields[name], bar[name]], axis=1) for name in fields}
+    if fields['close'].shape[1] < 2:
+        return pd.DataFrame(columns=SIGNAL_FRAME_COLUMNS)
+
+    close = fields['close']
+    if market_caps is None:
+        market_caps = np.full(n_symbols, np.nan)
+    threshold = np.where(market_caps >= config.large_cap_market_cap,
+                         config.threshold_large_cap, config.threshold_small_cap)
+    # 最后两根 K 线（T 日候选）上的指标与条件，列 0 为前一日，列 1 为信号日
+    ma = indicators.calculate_sma_panel(close, config.ma_period)[:, -2:]
+    lower = indicators.calculate_bollinger_bands_panel(close, config.bollinger_period,
+                                                       config.bollinger_std).lower[:, -2:]
+    last = {name: values[:, -2:] for name, values in fields.items()}
+    setup = (last['close'] < lower) & (last['close'] <= ma * (1 - threshold)[:, None])
+    window_dates = np.r_[panel.dates[start:end], [day]] if quotes else panel.dates[start:end]
+    events = _scan_last_bar(panel.symbols, window_dates[-2:], last,
+                            [name for name in signal_types if name in PATTERN_DETECTORS])
+
+    frames = []
+    for priority, signal_type in enumerate(SIGNAL_TYPES):
+        if signal_type not in signal_types:
+            continue
+        col = 1 - SETUP_LAG[signal_type]
+        fired = setup[:, col]
+        if signal_type in PATTERN_DETECTORS:
+            hit = np.zeros(n_symbols, dtype=bool)
+            hit[events.loc[events['pattern'] == signal_type, 'row'].to_numpy(dtype=np.intp)] = True
+            fired = fired & hit
+        rows = np.flatnonzero(fired)
+        entry_price = last['close'][rows, col]
+        stop_loss = calculate_stop_loss(entry_price, None, config)
+        frames.append(pd.DataFrame({
+            'symbol': np.asarray(panel.symbols, dtype=object)[rows],
+            'signal_type': signal_type,
+            'signal_time': signal_times[rows],
+            'entry_price': entry_price,
+            'stop_loss': stop_loss,
+            'target_price': calculate_target_price(entry_price, config.risk_reward_ratio, stop_loss),
+            'risk_reward_ratio': float(config.risk_reward_ratio),
+            'confidence': SIGNAL_CONFIDENCE[signal_type],
+            'ma': ma[rows, col],
+            'bollinger_lower': lower[rows, col],
+            'setup_close': entry_price,
+            'setup_high': last['high'][rows, col],
+            '_priority': priority,
+        }))
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SIGNAL_FRAME_COLUMNS + ['_priority'])
+    frame = frame.sort_values(['symbol', '_priority'], ascending=[True, False], ignore_index=True)
+    return frame[SIGNAL_FRAME_COLUMNS]
+
+
+def _scan_last_bar(
+    symbols: List[str],
+    dates: np.ndarray,
+    last: Dict[str, np.ndarray],
+    patterns: List[str]
+) -> pd.DataFrame:
+    """在最后两根 K 线组成的面板上扫描形态，返回信号日（第 2 根）的事件"""
+    n_symbols = len(symbols)
+    data = np.stack([last['open'], last['high'], last['low'], last['close'],
+                     np.full((n_symbols, 2), np.nan)], axis=-1)
+    return scan_patterns(OHLCVPanel(symbols, np.asarray(dates, dtype='datetime64[D]'), data), patterns, start=1)
+
+
+def signals_to_dicts(frame: pd.DataFrame) -> List[TradingSignal]:
+    """把 generate_signals_frame 的结果逐行转换为 TradingSignal"""
+    signals = []
+    for row in frame.itertuples(index=False):
+        signals.append(TradingSignal(
+            symbol=row.symbol,
+            signal_type=row.signal_type,
+            signal_time=pd.Timestamp(row.signal_time).to_pydatetime(),
+            entry_price=float(row.entry_price),
+            stop_loss=float(row.stop_loss),
+            target_price=float(row.target_price),
+            risk_reward_ratio=float(row.risk_reward_ratio),
+            confidence=float(row.confidence),
+            indicators={'ma': float(row.ma), 'bollinger_lower': float(row.bollinger_lower),
+                        'setup_close': float(row.setup_close), 'setup_high': float(row.setup_high)},
+        ))
+    return signals
 
 
 def calculate_signal_price(
     signal_type: str,
     data: pd.DataFrame
 ) -> float:
-    """计算信号价格（挂单价格）"""
-    pass
+    """
+    计算信号价格（挂单价格）：T 日收盘价
+
+    bollinger_breakout 的 T 日是最后一根 K 线；形态信号的 T 日是形态出现的前一日。
+    """
+    return float(data['close'].iloc[-1 - SETUP_LAG[signal_type]])
 
 
 def calculate_stop_loss(
@@ -53,13 +274,149 @@ def calculate_stop_loss(
     signal: TradingSignal,
     config
 ) -> float:
-    """计算止损价格"""
-    pass
+    """计算止损价格：入场价下方 config.stop_loss_pct（entry_price 可为数组）"""
+    return entry_price * (1 - config.stop_loss_pct)
 
 
 def calculate_target_price(
     entry_price: float,
-    risk_reward_ratio: float
+    risk_reward_ratio: float,
+    stop_loss: float
 ) -> float:
-    """计算目标价格"""
-    pass
+    """
+    计算目标价格：入场价 + 盈亏比 × 单位风险（参数可为数组）
+
+    Args:
+        entry_price: 入场价
+        risk_reward_ratio: 目标盈亏比
+        stop_loss: 止损价，见 calculate_stop_loss（由 StrategyConfig.stop_loss_pct 决定）
+    """
+    return entry_price + risk_reward_ratio * (entry_price - stop_loss)
+
+
+def _generate_frame_signal(
+    signal_types: Sequence[str],
+    data: pd.DataFrame,
+    config,
+    symbol: str,
+    market_cap: float
+) -> Optional[TradingSignal]:
+    """单只股票的信号：在单行面板上调用 generate_signals_frame，取优先级最高的一个"""
+    if len(data) < 2:
+        return None
+    frame = generate_signals_frame(panel_from_frame(symbol, data), config,
+                                   market_caps=np.array([market_cap], dtype=np.float64),
+                                   signal_types=signal_types)
+    return signals_to_dicts(frame.iloc[:1])[0] if len(frame) else None
+
+
+def compute_trigger_levels(
+    panel: OHLCVPanel,
+    config,
+    as_of: Optional[np.datetime64] = None,
+    market_caps: Optional[np.ndarray] = None
+) -> TriggerLevels:
+    """
+    开盘前根据日线计算每只股票的触发价位
+
+    布林带阈值是闭式解：设前 n-1 日收盘价均值为 m、总体方差为 v，
+    当日价格 p 满足 p < lower(p) 当且仅当 p < m - k * sqrt(n * v / (n - 1 - k^2))。
+    当 n - 1 <= k^2 时该解不存在，退化为必要条件 p < m。
+    均线条件同样有闭式解：设前 N-1 日收盘价之和为 S、阈值为 t，
+    p <= (S + p) / N * (1 - t) 当且仅当 p <= S * (1 - t) / (N - 1 + t)。
+    形态信号要求前一日（T 日）满足准备条件，不满足的股票形态价位为 NaN。
+
+    Args:
+        panel: 行情面板
+        config: StrategyConfig
+        as_of: 交易日；只使用该日期之前的日线，默认使用面板全部日线
+        market_caps: 按 panel.symbols 顺序的市值，缺失（NaN）或为空时按非大盘股处理
+
+    Returns:
+        TriggerLevels
+    """
+    end = len(panel.dates) if as_of is None else int(np.searchsorted(panel.dates, as_of))
+    n_symbols = len(panel.symbols)
+    if end == 0:
+        empty = np.full(n_symbols, np.nan)
+        return TriggerLevels(list(panel.symbols), empty, empty.copy(), empty.copy())
+
+    if market_caps is None:
+        market_caps = np.full(n_symbols, np.nan)
+    threshold = np.where(market_caps >= config.large_cap_market_cap,
+                         config.threshold_large_cap, config.threshold_small_cap)
+    width = max(config.ma_period, config.bollinger_period)
+    close = np.asarray(panel.field('close')[:, max(end - width, 0):end])
+    prev_open = np.asarray(panel.field('open')[:, end - 1])
+    prev_high = np.asarray(panel.field('high')[:, end - 1])
+    prev_close = close[:, -1]
+
+    # 布林带：只需要前 n-1 日收盘价
+    n = config.bollinger_period
+    k = config.bollinger_std
+    bollinger_price = np.full(n_symbols, np.nan)
+    if end >= n - 1:
+        window = close[:, close.shape[1] - (n - 1):]
+        mean = window.mean(axis=1)
+        if n - 1 > k * k:
+            variance = window.var(axis=1)
+            bollinger_price = mean - k * np.sqrt(n * variance / (n - 1 - k * k))
+        else:
+            bollinger_price = mean
+    # 均线：只需要前 N-1 日收盘价之和
+    big_n = config.ma_period
+    if big_n > 1:
+        ma_price = np.full(n_symbols, np.nan)
+        if end >= big_n - 1:
+            total = close[:, close.shape[1] - (big_n - 1):].sum(axis=1)
+            ma_price = total * (1 - threshold) / (big_n - 1 + threshold)
+        bollinger_price = np.minimum(bollinger_price, ma_price)
+
+    # 前一日（T 日）的准备条件
+    prev_ma = indicators.calculate_sma_panel(close, config.ma_period)[:, -1]
+    prev_lower = indicators.calculate_bollinger_bands_panel(close, n, k).lower[:, -1]
+    prev_setup = (prev_close < prev_lower) & (prev_close <= prev_ma * (1 - threshold))
+
+    # 阳包阴：前一日还必须是阴线
+    engulf_price = np.where(prev_setup & (prev_close < prev_open), prev_open, np.nan)
+
+    return TriggerLevels(
+        symbols=list(panel.symbols),
+        bollinger_price=bollinger_price,
+        engulf_price=engulf_price,
+        break_high_price=np.where(prev_setup, prev_high, np.nan),
+    )
+
+
+def find_trigger_candidates(
+    levels: TriggerLevels,
+    quotes: Dict[str, OHLCData],
+    index: Optional[pd.Index] = None
+) -> List[str]:
+    """
+    向量化比较最新行情与触发价位，返回可能出信号的股票
+
+    Args:
+        levels: 预计算的触发价位
+        quotes: 最新行情 {symbol: OHLCData}
+        index: levels.symbols 构成的 pd.Index（可选，避免每轮重新构建哈希表）
+
+    Returns:
+        越过任一触发价位的股票代码列表
+    """
+    if not quotes:
+        return []
+    if index is None:
+        index = pd.Index(levels.symbols)
+
+    rows = index.get_indexer(list(quotes))
+    prices = np.fromiter((quote['close'] for quote in quotes.values()), dtype=np.float64, count=len(quotes))
+    known = rows >= 0
+    rows, prices = rows[known], prices[known]
+
+    crossed = (
+        (prices < levels.bollinger_price[rows])
+        | (prices >= levels.engulf_price[rows])
+        | (prices > levels.break_high_price[rows])
+    )
+    return np.asarray(levels.symbols, dtype=object)[rows[crossed]].tolist()
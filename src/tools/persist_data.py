@@ -11,17 +11,27 @@ import pathlib
 import traceback
 import time
 import datetime as dt
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
 from ..utils import decorators
 from ..utils import logging 
 import pandas as pd
 from ..config import settings
 import yfinance as yf
-from ..utils import third_api
+from ..utils import rate_limiter
+from ..utils import time as trading_time
 from ..types import common
 from ..data.db_models import database
 from ..data.db_models import StockData
 from ..data import db_operations
+from ..data import panel_store
+from ..data import providers
+from ..data import backfill
+from ..data import universe
+from ..data import membership
+from ..data import stock_info
+from ..data import market_data
+from ..data import features
 
 logger = logging.setup_logger(
     name="persist_data",
@@ -47,25 +57,37 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help='指定日期 YYYY-MM-DD（可选，默认为今天）'
     )
+    parser.add_argument(
+        '--fill-gaps',
+        action='store_true',
+        help='只回补缺失的日线（默认重新下载区间并更新值有变化的日线）'
+    )
     return parser.parse_args()
 
-def load_config(config_path: pathlib.Path) -> None:
-    """加载配置文件"""
+def load_config(config_path: pathlib.Path) -> settings.StorageConfig:
+    """加载配置文件，返回存储配置"""
     # 加载配置
     config = settings.load_config(config_path)
     monitor_config = settings.get_monitor_config(config)
     storage_config = settings.get_storage_config(config)
 
     # 初始化数据库
-    db_operations.init_database(storage_config.db_path)
+    db_operations.init_from_config(storage_config)
+    universe.universe_manager.configure(storage_config.universe_dir, storage_config.universe_ttl_hours)
+    return storage_config
 
-def get_prev_trading_day(date: dt.date, exchange:common.Exchange = "US") -> bool:
+def get_prev_trading_day(date: dt.date, exchange:common.Exchange = "US") -> dt.date:
     """获取上一个交易日, 本函数一般在每日收盘后调用"""
-    curr_date = date # 当前日期，注意为北京时间
-    while True:
-        curr_date = curr_date - dt.timedelta(days=1)
-        if curr_date.weekday() < 5 and third_api.is_trading_day(curr_date, exchange):
-            return curr_date
+    # date 为当前日期，注意为北京时间
+    return trading_time.get_calendar(exchange).previous_session(date)
+
+
+def record_index_membership(indexes: List[str]) -> None:
+    """把最新的成分股快照记入时点成分股区间表"""
+    for index in indexes:
+        snapshot = universe.universe_manager.get_snapshot(index)
+        if snapshot is not None:
+            membership.record_snapshot(index, snapshot.symbols, snapshot.as_of)
 
 
 def persist_single_stock(
@@ -162,6 +184,7 @@ def persist_single_stock(
                 # 插入新数据
                 StockData.create(**stock_record)
                 database.commit()
+                db_operations.history_cache.invalidate_symbols([symbol])
 
                 logger.info(f"  数据写入成功")
 
@@ -181,62 +204,212 @@ def persist_single_stock(
         return False
 
 
+def download_batch(
+    provider: providers.DataProvider,
+    limiter: rate_limiter.TokenBucket,
+    batch: List[str],
+    start_date: dt.date,
+    end_date: dt.date,
+    max_retries: int = 5
+) -> pd.DataFrame:
+    """
+    在令牌桶限流下下载一个批次，被限流时降速并重试
+
+    Args:
+        provider: 数据源
+        limiter: 令牌桶（所有下载线程共享）
+        batch: 股票代码
+        start_date: 开始日期（含）
+        end_date: 结束日期（含）
+        max_retries: 被限流后的最大重试次数
+
+    Returns:
+        长表格式的日线数据
+    """
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        try:
+            data = provider.download(batch, start_date, end_date)
+        except providers.ThrottledError as e:
+            limiter.on_throttled()
+            logger.warning(f"批次被限流（{batch[0]} 等 {len(batch)} 只，第 {attempt + 1} 次）: {e}，"
+                           f"速率降至 {limiter.rate:.2f}/s")
+            continue
+        limiter.on_success()
+        return data
+    raise providers.ThrottledError(f"重试 {max_retries} 次后仍被限流: {batch[0]} 等 {len(batch)} 只")
+
+
+def persist_stock_info(
+    tickers: List[str],
+    as_of: dt.date,
+    fetcher: Callable[[str], market_data.StockInfo] = None,
+    max_workers: int = 4,
+    requests_per_second: float = 2.0,
+    max_retries: int = 3
+) -> int:
+    """
+    批量刷新股票信息快照（市值、行业等），每日一次
+
+    只请求 as_of 当日还没有快照的股票，中断后重跑会从断点继续。
+
+    Args:
+        tickers: 股票代码
+        as_of: 快照日期
+        fetcher: 单只股票信息获取函数，默认 market_data.fetch_stock_info
+        max_workers: 并发请求线程数
+        requests_per_second: 初始请求速率，被限流时自适应降低
+        max_retries: 单只股票被限流后的最大重试次数
+
+    Returns:
+        写入的快照行数
+    """
+    fetcher = fetcher or market_data.fetch_stock_info
+    done = stock_info.get_snapshot_symbols(as_of)
+    pending = [t for t in tickers if t not in done]
+    if not pending:
+        logger.info(f"{as_of} 股票信息快照已是最新")
+        return 0
+
+    limiter = rate_limiter.TokenBucket(rate=requests_per_second, capacity=max_workers)
+
+    def fetch(symbol: str) -> Optional[market_data.StockInfo]:
+        for attempt in range(max_retries + 1):
+            limiter.acquire()
+            try:
+                info = fetcher(symbol)
+            except Exception as e:
+                if providers.is_rate_limit_error(e):
+                    limiter.on_throttled()
+                    continue
+                logger.warning(f"获取 {symbol} 信息失败: {e}")
+                return None
+            limiter.on_success()
+            return info
+        logger.warning(f"获取 {symbol} 信息重试 {max_retries} 次后仍被限流")
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        infos = [info for info in pool.map(fetch, pending) if info is not None]
+    saved = stock_info.save_stock_info_snapshot(infos, as_of)
+    logger.info(f"股票信息快照已更新: {saved}/{len(pending)} 只 ({as_of})")
+    return saved
+
+
 def persist_stocks_daily(
     tickers: List[str] = None,
     start_date: dt.date = None,
     end_date: dt.date = None,
     overwrite: bool = False,
+    panel_dir: pathlib.Path = None,
+    provider: providers.DataProvider = None,
+    batch_size: int = 20,
+    max_workers: int = 4,
+    requests_per_second: float = 1.0,
+    write_chunk_size: int = db_operations.DEFAULT_WRITE_CHUNK_SIZE,
+    refresh_info: bool = False,
 ) -> bool:
     """
     持久化所有股票的数据
 
+    非覆盖模式下先按交易日历规划缺口，只下载并写入缺失的日线；覆盖模式下下载整个区间。
+    下载由线程池并发执行并共享一个自适应令牌桶；写库在当前线程按下载完成顺序进行，
+    与仍在进行的下载重叠。全部写入后按各股票写入的最早日期增量更新特征表。
+
     Args:
         tickers: List of stock symbols: if None use nasdaq index and SP500 index
         start_date: Start date of the data to be persisted, if none use current date
         end_date: End date of the data to be persisted, if none use current date
-        overwrite: Whether to force overwrite existing data
-        dry_run: Whether to perform a dry run (do not write to database)
+        overwrite: Whether to re-download and overwrite the whole range instead of backfilling gaps
+        panel_dir: Directory of the memory-mapped OHLCV panel, synced after persisting if given
+        provider: Data provider, defaults to YFinanceProvider
+        batch_size: Number of tickers per download request
+        max_workers: Number of concurrent download threads
+        requests_per_second: Initial download rate, adapted to throttling responses
+        write_chunk_size: Rows per transaction when writing to the database
+        refresh_info: Whether to refresh the daily stock info (market cap) snapshot afterwards
 
     Returns:
         A dictionary containing the results of the data persistence
     """
     if not tickers or len(tickers) == 0:
-        tickers = third_api.get_nasdaq_companies()
-        lst2 = third_api.get_sp500_companies()
-        tickers.extend(x for x in lst2 if x not in tickers)
+        tickers = universe.universe_manager.get_symbols(universe.DEFAULT_INDEXES)
+        record_index_membership(universe.DEFAULT_INDEXES)
     if start_date == None:
         start_date = get_prev_trading_day(dt.date.today())
     if end_date == None:
         end_date = get_prev_trading_day(dt.date.today())
     if start_date > end_date:
         raise ValueError("Start date must be before end date")
-    
+
+    provider = provider or providers.YFinanceProvider()
+    limiter = rate_limiter.TokenBucket(rate=requests_per_second, capacity=max_workers)
+    if overwrite:
+        batches = [
+            backfill.BackfillRequest(start_date, end_date, tickers[i:i+batch_size])
+            for i in range(0, len(tickers), batch_size)
+        ]
+    else:
+        batches = backfill.plan_backfill(tickers, start_date, end_date, batch_size=batch_size)
+
     #持久化股票数据
     success = True
-    batch_size = 20
-    delay = 5
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i:i+batch_size]
-        print(f"处理批次 {i//batch_size + 1}: {len(batch)} 个股票")
-        
-        try:
-            start_str = start_date.strftime('%Y-%m-%d')
-            end_str = end_date.strftime('%Y-%m-%d')
-            batch_data = yf.download(tickers=batch, start=start_str, end=end_str, period='1d', group_by='ticker', progress=False)
-            res = db_operations.save_stocks_data(data=batch_data, overwrite=overwrite)
-            if res:
-                logger.info(f"保存批次{i//batch_size + 1}成功!")
-            else:
-                logger.error(f"保存批次{i//batch_size + 1}失败!")
+    written = {}    # symbol -> 本次写入的最早日期
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(download_batch, provider, limiter, batch.symbols, batch.start, batch.end): n
+            for n, batch in enumerate(batches, start=1)
+        }
+        for future in as_completed(futures):
+            n = futures[future]
+            try:
+                batch_data = future.result()
+                batch = batches[n - 1]
+                returned = set(batch_data['symbol']) if not batch_data.empty else set()
+                backfill.record_attempts([s for s in batch.symbols if s not in returned], batch.start, batch.end)
+                if batch_data.empty:
+                    logger.info(f"批次{n}无数据")
+                    continue
+                res = db_operations.save_stocks_data(data=batch_data, overwrite=overwrite,
+                                                     chunk_size=write_chunk_size)
+                if res:
+                    for symbol, day in features.earliest_dates(batch_data).items():
+                        written[symbol] = min(day, written.get(symbol, day))
+                    logger.info(f"保存批次{n}成功!")
+                else:
+                    logger.error(f"保存批次{n}失败!")
+                    success = False
+            except Exception as e:
+                logger.error(f"批次{n}失败: {traceback.format_exc()}")
                 success = False
+
+    logger.info(f"{len(batches)} 个批次处理完成，耗时 {time.perf_counter() - started:.1f}s，"
+                f"最终速率 {limiter.rate:.2f}/s")
+
+    # 增量更新衍生特征表
+    try:
+        features.update_features(written, chunk_size=write_chunk_size)
+    except Exception as e:
+        logger.error(f"更新特征表失败: {traceback.format_exc()}")
+        success = False
+
+    # 增量同步列式行情面板
+    if panel_dir:
+        try:
+            panel_store.sync_panel_store(panel_dir)
         except Exception as e:
-            logger.error(f"批次{i//batch_size + 1}失败: {traceback.format_exc()}")
+            logger.error(f"同步行情面板失败: {traceback.format_exc()}")
             success = False
-        
-        if i + batch_size < len(tickers):
-            logger.info(f"等待 {delay} 秒...")
-            time.sleep(delay)
-    
+
+    # 每日刷新一次股票信息快照
+    if refresh_info:
+        try:
+            persist_stock_info(tickers, end_date)
+        except Exception as e:
+            logger.error(f"刷新股票信息快照失败: {traceback.format_exc()}")
+            success = False
+
     return success
 
 
@@ -273,9 +446,12 @@ def main() -> None:
             start_date = dt.datetime.strptime(args.startdate, '%Y%m%d').date()
         if args.enddate:
             end_date = dt.datetime.strptime(args.end_date, '%Y%m%d').date()
-        load_config(pathlib.Path(__file__).parent.parent / "config" / "config.toml")
+        storage_config = load_config(pathlib.Path(__file__).parent.parent / "config" / "config.toml")
         # 每日执行持久化任务
-        result = persist_stocks_daily(start_date=start_date, end_date=end_date, overwrite=True)
+        result = persist_stocks_daily(start_date=start_date, end_date=end_date, overwrite=not args.fill_gaps,
+                                      panel_dir=storage_config.panel_dir,
+                                      write_chunk_size=storage_config.write_chunk_size,
+                                      refresh_info=True)
 
         # 输出结果
         logger.info(f"持久化任务完成: success = {result}")
@@ -1,53 +1,126 @@
 """
 订单管理模块
+
+订单保存在进程内的登记表中（按 order_id 索引），持久化见 db_operations.save_order。
+时间参数为空时使用当前时间，回测时传入 K 线时间。
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
 from ..types.common import Order
 
+ORDER_SIDES = ("buy", "sell")
+ORDER_TYPES = ("limit", "market", "stop_limit")
+
+_orders: Dict[str, Order] = {}
+
 
 def create_order(
     symbol: str,
     side: str,
     quantity: int,
     price: float,
-    order_type: str = "limit"
+    order_type: str = "limit",
+    stop_price: Optional[float] = None,
+    signal_id: Optional[str] = None,
+    created_time: Optional[datetime] = None
 ) -> Order:
-    """创建订单"""
-    pass
+    """创建订单（状态为 pending），无效订单状态为 rejected"""
+    now = created_time or datetime.now()
+    order = Order(
+        order_id=uuid.uuid4().hex,
+        symbol=symbol,
+        side=side,
+        order_type=order_type,
+        quantity=quantity,
+        price=price,
+        stop_price=stop_price,
+        status="pending",
+        created_time=now,
+        updated_time=now,
+        filled_price=None,
+        filled_quantity=0,
+        signal_id=signal_id,
+    )
+    if not validate_order(order):
+        order['status'] = "rejected"
+    _orders[order['order_id']] = order
+    return order
 
 
 def validate_order(order: Order) -> bool:
     """验证订单有效性"""
-    pass
+    if order['side'] not in ORDER_SIDES or order['order_type'] not in ORDER_TYPES:
+        return False
+    if order['quantity'] <= 0:
+        return False
+    if order['order_type'] != "market" and not order['price'] > 0:
+        return False
+    if order['order_type'] == "stop_limit" and not (order['stop_price'] or 0) > 0:
+        return False
+    return True
 
 
 def calculate_order_value(order: Order) -> float:
-    """计算订单金额"""
-    pass
+    """计算订单金额（已成交按成交价，否则按委托价）"""
+    price = order['filled_price'] if order['filled_price'] is not None else order['price']
+    quantity = order['filled_quantity'] or order['quantity']
+    return quantity * price
 
 
 def update_order_status(
     order_id: str,
     status: str,
-    fill_price: Optional[float] = None
+    fill_price: Optional[float] = None,
+    updated_time: Optional[datetime] = None
 ) -> Order:
-    """更新订单状态"""
-    pass
+    """更新订单状态，成交时记录成交价与成交数量"""
+    order = _orders[order_id]
+    order['status'] = status
+    order['updated_time'] = updated_time or datetime.now()
+    if status == "filled":
+        order['filled_price'] = fill_price if fill_price is not None else order['price']
+        order['filled_quantity'] = order['quantity']
+    return order
 
 
-def cancel_order(order_id: str) -> bool:
-    """取消订单"""
-    pass
+def cancel_order(order_id: str, updated_time: Optional[datetime] = None) -> bool:
+    """取消订单，只有 pending 状态的订单可以取消"""
+    order = _orders.get(order_id)
+    if order is None or order['status'] != "pending":
+        return False
+    update_order_status(order_id, "cancelled", updated_time=updated_time)
+    return True
 
 
-def get_pending_orders() -> List[Order]:
+def get_pending_orders(symbol: Optional[str] = None) -> List[Order]:
     """获取待处理订单"""
-    pass
+    return [
+        order for order in _orders.values()
+        if order['status'] == "pending" and (symbol is None or order['symbol'] == symbol)
+    ]
 
 
 def check_order_fills(order: Order, current_price: float) -> bool:
-    """检查订单是否成交"""
-    pass
+    """
+    检查订单是否成交
+
+    回测中买单传入 K 线最低价、卖单传入最高价，即判断该 K 线内是否触及委托价。
+    """
+    if order['status'] != "pending":
+        return False
+    if order['order_type'] == "market":
+        return True
+    if order['side'] == "buy":
+        if order['order_type'] == "stop_limit" and current_price < order['stop_price']:
+            return False
+        return current_price <= order['price']
+    if order['order_type'] == "stop_limit" and current_price > order['stop_price']:
+        return False
+    return current_price >= order['price']
+
+
+def clear_orders() -> None:
+    """清空订单登记表（回测开始前调用）"""
+    _orders.clear()
@@ -1,52 +1,89 @@
 """
 持仓管理模块
+
+持仓保存在进程内的登记表中（按 position_id 索引），持久化见 db_operations.save_position。
+时间参数为空时使用当前时间，回测时传入 K 线时间。
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
 from ..types.common import Position
 
+_positions: Dict[str, Position] = {}
+
 
 def create_position(
     symbol: str,
     entry_price: float,
     quantity: int,
-    stop_loss: float
+    stop_loss: float,
+    target_price: float = float('nan'),
+    entry_time: Optional[datetime] = None,
+    signal_id: Optional[str] = None
 ) -> Position:
     """创建持仓"""
-    pass
+    position = Position(
+        position_id=uuid.uuid4().hex,
+        symbol=symbol,
+        entry_price=entry_price,
+        current_price=entry_price,
+        quantity=quantity,
+        stop_loss=stop_loss,
+        target_price=target_price,
+        status="open",
+        entry_time=entry_time or datetime.now(),
+        exit_time=None,
+        exit_price=None,
+        unrealized_pnl=0.0,
+        realized_pnl=0.0,
+        signal_id=signal_id,
+    )
+    _positions[position['position_id']] = position
+    return position
 
 
 def update_position(
     position_id: str,
     **kwargs
 ) -> Position:
-    """更新持仓"""
-    pass
+    """更新持仓，更新 current_price 时同时重算浮动盈亏"""
+    position = _positions[position_id]
+    position.update(kwargs)
+    if 'current_price' in kwargs and position['status'] == "open":
+        position['unrealized_pnl'] = calculate_pnl(position, position['current_price'])
+    return position
 
 
 def close_position(
     position_id: str,
-    exit_price: float
+    exit_price: float,
+    exit_time: Optional[datetime] = None
 ) -> Position:
     """平仓"""
-    pass
+    position = _positions[position_id]
+    position['status'] = "closed"
+    position['exit_price'] = exit_price
+    position['exit_time'] = exit_time or datetime.now()
+    position['current_price'] = exit_price
+    position['realized_pnl'] = calculate_pnl(position, exit_price)
+    position['unrealized_pnl'] = 0.0
+    return position
 
 
 def calculate_pnl(position: Position, current_price: float) -> float:
     """计算盈亏"""
-    pass
+    return (current_price - position['entry_price']) * position['quantity']
 
 
 def calculate_pnl_percent(position: Position, current_price: float) -> float:
     """计算盈亏百分比"""
-    pass
+    return current_price / position['entry_price'] - 1
 
 
 def should_stop_loss(position: Position, current_price: float) -> bool:
     """判断是否应该止损"""
-    pass
+    return current_price <= position['stop_loss']
 
 
 def should_take_profit(
@@ -55,14 +92,22 @@ def should_take_profit(
     target_price: float
 ) -> bool:
     """判断是否应该止盈"""
-    pass
+    return current_price >= target_price
 
 
 def get_open_positions() -> List[Position]:
     """获取未平仓持仓"""
-    pass
+    return [p for p in _positions.values() if p['status'] == "open"]
 
 
 def get_position_by_symbol(symbol: str) -> Optional[Position]:
-    """根据股票代码获取持仓"""
-    pass
+    """根据股票代码获取持仓（未平仓）"""
+    for position in _positions.values():
+        if position['symbol'] == symbol and position['status'] == "open":
+            return position
+    return None
+
+
+def clear_positions() -> None:
+    """清空持仓登记表（回测开始前调用）"""
+    _positions.clear()
@@ -55,14 +55,15 @@ def setup_logger(
                 filename=log_file,
                 when='midnight',          # 'midnight' 表示每天午夜0:00创建新日志文件
                 interval=1,
-                encoding='utf-8'
+                encoding='utf-8',
+                delay=True                # 首次写入时才创建文件
             )
             file_handler.suffix = '%Y-%m-%d'
             file_handler.setLevel(level)
             file_handler.setFormatter(formatter)
             logger.addHandler(file_handler)
         else:
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
             file_handler.setLevel(level)
             file_handler.setFormatter(formatter)
             logger.addHandler(file_handler)
@@ -0,0 +1,78 @@
+"""
+限流工具模块
+
+令牌桶限流器，速率按 AIMD 规则自适应：成功时线性加速，被限流时成倍降速。
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """线程安全的自适应令牌桶"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        min_rate: float = None,
+        max_rate: float = None,
+        increase_step: float = None,
+        decrease_factor: float = 0.5
+    ):
+        """
+        初始化
+
+        Args:
+            rate: 初始速率（令牌/秒）
+            capacity: 桶容量（允许的突发请求数）
+            min_rate: 最低速率，默认 rate 的 1/8
+            max_rate: 最高速率，默认 rate 的 4 倍
+            increase_step: 每次成功增加的速率，默认 rate 的 1/10
+            decrease_factor: 每次被限流时速率乘以该系数
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate if min_rate is not None else rate / 8
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase_step = increase_step if increase_step is not None else rate / 10
+        self.decrease_factor = decrease_factor
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时阻塞等待
+
+        Returns:
+            等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self) -> None:
+        """请求成功：线性提高速率"""
+        with self.lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self) -> None:
+        """请求被限流：成倍降低速率并清空令牌"""
+        with self.lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = 0.0
+
+    def _refill(self) -> None:
+        """按当前速率补充令牌（调用方持有锁）"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
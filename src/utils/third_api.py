@@ -6,14 +6,13 @@ import requests
 import pandas as pd
 from io import StringIO
 from typing import List, Dict, Any
-import pandas_market_calendars as mcal
 from . import logging
+from .time import get_calendar
 
-nyse = mcal.get_calendar("NYSE")
 logger = logging.get_logger(__name__)
 
-def is_trading_day(date_str: str) -> bool:
-    return nyse.valid_days(start_date=date_str, end_date=date_str)
+def is_trading_day(date_str: str, exchange: str = "US") -> bool:
+    return get_calendar(exchange).is_session(date_str)
 
 
 def get_nasdaq_companies() -> List[str]:
@@ -59,7 +58,8 @@ def get_sp500_companies() -> List[str]:
         url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
         response = requests.get(url, headers=headers, timeout=30)
         response.raise_for_status()
-        tables = pd.read_html(StringIO(response.text))
+        # 只解析成分股表，跳过页面中的其他表格
+        tables = pd.read_html(StringIO(response.text), attrs={'id': 'constituents'})
         df = tables[0]
 
         # 查找 Ticker 列
@@ -1,39 +1,259 @@
 """
 时间工具模块
+
+TradingCalendar 按自然年计算交易所的交易日与开收盘时间，已完全过去的年份缓存到磁盘
+（每年一个 .npz 文件，文件名带 pandas_market_calendars 版本号，升级后自动重新计算；
+当年及以后的年份可能随新公布的休市日变化，只在进程内缓存），
+之后的交易日判断、前后交易日与区间查询都在内存中的有序数组上用 searchsorted 完成，
+并提供对日期数组的向量化版本。
 """
+import datetime as dt
+import pathlib
+import threading
 from datetime import datetime
+from typing import Dict, Iterable, Union
+
+import numpy as np
+import pandas as pd
+import pandas_market_calendars as mcal
+
+from . import logging
+
+logger = logging.get_logger(__name__)
+
+# 交易日历磁盘缓存目录
+DEFAULT_CALENDAR_DIR = pathlib.Path(__file__).resolve().parent.parent / 'data' / 'calendar'
+
+# common.Exchange -> pandas_market_calendars 日历名
+EXCHANGE_CALENDARS = {'US': 'NYSE', 'HK': 'HKEX'}
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 磁盘缓存的版本标识：日历库升级（休市规则修正）后旧缓存不再命中
+CALENDAR_CACHE_VERSION = mcal.__version__
+
+DateLike = Union[dt.date, datetime, str, np.datetime64, pd.Timestamp]
+
+
+class TradingCalendar:
+    """交易日历（线程安全，按年懒加载）"""
+
+    def __init__(self, name: str = 'NYSE', cache_dir: pathlib.Path = None):
+        """
+        初始化
+
+        Args:
+            name: pandas_market_calendars 日历名
+            cache_dir: 磁盘缓存目录，默认 src/data/calendar
+        """
+        self.name = name
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir is not None else DEFAULT_CALENDAR_DIR
+        self.years = set()
+        self.sessions = np.array([], dtype='datetime64[D]')
+        self.opens = np.array([], dtype='datetime64[s]')    # UTC
+        self.closes = np.array([], dtype='datetime64[s]')   # UTC
+        self.lock = threading.Lock()
+
+    def is_session(self, date: DateLike) -> bool:
+        """判断是否为交易日"""
+        return bool(self.is_session_array([date])[0])
+
+    def is_session_array(self, dates: Iterable[DateLike]) -> np.ndarray:
+        """向量化判断是否为交易日，返回 bool 数组"""
+        days = _to_days(dates)
+        sessions = self._sessions_for(days)
+        if not len(sessions):
+            return np.zeros(len(days), dtype=bool)
+        idx = np.minimum(np.searchsorted(sessions, days), len(sessions) - 1)
+        return sessions[idx] == days
+
+    def previous_session(self, date: DateLike) -> dt.date:
+        """获取 date 之前（不含当日）的最近一个交易日，日历中没有更早的交易日时抛出 ValueError"""
+        return _single(self.previous_sessions([date])[0], f"{date} 之前没有交易日")
+
+    def previous_sessions(self, dates: Iterable[DateLike]) -> np.ndarray:
+        """向量化获取各日期之前（不含当日）的最近一个交易日，datetime64[D] 数组（没有时为 NaT）"""
+        days = _to_days(dates)
+        sessions = self._sessions_for(days)
+        idx = np.searchsorted(sessions, days, side='left') - 1
+        return _take(sessions, idx)
+
+    def next_session(self, date: DateLike) -> dt.date:
+        """获取 date 之后（不含当日）的最近一个交易日，日历中没有更晚的交易日时抛出 ValueError"""
+        return _single(self.next_sessions([date])[0], f"{date} 之后没有交易日")
+
+    def next_sessions(self, dates: Iterable[DateLike]) -> np.ndarray:
+        """向量化获取各日期之后（不含当日）的最近一个交易日，datetime64[D] 数组（没有时为 NaT）"""
+        days = _to_days(dates)
+        sessions = self._sessions_for(days)
+        return _take(sessions, np.searchsorted(sessions, days, side='right'))
+
+    def sessions_in_range(self, start_date: DateLike, end_date: DateLike) -> np.ndarray:
+        """获取 [start_date, end_date]（含两端）内的交易日，datetime64[D] 升序数组"""
+        days = _to_days([start_date, end_date])
+        if days[0] > days[1]:
+            return np.array([], dtype='datetime64[D]')
+        sessions = self._sessions_for(days)
+        lo, hi = np.searchsorted(sessions, days[0], side='left'), np.searchsorted(sessions, days[1], side='right')
+        return sessions[lo:hi]
+
+    def is_open_at(self, moment: datetime) -> bool:
+        """判断某一时刻是否处于交易时段（含提前收盘），naive 时间按 UTC 处理"""
+        ts = pd.Timestamp(moment)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert('UTC').tz_localize(None)
+        now = np.datetime64(ts.to_datetime64(), 's')
+        self._sessions_for(_to_days([ts]))
+        idx = np.searchsorted(self.opens, now, side='right') - 1
+        return bool(idx >= 0 and now < self.closes[idx])
+
+    def _sessions_for(self, days: np.ndarray) -> np.ndarray:
+        """确保覆盖 days 所在年份（前后各多一年，供前后交易日查询）并返回交易日数组"""
+        if len(days):
+            years = days.astype('datetime64[Y]').astype(int) + 1970
+            self._ensure_years(int(years.min()) - 1, int(years.max()) + 1)
+        return self.sessions
+
+    def _ensure_years(self, first_year: int, last_year: int) -> None:
+        """加载 [first_year, last_year] 的日历：优先读磁盘缓存，缺失的年份一次性计算后写入缓存"""
+        wanted = set(range(first_year, last_year + 1))
+        if wanted <= self.years:
+            return
+        with self.lock:
+            pending = sorted(wanted - self.years)
+            if not pending:
+                return
+            loaded = {}
+            for year in pending:
+                path = self._cache_path(year)
+                if path.exists():
+                    with np.load(path) as cached:
+                        loaded[year] = (cached['sessions'], cached['opens'], cached['closes'])
+            missing = [year for year in pending if year not in loaded]
+            if missing:
+                loaded.update(self._compute_years(missing[0], missing[-1], missing))
+
+            parts = [(self.sessions, self.opens, self.closes)] + list(loaded.values())
+            sessions = np.concatenate([p[0] for p in parts])
+            order = np.argsort(sessions, kind='stable')
+            self.opens = np.concatenate([p[1] for p in parts])[order]
+            self.closes = np.concatenate([p[2] for p in parts])[order]
+            self.sessions = sessions[order]
+            self.years |= set(pending)
+
+    def _compute_years(self, first_year: int, last_year: int, years: list) -> Dict[int, tuple]:
+        """
+        用 pandas_market_calendars 计算 [first_year, last_year] 的日历，按年拆分 years 中的年份
+
+        只有已完全过去的年份写入磁盘缓存；当年及以后的日历可能随交易所公告变化，每个进程重新计算。
+        """
+        schedule = mcal.get_calendar(self.name).schedule(
+            start_date=f'{first_year}-01-01', end_date=f'{last_year}-12-31'
+        )
+        sessions = schedule.index.values.astype('datetime64[D]')
+        opens = schedule['market_open'].dt.tz_convert('UTC').dt.tz_localize(None).values.astype('datetime64[s]')
+        closes = schedule['market_close'].dt.tz_convert('UTC').dt.tz_localize(None).values.astype('datetime64[s]')
+        session_years = sessions.astype('datetime64[Y]').astype(int) + 1970
+        logger.info(f"计算 {self.name} 交易日历: {first_year}-{last_year}，共 {len(sessions)} 个交易日")
+
+        result = {}
+        current_year = dt.date.today().year
+        for year in years:
+            mask = session_years == year
+            result[year] = (sessions[mask], opens[mask], closes[mask])
+            if year < current_year:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                np.savez(self._cache_path(year), sessions=sessions[mask], opens=opens[mask], closes=closes[mask])
+        return result
+
+    def _cache_path(self, year: int) -> pathlib.Path:
+        """某一年的缓存文件路径"""
+        return self.cache_dir / f'{self.name}_{year}_{CALENDAR_CACHE_VERSION}.npz'
+
+
+_calendars: Dict[str, TradingCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(exchange: str = 'US') -> TradingCalendar:
+    """
+    获取交易所的交易日历（进程内单例）
+
+    Args:
+        exchange: common.Exchange（'US'、'HK'）或 pandas_market_calendars 日历名
+    """
+    name = EXCHANGE_CALENDARS.get(exchange, exchange)
+    with _calendars_lock:
+        if name not in _calendars:
+            _calendars[name] = TradingCalendar(name)
+        return _calendars[name]
 
 
 def get_trading_day(date: datetime) -> datetime:
-    """获取交易日（跳过周末）"""
-    pass
+    """获取交易日：date 为交易日时返回自身，否则返回之前最近的交易日"""
+    calendar = get_calendar()
+    if calendar.is_session(date):
+        return date
+    return _like(date, calendar.previous_session(date))
 
 
 def is_trading_day(date: datetime) -> bool:
     """判断是否为交易日"""
-    pass
+    return get_calendar().is_session(date)
 
 
 def is_market_open() -> bool:
     """判断市场是否开盘"""
-    pass
+    return get_calendar().is_open_at(datetime.now(dt.timezone.utc))
 
 
 def get_next_trading_day(date: datetime) -> datetime:
     """获取下一个交易日"""
-    pass
+    return _like(date, get_calendar().next_session(date))
 
 
 def get_previous_trading_day(date: datetime) -> datetime:
     """获取上一个交易日"""
-    pass
+    return _like(date, get_calendar().previous_session(date))
 
 
 def format_timestamp(ts: datetime) -> str:
     """格式化时间戳"""
-    pass
+    return ts.strftime(TIMESTAMP_FORMAT)
 
 
 def parse_timestamp(ts_str: str) -> datetime:
     """解析时间戳"""
-    pass
+    return datetime.strptime(ts_str, TIMESTAMP_FORMAT)
+
+
+def _to_days(dates: Iterable[DateLike]) -> np.ndarray:
+    """日期（date/datetime/字符串/Timestamp）转换为 datetime64[D] 数组"""
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype('datetime64[D]')
+    index = pd.DatetimeIndex([pd.Timestamp(d) for d in dates]) if not isinstance(dates, pd.DatetimeIndex) else dates
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[D]')
+
+
+def _take(sessions: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """按下标取交易日，越界（之前或之后没有交易日）处为 NaT"""
+    valid = (idx >= 0) & (idx < len(sessions))
+    result = np.full(len(idx), np.datetime64('NaT'), dtype='datetime64[D]')
+    result[valid] = sessions[idx[valid]]
+    return result
+
+
+def _single(day: np.datetime64, message: str) -> dt.date:
+    """单个交易日转换为 date，NaT 时抛出 ValueError"""
+    if np.isnat(day):
+        raise ValueError(message)
+    return day.astype(dt.date)
+
+
+def _like(original: DateLike, date: dt.date) -> DateLike:
+    """按输入类型返回结果：datetime 输入返回当日零点的 datetime，其他返回 date"""
+    if isinstance(original, datetime):
+        return datetime.combine(date, dt.time())
+    return date
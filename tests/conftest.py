@@ -0,0 +1,33 @@
+"""
+测试公共夹具
+"""
+import logging
+
+import pytest
+
+from src.data import db_operations
+from src.data.db_models import database
+
+
+@pytest.fixture
+def db(tmp_path):
+    """在临时目录中初始化 SQLite 数据库，测试结束后关闭连接并清空历史数据缓存"""
+    db_operations.init_database(str(tmp_path / 'test.db'))
+    db_operations.history_cache.clear()
+    yield database
+    db_operations.history_cache.clear()
+    database.close()
+
+
+@pytest.fixture
+def persist_log(tmp_path):
+    """把持久化工具的日志改写到临时文件，避免测试输出进入 src/logs"""
+    from src.tools import persist_data
+
+    log_file = tmp_path / 'persist_data.log'
+    original = persist_data.logger.handlers[:]
+    persist_data.logger.handlers = [logging.FileHandler(log_file, encoding='utf-8')]
+    yield log_file
+    for handler in persist_data.logger.handlers:
+        handler.close()
+    persist_data.logger.handlers = original
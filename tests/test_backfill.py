@@ -0,0 +1,42 @@
+"""
+缺口回补规划测试
+"""
+import datetime as dt
+
+import pandas as pd
+
+from src.data import backfill, db_operations
+
+START, END = dt.date(2024, 1, 2), dt.date(2024, 1, 12)
+
+
+def _store(symbol: str, dates) -> None:
+    db_operations.save_stocks_data(pd.DataFrame({
+        'symbol': symbol, 'date': pd.to_datetime(list(dates)),
+        'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 1,
+    }))
+
+
+def test_plan_backfill_groups_gaps(db):
+    sessions = backfill.get_sessions(START, END)
+    _store('AAA', sessions.astype(dt.date))
+    _store('BBB', [d for d in sessions.astype(dt.date) if d != dt.date(2024, 1, 5)])
+
+    requests = backfill.plan_backfill(['AAA', 'BBB', 'NEW'], START, END)
+    assert backfill.BackfillRequest(dt.date(2024, 1, 5), dt.date(2024, 1, 5), ['BBB']) in requests
+    assert backfill.BackfillRequest(START, END, ['NEW']) in requests
+    assert not any('AAA' in r.symbols for r in requests)
+
+
+def test_attempted_ranges_are_not_planned_again(db):
+    # 区间结束后很快尝试的记录不生效（数据可能尚未发布）
+    backfill.record_attempts(['NEW'], START, END, attempted_at=END)
+    assert backfill.plan_backfill(['NEW'], START, END) == [backfill.BackfillRequest(START, END, ['NEW'])]
+
+    backfill.record_attempts(['NEW'], START, END, attempted_at=END + dt.timedelta(days=backfill.ATTEMPT_SETTLE_DAYS))
+    assert backfill.plan_backfill(['NEW'], START, END) == []
+    # 更长的区间只请求尚未尝试的部分
+    later = dt.date(2024, 1, 19)
+    assert backfill.plan_backfill(['NEW'], START, later) == [
+        backfill.BackfillRequest(dt.date(2024, 1, 16), later, ['NEW'])
+    ]
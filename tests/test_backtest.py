@@ -0,0 +1,172 @@
+"""
+向量化回测测试：单只股票的手算权益曲线（次日限价成交、止盈离场、双边佣金），
+以及事件驱动回测与向量化回测在同一面板上的交易一致性
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import event_driven, vectorized
+from src.config.settings import BacktestConfig, StrategyConfig
+from src.data.panel_store import OHLCVPanel
+from src.strategy import indicators
+from src.strategy.base import BaseStrategy
+
+# (open, high, low, close, volume)
+BARS = [
+    (10.5, 11.0, 10.0, 10.5, 1000),
+    (10.2, 10.5, 9.8, 10.0, 1000),    # 信号日，挂单价 = 收盘价 10.0
+    (10.5, 10.8, 10.2, 10.6, 1000),   # 最低价高于挂单价，未成交
+    (9.8, 10.1, 9.5, 9.9, 1000),      # 开盘价低于挂单价，按开盘价 9.8 成交
+    (10.0, 11.0, 9.9, 10.8, 1000),
+    (11.0, 12.0, 10.9, 11.9, 1000),   # 最高价触及目标价 11.76，按目标价离场
+    (12.0, 12.0, 12.0, 12.0, 1000),
+]
+
+
+def _run(commission_rate: float, n_symbols: int = 1, **backtest_options):
+    data = np.repeat(np.array(BARS, dtype=np.float64)[np.newaxis], n_symbols, axis=0)
+    dates = np.datetime64('2024-01-01') + np.arange(len(BARS))
+    panel = OHLCVPanel(symbols=[f'S{i}' for i in range(n_symbols)], dates=dates, data=data)
+    # 只让第 1 日满足准备条件：其他日期指标为 NaN
+    ma = np.full((n_symbols, len(BARS)), np.nan)
+    lower = np.full((n_symbols, len(BARS)), np.nan)
+    ma[:, 1] = lower[:, 1] = 100.0
+    config = StrategyConfig(ma_period=3, bollinger_period=3, bollinger_std=2.0, threshold_large_cap=0.0,
+                            threshold_small_cap=0.0, large_cap_market_cap=3.0e11, risk_reward_ratio=2.0,
+                            stop_loss_pct=0.1)
+    tradable = backtest_options.pop('tradable', None)
+    options = {'position_size': 0.1, **backtest_options}
+    backtest_config = BacktestConfig(signal_types=['bollinger_breakout'], initial_capital=100000.0,
+                                     commission_rate=commission_rate, **options)
+    return vectorized.simulate(panel, vectorized.BacktestIndicators(ma=ma, bollinger_lower=lower),
+                               config, backtest_config, tradable=tradable)
+
+
+@pytest.mark.parametrize('commission_rate', [0.0, 0.001])
+def test_simulate_matches_hand_computed_equity(commission_rate):
+    result = _run(commission_rate)
+
+    assert len(result.trades) == 1
+    trade = result.trades.iloc[0]
+    assert trade['signal_date'].day == 2 and trade['entry_date'].day == 4 and trade['exit_date'].day == 6
+    assert trade['entry_price'] == 9.8
+    assert trade['stop_loss'] == pytest.approx(8.82)
+    assert trade['target_price'] == pytest.approx(11.76)
+    assert trade['exit_price'] == pytest.approx(11.76)
+    assert trade['exit_reason'] == 'target'
+
+    shares = 10000.0 / 9.8
+    cost = 9.8 * (1 + commission_rate)
+    proceeds = 11.76 * (1 - commission_rate)
+    assert trade['shares'] == pytest.approx(shares)
+    assert trade['pnl'] == pytest.approx(shares * (proceeds - cost))
+    assert trade['return'] == pytest.approx(proceeds / cost - 1)
+
+    expected = 100000.0 + np.array([
+        0.0, 0.0, 0.0,
+        shares * (9.9 - cost),        # 入场日按收盘价盯市
+        shares * (10.8 - cost),
+        shares * (proceeds - cost),   # 离场日计入已实现盈亏
+        shares * (proceeds - cost),
+    ])
+    np.testing.assert_allclose(result.equity.to_numpy(), expected, rtol=1e-12)
+    assert result.metrics['total_return'] == pytest.approx(expected[-1] / 100000.0 - 1)
+
+
+def test_commission_reduces_equity():
+    assert _run(0.001).equity.iloc[-1] < _run(0.0).equity.iloc[-1]
+
+
+@pytest.mark.parametrize('options, expected', [
+    ({}, ['S0', 'S1', 'S2']),
+    ({'max_positions': 2}, ['S0', 'S1']),
+    ({'position_size': 0.4}, ['S0', 'S1']),            # 第三笔时可用资金 20000 < 40000
+    ({'position_size': 0.5, 'commission_rate': 0.01}, ['S0']),  # 第二笔含佣金成本 50500 > 剩余资金
+])
+def test_simulate_limits_concurrent_positions(options, expected):
+    commission_rate = options.pop('commission_rate', 0.0)
+    result = _run(commission_rate, n_symbols=3, **options)
+    assert result.trades['symbol'].tolist() == expected
+
+
+def test_simulate_skips_signals_outside_tradable_mask():
+    tradable = np.ones((2, len(BARS)), dtype=bool)
+    tradable[0, 1] = False
+    assert _run(0.0, n_symbols=2, tradable=tradable).trades['symbol'].tolist() == ['S1']
+
+
+def test_compute_signals_uses_point_in_time_market_caps():
+    close = np.array([[10.0, 9.0, 9.0]])
+    panel = OHLCVPanel(symbols=['AAA'], dates=np.datetime64('2024-01-01') + np.arange(3),
+                       data=np.repeat(close[..., np.newaxis], 5, axis=2))
+    ind = vectorized.BacktestIndicators(ma=np.full((1, 3), 10.0), bollinger_lower=np.full((1, 3), 100.0))
+    config = StrategyConfig(ma_period=3, bollinger_period=3, bollinger_std=2.0, threshold_large_cap=0.05,
+                            threshold_small_cap=0.2, large_cap_market_cap=1.0e11, risk_reward_ratio=2.0)
+    # 第 1 日为大盘股（阈值 5%，偏离 10% 满足），第 2 日市值下降为小盘股（阈值 20%，不满足）
+    market_caps = np.array([[2.0e11, 2.0e11, 5.0e10]])
+    signals = vectorized.compute_signals(panel, ind, config, ['bollinger_breakout'], market_caps)
+    assert signals.code[0].tolist() == [0, 1, 0]
+
+
+class _BollingerBreakoutStrategy(BaseStrategy):
+    """与向量化回测 bollinger_breakout 相同条件的逐 K 线策略（按非大盘股阈值）"""
+
+    def __init__(self, config: StrategyConfig):
+        self.config = config
+
+    def analyze(self, symbol, data):
+        close = data['close']
+        ma = indicators.calculate_sma(close, self.config.ma_period).iloc[-1]
+        lower = indicators.calculate_bollinger_bands(close, self.config.bollinger_period,
+                                                     self.config.bollinger_std).lower.iloc[-1]
+        price = close.iloc[-1]
+        if not (price < lower and price <= ma * (1 - self.config.threshold_small_cap)):
+            return None
+        stop = price * (1 - self.config.stop_loss_pct)
+        return {
+            'symbol': symbol, 'signal_type': 'bollinger_breakout', 'signal_time': data.index[-1],
+            'entry_price': price, 'stop_loss': stop,
+            'target_price': price + self.config.risk_reward_ratio * (price - stop),
+            'risk_reward_ratio': self.config.risk_reward_ratio, 'confidence': 1.0, 'indicators': {},
+        }
+
+    def should_buy(self, signal):
+        return True
+
+    def should_sell(self, position, data):
+        return False
+
+    def calculate_position_size(self, signal, capital):
+        return capital * 0.05
+
+
+def _random_panel(n_symbols: int, n_dates: int, seed: int = 0) -> OHLCVPanel:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (n_symbols, n_dates)), axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.015, close.shape))
+    spread = np.abs(rng.normal(0, 0.01, close.shape)) * close
+    data = np.stack([open_, np.maximum(open_, close) + spread, np.minimum(open_, close) - spread,
+                     close, np.full(close.shape, 1000.0)], axis=-1)
+    return OHLCVPanel(symbols=[f'S{i}' for i in range(n_symbols)],
+                      dates=np.datetime64('2024-01-01') + np.arange(n_dates), data=data)
+
+
+def test_event_driven_matches_vectorized_trades():
+    panel = _random_panel(6, 250)
+    config = StrategyConfig(ma_period=20, bollinger_period=10, bollinger_std=1.5, threshold_large_cap=0.05,
+                            threshold_small_cap=0.05, large_cap_market_cap=3.0e11, risk_reward_ratio=2.0,
+                            stop_loss_pct=0.08)
+    backtest_config = BacktestConfig(signal_types=['bollinger_breakout'], start_date='2024-02-01')
+
+    expected = vectorized.run_backtest(panel, config, backtest_config).trades
+    actual = event_driven.run_event_backtest(panel, _BollingerBreakoutStrategy(config), config,
+                                             backtest_config, max_workers=1).trades
+
+    # 股数不比较：事件驱动按整数股下单，向量化按名义金额折算
+    columns = ['symbol', 'signal_type', 'signal_date', 'entry_date', 'exit_date', 'exit_reason']
+    prices = ['entry_price', 'stop_loss', 'target_price', 'exit_price']
+    expected = expected.sort_values(['entry_date', 'symbol'], ignore_index=True)
+    assert len(expected) >= 5
+    pd.testing.assert_frame_equal(actual[columns], expected[columns])
+    np.testing.assert_allclose(actual[prices].to_numpy(), expected[prices].to_numpy(), rtol=1e-12)
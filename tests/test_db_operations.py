@@ -0,0 +1,175 @@
+"""
+日线写入、历史数据缓存与 SQLite 连接配置测试（临时 SQLite 数据库）
+"""
+import threading
+
+import pandas as pd
+
+from src.config.settings import get_storage_config
+from src.data import db_operations
+from src.data.db_models import StockData, database
+
+
+def _bars(symbol: str, dates, close, volume=1000) -> pd.DataFrame:
+    close = pd.Series(close, dtype='float64')
+    return pd.DataFrame({
+        'symbol': symbol,
+        'date': pd.to_datetime(list(dates)),
+        'open': close - 1, 'high': close + 1, 'low': close - 2, 'close': close,
+        'volume': volume,
+    })
+
+
+def _stored():
+    rows = StockData.select().order_by(StockData.symbol, StockData.date)
+    return {(row.symbol, str(row.date)): (row.close, row.volume, row.created_at) for row in rows}
+
+
+def test_upsert_counts_inserted_unchanged_and_updated(db):
+    first = _bars('AAA', ['2024-01-02', '2024-01-03', '2024-01-04'], [10.0, 11.0, 12.0])
+    result = db_operations.upsert_stocks_data(db_operations._prepare_stock_frame(first))
+    assert result == db_operations.UpsertResult(inserted=3, updated=0, unchanged=0)
+    before = _stored()
+
+    # 第 1 行不变、第 2 行收盘价变化、第 3 行成交量变化、第 4 行为新日期
+    second = _bars('AAA', ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'],
+                   [10.0, 11.5, 12.0, 13.0], volume=[1000, 1000, 2000, 1000])
+    result = db_operations.upsert_stocks_data(db_operations._prepare_stock_frame(second))
+    assert result == db_operations.UpsertResult(inserted=1, updated=2, unchanged=1)
+
+    after = _stored()
+    assert after[('AAA', '2024-01-02')] == before[('AAA', '2024-01-02')]
+    assert after[('AAA', '2024-01-03')][:2] == (11.5, 1000)
+    assert after[('AAA', '2024-01-04')][:2] == (12.0, 2000)
+    assert after[('AAA', '2024-01-05')][:2] == (13.0, 1000)
+
+
+def test_upsert_ignores_float_noise(db):
+    data = _bars('AAA', ['2024-01-02'], [10.0])
+    db_operations.upsert_stocks_data(db_operations._prepare_stock_frame(data))
+    noisy = data.assign(close=data['close'] * (1 + db_operations.PRICE_RTOL / 10))
+    result = db_operations.upsert_stocks_data(db_operations._prepare_stock_frame(noisy))
+    assert result == db_operations.UpsertResult(inserted=0, updated=0, unchanged=1)
+
+
+def test_save_stocks_data_overwrite_semantics(db):
+    assert db_operations.save_stocks_data(_bars('AAA', ['2024-01-02'], [10.0]))
+
+    # overwrite=False 只插入不存在的记录，已有记录保持原值
+    assert db_operations.save_stocks_data(_bars('AAA', ['2024-01-02', '2024-01-03'], [99.0, 11.0]))
+    stored = _stored()
+    assert stored[('AAA', '2024-01-02')][0] == 10.0
+    assert stored[('AAA', '2024-01-03')][0] == 11.0
+
+    # overwrite=True 覆盖值有变化的记录
+    assert db_operations.save_stocks_data(_bars('AAA', ['2024-01-02'], [99.0]), overwrite=True)
+    assert _stored()[('AAA', '2024-01-02')][0] == 99.0
+    assert len(_stored()) == 2
+
+
+def test_build_sqlite_pragmas_maps_storage_config():
+    storage_config = get_storage_config({'storage': {'journal_mode': 'delete', 'busy_timeout': 250}})
+    assert db_operations.build_sqlite_pragmas(storage_config) == {
+        'journal_mode': 'delete', 'synchronous': 'normal', 'cache_size': -65536,
+        'mmap_size': 268435456, 'busy_timeout': 250,
+    }
+
+
+def _pragmas() -> tuple:
+    return tuple(database.execute_sql(f'PRAGMA {name}').fetchone()[0]
+                 for name in ('journal_mode', 'synchronous', 'cache_size', 'busy_timeout'))
+
+
+def test_init_from_config_applies_pragmas_on_every_thread_connection(tmp_path):
+    storage_config = get_storage_config({'storage': {'db_path': str(tmp_path / 'cfg.db'), 'busy_timeout': 250}})
+    try:
+        db_operations.init_from_config(storage_config)
+        db_operations.save_stocks_data(_bars('AAA', ['2024-01-02'], [10.0]))
+        # synchronous=normal 对应 1
+        assert _pragmas() == ('wal', 1, -65536, 250)
+
+        # 主线程持有未提交的写事务时，其他线程用自己的连接读取已提交的数据，不被阻塞
+        seen = {}
+
+        def reader():
+            seen['pragmas'] = _pragmas()
+            seen['count'] = StockData.select().count()
+            database.close()
+
+        with database.atomic():
+            StockData.update(close=99.0).execute()
+            thread = threading.Thread(target=reader)
+            thread.start()
+            thread.join(timeout=5)
+        assert seen == {'pragmas': ('wal', 1, -65536, 250), 'count': 1}
+        assert StockData.get().close == 99.0
+    finally:
+        database.close()
+
+
+def test_init_from_config_applies_history_cache_size(tmp_path):
+    storage_config = get_storage_config({'storage': {'db_path': str(tmp_path / 'cfg.db'), 'history_cache_size': 7}})
+    try:
+        db_operations.init_from_config(storage_config)
+        assert db_operations.history_cache.max_entries == 7
+    finally:
+        db_operations.history_cache.resize(1024)
+        database.close()
+
+
+def test_history_cache_is_not_affected_by_caller_mutation(db):
+    db_operations.save_stocks_data(_bars('AAA', ['2024-01-02', '2024-01-03'], [10.0, 11.0]))
+
+    first = db_operations.get_stock_history_data('AAA')
+    assert [r.close for r in first] == [11.0, 10.0]
+    first[0].close = -1.0
+    first.pop()
+
+    second = db_operations.get_stock_history_data('AAA')
+    assert db_operations.get_history_cache_stats().hits >= 1
+    assert [r.close for r in second] == [11.0, 10.0]
+    assert second[0] is not first[0]
+    assert str(second[0].date) == '2024-01-03' and second[0].symbol == 'AAA' and not second[0].dirty_fields
+
+
+def test_history_frame_matches_per_symbol_history(db):
+    db_operations.save_stocks_data(pd.concat([
+        _bars('AAA', ['2024-01-02', '2024-01-03', '2024-01-04'], [10.0, 11.0, 12.0]),
+        _bars('BBB', ['2024-01-03', '2024-01-05'], [20.0, 21.0], volume=500),
+    ]))
+    symbols = ['BBB', 'MISSING', 'AAA']
+    start, end = pd.Timestamp('2024-01-03').date(), pd.Timestamp('2024-01-05').date()
+
+    frame = db_operations.get_stocks_history_frame(symbols, start, end)
+
+    expected = []
+    for symbol in symbols:
+        for record in reversed(db_operations.get_stock_history_data(symbol, start, end)):
+            expected.append({field: getattr(record, field) for field in db_operations.STOCK_COLUMNS})
+    expected = pd.DataFrame(expected).sort_values(['symbol', 'date'], ignore_index=True)
+    expected['date'] = pd.to_datetime(expected['date'])
+    pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+    assert set(frame['symbol']) == {'AAA', 'BBB'}
+    assert db_operations.get_stock_history_data('MISSING', start, end) == []
+
+
+def test_bulk_write_counts_rows_per_chunk(db, monkeypatch):
+    dates = pd.bdate_range('2024-01-02', periods=5)
+    first = db_operations._prepare_stock_frame(pd.concat([
+        _bars('AAA', dates, [10.0, 11.0, 12.0, 13.0, 14.0]),
+        _bars('BBB', dates, [20.0, 21.0, 22.0, 23.0, 24.0]),
+    ], ignore_index=True))
+
+    transactions = []
+    atomic = database.atomic
+    monkeypatch.setattr(database, 'atomic', lambda *args, **kwargs: transactions.append(1) or atomic(*args, **kwargs))
+    result = db_operations.bulk_write_stocks_data(first, chunk_size=3)
+    assert (result.rows, result.affected, len(transactions)) == (10, 10, 4)
+
+    # 与已有记录重叠：IGNORE 只写入新日期，REPLACE 覆盖全部
+    second = db_operations._prepare_stock_frame(_bars('AAA', pd.bdate_range('2024-01-05', periods=4), [1.0] * 4))
+    assert db_operations.bulk_write_stocks_data(second, overwrite=False, chunk_size=3)[:2] == (4, 2)
+    assert db_operations.bulk_write_stocks_data(second, overwrite=True, chunk_size=3)[:2] == (4, 4)
+    stored = _stored()
+    assert len(stored) == 12
+    assert stored[('AAA', '2024-01-05')][0] == 1.0 and stored[('BBB', '2024-01-05')][0] == 23.0
@@ -0,0 +1,75 @@
+"""
+特征表增量更新测试：前缀和递推结果与 pandas 滚动重算一致
+"""
+import numpy as np
+import pandas as pd
+
+from src.data import db_operations, features
+from src.data.db_models import database
+
+
+def _bars(n_dates: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range('2023-01-02', periods=n_dates)
+    frames = []
+    for symbol in ('AAA', 'BBB'):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_dates)))
+        frames.append(pd.DataFrame({
+            'symbol': symbol, 'date': dates,
+            'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+            'volume': rng.integers(1_000, 10_000, n_dates),
+        }))
+    return db_operations._prepare_stock_frame(pd.concat(frames, ignore_index=True))
+
+
+def _write(data: pd.DataFrame):
+    db_operations.bulk_write_stocks_data(data)
+    features.update_features(features.earliest_dates(data))
+
+
+def _assert_matches_rolling(data: pd.DataFrame):
+    columns = ['symbol', 'date', 'seq'] + features.FEATURE_COLUMNS
+    stored = pd.DataFrame(
+        database.execute_sql(f"SELECT {', '.join(columns)} FROM stockfeatures ORDER BY symbol, date").fetchall(),
+        columns=columns,
+    )
+    expected = []
+    for _, group in data.sort_values(['symbol', 'date']).groupby('symbol'):
+        close = group['close']
+        expected.append(pd.DataFrame({
+            'seq': np.arange(len(group)),
+            'ma': close.rolling(features.FEATURE_MA_PERIOD).mean(),
+            'bb_mean': close.rolling(features.FEATURE_BOLLINGER_PERIOD).mean(),
+            'bb_std': close.rolling(features.FEATURE_BOLLINGER_PERIOD).std(ddof=0),
+            'prev_high': group['high'].shift(),
+            'prev_low': group['low'].shift(),
+            'avg_volume': group['volume'].rolling(features.FEATURE_VOLUME_PERIOD).mean(),
+        }))
+    expected = pd.concat(expected, ignore_index=True)
+
+    assert len(stored) == len(expected)
+    for column in expected.columns:
+        np.testing.assert_allclose(stored[column].to_numpy(dtype=np.float64),
+                                   expected[column].to_numpy(dtype=np.float64),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column)
+
+
+def test_update_features_after_append(db):
+    data = _bars()
+    cut = data['date'].unique()[150]
+    _write(data[data['date'] <= cut])
+    _write(data[data['date'] > cut])
+    _assert_matches_rolling(data)
+
+
+def test_update_features_after_backfill_into_gap(db):
+    data = _bars()
+    dates = data['date'].unique()
+    gap = (data['symbol'] == 'AAA') & (data['date'] > dates[50]) & (data['date'] <= dates[55])
+    _write(data[~gap])
+    _write(data[gap])
+    _assert_matches_rolling(data)
+
+    latest = features.load_features(['AAA', 'BBB', 'ZZZ'], as_of=pd.Timestamp(dates[120]).date())
+    assert list(latest.index) == ['AAA', 'BBB']
+    assert (latest['date'] == dates[120]).all()
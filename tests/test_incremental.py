@@ -0,0 +1,92 @@
+"""
+增量指标测试：from_history + update + peek 与 calculate_* 全量计算逐点一致（含缺失值）
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import StrategyConfig
+from src.data.panel_store import OHLCVPanel
+from src.monitor.signal_monitor import SignalMonitor
+from src.strategy import indicators
+from src.strategy.incremental import IndicatorState
+
+
+def _config() -> StrategyConfig:
+    return StrategyConfig(ma_period=30, bollinger_period=20, bollinger_std=2.0, threshold_large_cap=0.05,
+                          threshold_small_cap=0.1, large_cap_market_cap=1e10, risk_reward_ratio=2.0)
+
+
+def _close(n_dates: int, gaps: bool, seed: int = 0) -> pd.Series:
+    """收盘价序列；gaps=True 时前段未上市、中间零散停牌、末段连续停牌"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_dates)))
+    if gaps:
+        close[:7] = np.nan
+        close[rng.choice(np.arange(7, n_dates - 10), size=n_dates // 10, replace=False)] = np.nan
+        close[n_dates - 8:n_dates - 5] = np.nan
+    return pd.Series(close)
+
+
+def _expected(close: pd.Series, config: StrategyConfig) -> pd.DataFrame:
+    """全量计算的各指标"""
+    bands = indicators.calculate_bollinger_bands(close, config.bollinger_period, config.bollinger_std)
+    macd = indicators.calculate_macd(close)
+    return pd.DataFrame({
+        'ma': indicators.calculate_sma(close, config.ma_period),
+        'bollinger_upper': bands.upper,
+        'bollinger_middle': bands.middle,
+        'bollinger_lower': bands.lower,
+        'rsi': indicators.calculate_rsi(close),
+        'macd': macd.macd,
+        'macd_signal': macd.signal,
+        'macd_histogram': macd.histogram,
+    })
+
+
+def _assert_row(actual: dict, expected: pd.Series):
+    for key, value in expected.items():
+        np.testing.assert_allclose(actual[key], value, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=key)
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+def test_update_matches_full_calculation(gaps):
+    config = _config()
+    close = _close(160, gaps)
+    expected = _expected(close, config)
+
+    state = IndicatorState.from_history(close.iloc[:40], config)
+    _assert_row(state.snapshot(), expected.iloc[39])
+    for t in range(40, len(close)):
+        _assert_row(state.update(close.iloc[t]), expected.iloc[t])
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+def test_peek_matches_full_calculation_without_committing(gaps):
+    config = _config()
+    close = _close(160, gaps)
+    expected = _expected(close, config)
+
+    for end in (10, 35, 100, 152, 159):
+        state = IndicatorState.from_history(close.iloc[:end], config)
+        before = state.snapshot()
+        _assert_row(state.peek(close.iloc[end]), expected.iloc[end])
+        suspended = pd.concat([close.iloc[:end], pd.Series([np.nan])], ignore_index=True)
+        _assert_row(state.peek(np.nan), _expected(suspended, config).iloc[end])
+        _assert_row(state.snapshot(), pd.Series(before))
+
+
+def test_monitor_peek_indicators_uses_history_before_as_of():
+    config = _config()
+    close = _close(120, gaps=True)
+    prices = np.repeat(close.to_numpy()[np.newaxis, :, np.newaxis], 5, axis=2)
+    dates = np.datetime64('2024-01-01') + np.arange(120)
+    panel = OHLCVPanel(symbols=['AAA'], dates=dates, data=prices)
+
+    monitor = SignalMonitor(strategy=None, notifier=None, config=config)
+    monitor.prepare_day(panel, as_of=dates[100], stock_infos={})
+    expected = _expected(pd.concat([close.iloc[:100], pd.Series([123.0])], ignore_index=True), config)
+    _assert_row(monitor.peek_indicators('AAA', 123.0), expected.iloc[100])
+    _assert_row(monitor.peek_indicators('AAA', 123.0), expected.iloc[100])
+    assert list(monitor.indicator_states) == ['AAA']
+    assert monitor.peek_indicators('ZZZ', 1.0) == {}
@@ -0,0 +1,94 @@
+"""
+技术指标测试：面板内核与逐序列 pandas 计算逐点一致（含 NaN 预热行、短序列与缺失值）
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy import indicators
+
+
+def _panel(n_dates: int, seed: int = 0) -> np.ndarray:
+    """3 只股票的价格面板：第 2 只晚上市（前段 NaN），第 3 只中间停牌（零散 NaN）"""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (3, n_dates)), axis=1))
+    prices[1, :n_dates // 3] = np.nan
+    prices[2, rng.choice(n_dates, size=max(n_dates // 10, 1), replace=False)] = np.nan
+    return prices
+
+
+def _rows(prices: np.ndarray):
+    return [pd.Series(row) for row in prices]
+
+
+def _assert_same(actual: np.ndarray, expected: pd.Series):
+    expected = expected.to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+
+N_DATES = [5, 19, 20, 21, 150]
+
+
+@pytest.mark.parametrize('n_dates', N_DATES)
+@pytest.mark.parametrize('period', [5, 20])
+def test_sma_panel_matches_rolling(n_dates, period):
+    prices = _panel(n_dates)
+    result = indicators.calculate_sma_panel(prices, period)
+    for row, series in enumerate(_rows(prices)):
+        _assert_same(result[row], series.rolling(period).mean())
+
+
+@pytest.mark.parametrize('n_dates', N_DATES)
+def test_rolling_mean_std_and_bollinger_match_rolling(n_dates):
+    prices = _panel(n_dates, seed=1)
+    mean, std = indicators.calculate_rolling_mean_std_panel(prices, 20)
+    bands = indicators.calculate_bollinger_bands_panel(prices, 20, 2.0)
+    for row, series in enumerate(_rows(prices)):
+        expected_mean = series.rolling(20).mean()
+        expected_std = series.rolling(20).std(ddof=0)
+        _assert_same(mean[row], expected_mean)
+        _assert_same(std[row], expected_std)
+        _assert_same(bands.upper[row], expected_mean + 2.0 * expected_std)
+        _assert_same(bands.lower[row], expected_mean - 2.0 * expected_std)
+
+
+@pytest.mark.parametrize('n_dates', N_DATES)
+@pytest.mark.parametrize('period', [12, 26])
+def test_ema_panel_matches_ewm(n_dates, period):
+    prices = _panel(n_dates, seed=2)
+    result = indicators.calculate_ema_panel(prices, period)
+    for row, series in enumerate(_rows(prices)):
+        _assert_same(result[row], series.ewm(span=period, adjust=False, min_periods=period).mean())
+
+
+@pytest.mark.parametrize('n_dates', N_DATES)
+def test_rsi_panel_matches_ewm(n_dates):
+    prices = _panel(n_dates, seed=3)
+    result = indicators.calculate_rsi_panel(prices, 14)
+    for row, series in enumerate(_rows(prices)):
+        delta = series.diff()
+        gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        _assert_same(result[row], 100 - 100 / (1 + gain / loss))
+
+
+@pytest.mark.parametrize('n_dates', N_DATES)
+def test_macd_panel_matches_ewm(n_dates):
+    prices = _panel(n_dates, seed=4)
+    result = indicators.calculate_macd_panel(prices, 12, 26, 9)
+    for row, series in enumerate(_rows(prices)):
+        macd = (series.ewm(span=12, adjust=False, min_periods=12).mean()
+                - series.ewm(span=26, adjust=False, min_periods=26).mean())
+        signal = macd.ewm(span=9, adjust=False, min_periods=9).mean()
+        _assert_same(result.macd[row], macd)
+        _assert_same(result.signal[row], signal)
+        _assert_same(result.histogram[row], macd - signal)
+
+
+def test_series_wrappers_keep_index():
+    data = pd.Series(_panel(60)[0], index=pd.date_range('2024-01-01', periods=60), name='close')
+    bands = indicators.calculate_bollinger_bands(data)
+    assert bands.middle.index.equals(data.index)
+    assert bands.upper.iloc[-1] > bands.middle.iloc[-1] > bands.lower.iloc[-1]
+    _assert_same(indicators.calculate_sma(data, 20).to_numpy(), data.rolling(20).mean())
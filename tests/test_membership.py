@@ -0,0 +1,73 @@
+"""
+指数成分股区间测试：membership_mask 与逐日逐区间判断一致，快照更新区间后缓存失效
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import membership
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    membership.invalidate()
+    yield
+    membership.invalidate()
+
+
+def _expected(intervals: pd.DataFrame, symbols, dates) -> np.ndarray:
+    """逐个 (symbol, date) 检查是否落在某个 [start, end) 区间内"""
+    mask = np.zeros((len(symbols), len(dates)), dtype=bool)
+    for i, symbol in enumerate(symbols):
+        for j, day in enumerate(dates):
+            for row in intervals[intervals['symbol'] == symbol].itertuples():
+                end = row.end_date if row.end_date is not None else dt.date.max
+                if row.start_date <= day < end:
+                    mask[i, j] = True
+    return mask
+
+
+def test_mask_matches_interval_semantics(db):
+    d = dt.date
+    intervals = pd.DataFrame([
+        ('AAA', d(2024, 1, 3), d(2024, 1, 9)),      # 终点不含
+        ('AAA', d(2024, 1, 11), None),              # 调出后重新调入，至今仍是成分股
+        ('BBB', d(2023, 6, 1), d(2024, 1, 4)),      # 起点早于面板
+        ('CCC', d(2024, 1, 6), d(2024, 1, 8)),      # 区间只覆盖周末，面板上没有交易日
+        ('DDD', d(2024, 1, 10), d(2024, 3, 1)),     # 终点晚于面板
+        ('ZZZ', d(2024, 1, 2), None),               # 不在面板中
+    ], columns=['symbol', 'start_date', 'end_date'])
+    assert membership.save_intervals('S&P 500', intervals) == len(intervals)
+
+    symbols = ['DDD', 'AAA', 'EEE', 'CCC', 'BBB']
+    dates = [ts.date() for ts in pd.bdate_range('2024-01-02', '2024-01-12')]
+    expected = _expected(intervals, symbols, dates)
+
+    for index in ('sp500', 'SP500'):
+        np.testing.assert_array_equal(membership.membership_mask(index, symbols, dates), expected)
+    np.testing.assert_array_equal(
+        membership.membership_mask('sp500', symbols, np.array(dates, dtype='datetime64[D]')), expected)
+    assert membership.is_member('sp500', 'AAA', d(2024, 1, 8))
+    assert not membership.is_member('sp500', 'AAA', d(2024, 1, 9))
+    assert membership.members_on('sp500', d(2024, 1, 11)) == ['AAA', 'DDD', 'ZZZ']
+    assert not membership.membership_mask('nasdaq100', symbols, dates).any()
+
+
+def test_record_snapshot_opens_and_closes_intervals(db):
+    d1, d2, d3 = dt.date(2024, 1, 2), dt.date(2024, 1, 3), dt.date(2024, 1, 4)
+    dates = [d1, d2, d3, dt.date(2024, 1, 5)]
+    symbols = ['AAA', 'BBB', 'CCC']
+
+    assert membership.record_snapshot('nasdaq100', ['AAA', 'BBB'], d1) == 2
+    np.testing.assert_array_equal(membership.membership_mask('nasdaq100', symbols, dates),
+                                  [[1, 1, 1, 1], [1, 1, 1, 1], [0, 0, 0, 0]])
+
+    # 写入后缓存失效，下一次查询读到新区间
+    assert membership.record_snapshot('nasdaq100', ['BBB', 'CCC'], d2) == 2
+    assert membership.record_snapshot('nasdaq100', ['BBB', 'CCC'], d2) == 0
+    assert membership.record_snapshot('nasdaq100', ['AAA', 'CCC'], d3) == 2
+    np.testing.assert_array_equal(membership.membership_mask('nasdaq100', symbols, dates),
+                                  [[1, 0, 1, 1], [1, 1, 0, 0], [0, 1, 1, 1]])
+    assert membership.members_on('nasdaq100', d2) == ['BBB', 'CCC']
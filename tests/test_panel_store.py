@@ -0,0 +1,35 @@
+"""
+行情面板增量同步测试
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from src.data import db_operations, panel_store
+from src.data.db_models import StockData
+
+
+def _bars(dates, close) -> pd.DataFrame:
+    return pd.DataFrame({'symbol': 'AAA', 'date': pd.to_datetime(dates), 'open': close, 'high': close,
+                         'low': close, 'close': close, 'volume': 1000})
+
+
+def test_sync_reads_late_commits_and_whole_second_timestamps(db, tmp_path):
+    panel_dir = tmp_path / 'panel'
+    db_operations.save_stocks_data(_bars(['2024-01-02', '2024-01-03'], [10.0, 11.0]))
+    assert panel_store.sync_panel_store(panel_dir) == 2
+    watermark = panel_store._read_meta(panel_dir)['watermark']
+    assert len(watermark) == 26
+
+    # 写入较晚提交、created_at 早于水位且没有小数秒的记录（ORM 默认格式）
+    created_at = dt.datetime.strptime(watermark, '%Y-%m-%d %H:%M:%S.%f').replace(microsecond=0) \
+        - dt.timedelta(minutes=1)
+    StockData.create(symbol='AAA', date=dt.date(2024, 1, 4), open=12.0, high=12.0, low=12.0, close=12.0,
+                     volume=1000, created_at=created_at)
+
+    assert panel_store.sync_panel_store(panel_dir) >= 1
+    panel = panel_store.open_panel(panel_dir)
+    assert panel.dates[-1] == np.datetime64('2024-01-04')
+    np.testing.assert_array_equal(panel.field('close')[0], [10.0, 11.0, 12.0])
+
@@ -0,0 +1,53 @@
+"""
+并行筛选测试：多进程结果与单进程一致，共享内存只发布待筛选的行
+"""
+import numpy as np
+import pandas as pd
+
+from src.data import stock_info
+from src.data.market_data import StockInfo
+from src.monitor import signal_monitor
+from src.strategy import parallel_screening
+from src.strategy.parallel_screening import screen_universe
+from tests.test_sweep import BASE, _random_panel
+
+
+class _RecordingSharedPanel(parallel_screening.SharedPanel):
+    """记录发布到共享内存的股票"""
+    published = []
+
+    def __init__(self, panel):
+        super().__init__(panel)
+        _RecordingSharedPanel.published.append(list(panel.symbols))
+
+
+def test_multiprocess_matches_single_process():
+    panel = _random_panel(12, 200, seed=3)
+    market_caps = np.where(np.arange(12) % 3 == 0, 5.0e11, np.nan)
+    as_of = panel.dates[150]
+    subset = ['S7', 'S2', 'MISSING', 'S11', 'S5']
+
+    for symbols in (None, subset):
+        serial = screen_universe(panel, BASE, as_of, market_caps, symbols, max_workers=1)
+        parallel = screen_universe(panel, BASE, as_of, market_caps, symbols, max_workers=2, n_shards=3)
+        pd.testing.assert_frame_equal(parallel, serial)
+    assert serial.index.tolist() == ['S7', 'S2', 'S11', 'S5']
+    assert serial['reason'].nunique() > 1
+
+
+def test_monitor_screen_publishes_only_prefiltered_rows(monkeypatch):
+    panel = _random_panel(10, 120, seed=5)
+    survivors = ['S8', 'S1', 'S4']
+    monkeypatch.setattr(signal_monitor, 'prefilter_by_ma_distance', lambda symbols, config, infos, day: survivors)
+    monkeypatch.setattr(parallel_screening, 'SharedPanel', _RecordingSharedPanel)
+    _RecordingSharedPanel.published = []
+    infos = {'S1': StockInfo(symbol='S1', name='S1', market_cap=5.0e11, sector='', industry='')}
+
+    monitor = signal_monitor.SignalMonitor(strategy=None, notifier=None, config=BASE)
+    monitor.prepare_day(panel, stock_infos=infos)
+    results = monitor.screen(max_workers=2)
+
+    assert _RecordingSharedPanel.published == [survivors]
+    market_caps = stock_info.market_cap_array(infos, panel.symbols)
+    assert np.isfinite(market_caps).sum() == 1
+    pd.testing.assert_frame_equal(results, screen_universe(panel, BASE, None, market_caps, survivors, max_workers=1))
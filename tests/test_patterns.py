@@ -0,0 +1,55 @@
+"""
+K 线形态扫描测试：事件表与逐根 K 线的 is_bullish_engulfing / is_break_high 判断一致
+"""
+import numpy as np
+import pandas as pd
+
+from src.data.panel_store import OHLCVPanel
+from src.strategy import indicators, patterns
+
+
+def _panel(n_symbols: int = 4, n_dates: int = 80) -> OHLCVPanel:
+    rng = np.random.default_rng(11)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (n_symbols, n_dates)), axis=1))
+    open_ = close * (1 + rng.normal(0, 0.03, close.shape))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, close.shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, close.shape)))
+    data = np.stack([open_, high, low, close, np.ones_like(close)], axis=-1)
+    data[1, :10] = np.nan   # 晚上市
+    dates = np.datetime64('2024-01-01') + np.arange(n_dates)
+    return OHLCVPanel([f'S{i}' for i in range(n_symbols)], dates, data)
+
+
+def test_scan_patterns_matches_candle_checks():
+    panel = _panel()
+    events = patterns.scan_patterns(panel)
+    found = set(zip(events['symbol'], events['day'], events['pattern']))
+
+    expected = set()
+    for row, symbol in enumerate(panel.symbols):
+        frame = pd.DataFrame(panel.data[row], columns=['open', 'high', 'low', 'close', 'volume'])
+        for day in range(1, len(frame)):
+            prev, curr = frame.iloc[day - 1], frame.iloc[day]
+            if indicators.is_bullish_engulfing(prev, curr):
+                expected.add((symbol, day, 'yang_bao_yin'))
+            if indicators.is_break_high(prev, curr):
+                expected.add((symbol, day, 'break_high'))
+
+    assert expected and found == expected
+    first = events.iloc[0]
+    row, day = first['row'], first['day']
+    assert first['close'] == panel.data[row, day, 3] and first['prev_high'] == panel.data[row, day - 1, 1]
+
+
+def test_scan_patterns_window_and_frame():
+    panel = _panel()
+    events = patterns.scan_patterns(panel, ['break_high'], start=20, end=40)
+    assert events['day'].between(20, 39).all()
+    assert set(events['pattern']) == {'break_high'}
+
+    frame = panel.to_frame(0)
+    tail = patterns.scan_frame('S0', frame, start=-5)
+    full = patterns.scan_patterns(panel)
+    expected = full[(full['symbol'] == 'S0') & (full['day'] >= len(frame) - 5)]
+    assert list(tail['day']) == list(expected['day'])
+    assert patterns.scan_patterns(panel, []).empty
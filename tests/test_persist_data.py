@@ -0,0 +1,64 @@
+"""
+持久化工具测试
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from src.data import providers, stock_info
+from src.data.db_models import BackfillAttempt
+from src.data.market_data import StockInfo
+from src.tools import persist_data
+
+
+def _fake_fetcher(symbol: str) -> StockInfo:
+    if symbol == 'BAD':
+        raise RuntimeError('boom')
+    return StockInfo(symbol=symbol, name=symbol, market_cap=1.0e10, sector='Tech', industry='Software')
+
+
+class _EmptyProvider(providers.DataProvider):
+    def download(self, tickers, start, end):
+        return pd.DataFrame(columns=providers.LONG_COLUMNS)
+
+
+def test_refreshed_info_snapshot_is_loaded_for_screening(db, persist_log, monkeypatch):
+    monkeypatch.setattr(persist_data.market_data, 'fetch_stock_info', _fake_fetcher)
+    stock_info.save_stock_info_snapshot([StockInfo(symbol='AAA', name='old', market_cap=1.0, sector='',
+                                                   industry='')], dt.date(2024, 1, 2))
+
+    end = dt.date(2024, 1, 5)
+    assert persist_data.persist_stocks_daily(['AAA', 'BBB'], dt.date(2024, 1, 2), end, provider=_EmptyProvider(),
+                                             requests_per_second=1000.0, refresh_info=True)
+
+    assert stock_info.get_snapshot_symbols(end) == {'AAA', 'BBB'}
+    infos = stock_info.load_latest_stock_info(['AAA', 'BBB', 'CCC'])
+    assert infos['AAA'] == _fake_fetcher('AAA')     # 最新快照覆盖旧快照
+    assert set(infos) == {'AAA', 'BBB'}
+    np.testing.assert_array_equal(stock_info.market_cap_array(infos, ['BBB', 'CCC', 'AAA']),
+                                  [1.0e10, np.nan, 1.0e10])
+
+
+def test_persist_stock_info_skips_failures_and_resumes(db, persist_log):
+    as_of = dt.date(2024, 1, 2)
+    saved = persist_data.persist_stock_info(['AAA', 'BBB', 'BAD'], as_of, fetcher=_fake_fetcher,
+                                            requests_per_second=1000.0)
+    assert saved == 2
+    assert stock_info.get_snapshot_symbols(as_of) == {'AAA', 'BBB'}
+
+    # 重跑只请求仍缺失的股票
+    requested = []
+    persist_data.persist_stock_info(['AAA', 'BBB', 'BAD'], as_of,
+                                    fetcher=lambda s: requested.append(s) or _fake_fetcher(s),
+                                    requests_per_second=1000.0)
+    assert requested == ['BAD']
+    assert '获取 BAD 信息失败: boom' in persist_log.read_text(encoding='utf-8')
+
+
+def test_persist_stocks_daily_records_empty_ranges(db, persist_log):
+    start, end = dt.date(2024, 1, 2), dt.date(2024, 1, 5)
+    assert persist_data.persist_stocks_daily(['NEW'], start, end, overwrite=False, provider=_EmptyProvider(),
+                                             requests_per_second=1000.0)
+    rows = list(BackfillAttempt.select().tuples())
+    assert [(r[1], r[2], r[3]) for r in rows] == [('NEW', start, end)]
@@ -0,0 +1,39 @@
+"""
+日线数据源测试：空批次与限流的区分
+"""
+import datetime as dt
+import logging
+
+import pandas as pd
+import pytest
+
+from src.data import providers
+from src.utils import rate_limiter
+from src.tools import persist_data
+
+START, END = dt.date(2024, 1, 2), dt.date(2024, 1, 5)
+
+
+def test_empty_batch_is_no_data(monkeypatch):
+    monkeypatch.setattr(providers.yf, 'download', lambda **kwargs: pd.DataFrame())
+    data = providers.YFinanceProvider().download(['NEW'], START, END)
+    assert data.empty
+    assert list(data.columns) == providers.LONG_COLUMNS
+
+
+def test_rate_limited_batch_raises(monkeypatch):
+    def download(**kwargs):
+        logging.getLogger('yfinance').error("['AAA']: YFRateLimitError('Too Many Requests. Rate limited.')")
+        return pd.DataFrame()
+
+    monkeypatch.setattr(providers.yf, 'download', download)
+    with pytest.raises(providers.ThrottledError):
+        providers.YFinanceProvider().download(['AAA'], START, END)
+
+
+def test_download_batch_does_not_slow_down_on_empty_batch(monkeypatch):
+    monkeypatch.setattr(providers.yf, 'download', lambda **kwargs: pd.DataFrame())
+    limiter = rate_limiter.TokenBucket(rate=100.0, capacity=1)
+    data = persist_data.download_batch(providers.YFinanceProvider(), limiter, ['NEW'], START, END)
+    assert data.empty
+    assert limiter.rate >= 100.0
@@ -0,0 +1,67 @@
+"""
+行情监控测试：并发批次数不超过 max_concurrency，队列长度不超过 queue_size（背压）
+"""
+import asyncio
+import threading
+import time
+
+from src.config.settings import MonitorConfig
+from src.monitor.quote_monitor import QuoteMonitor
+
+
+class _SlowFetcher:
+    """记录同时进行的拉取数；FAIL 批次抛出异常"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, batch):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.01)
+            if 'FAIL' in batch:
+                raise RuntimeError('boom')
+            return {symbol: {'close': 1.0} for symbol in batch}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_sweep_respects_concurrency_and_queue_bounds():
+    stocks = [f'S{i:03d}' for i in range(60)] + ['FAIL']
+    config = MonitorConfig(interval=10, stocks=stocks, batch_size=2, max_concurrency=3, queue_size=4)
+    fetcher = _SlowFetcher()
+    monitor = QuoteMonitor(config, fetcher=fetcher)
+    received, queue_sizes = [], []
+
+    async def run():
+        queue = asyncio.Queue(maxsize=config.queue_size)
+
+        async def slow_consumer(quotes):
+            received.extend(quotes)
+            await asyncio.sleep(0.02)
+
+        async def sample():
+            while True:
+                queue_sizes.append(queue.qsize())
+                await asyncio.sleep(0.001)
+
+        monitor.add_callback('data', slow_consumer)
+        tasks = [asyncio.create_task(monitor._consume(queue)), asyncio.create_task(sample())]
+        try:
+            return await monitor.sweep(queue)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    stats = asyncio.run(run())
+
+    assert fetcher.max_active == config.max_concurrency
+    assert max(queue_sizes) == config.queue_size    # 消费者较慢时队列被填满，但不会超出
+    assert sorted(received) == stocks[:-1]
+    assert (stats.n_batches, stats.n_failed, stats.n_quotes) == (31, 1, 60)
+    assert monitor.sweep_stats[-1] == stats
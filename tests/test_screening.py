@@ -0,0 +1,80 @@
+"""
+MA 偏离预过滤测试：SQLite 窗口函数结果与 pandas 手工计算、check_composite 逐只判断一致
+"""
+import dataclasses
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from src.data import db_operations
+from src.data.market_data import StockInfo
+from src.strategy import screening
+from tests.test_db_operations import _bars
+from tests.test_sweep import BASE
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE', 'SHORT']
+
+
+def _history(seed: int = 0) -> pd.DataFrame:
+    """各股票漂移不同的日线，随机缺少部分交易日；SHORT 的记录数少于均线周期"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-02', periods=60)
+    frames = []
+    for i, (symbol, drift) in enumerate(zip(SYMBOLS, (-0.012, -0.006, 0.0, 0.006, -0.02, -0.02))):
+        close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.01, len(dates))))
+        keep = rng.random(len(dates)) > 0.15
+        if symbol == 'SHORT':
+            keep[:45] = False
+        frames.append(_bars(symbol, dates[keep], close[keep]))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _manual(history: pd.DataFrame, ma_period: int, as_of: dt.date) -> pd.DataFrame:
+    """pandas 计算：截至 as_of 的最近 ma_period 条记录的均线与最新收盘价偏离"""
+    recent = history[history['date'] <= pd.Timestamp(as_of)].sort_values('date').groupby('symbol').tail(ma_period)
+    grouped = recent.groupby('symbol')
+    frame = pd.DataFrame({
+        'date': grouped['date'].last(),
+        'close': grouped['close'].last(),
+        'ma': grouped['close'].mean(),
+        'n_bars': grouped['close'].size(),
+    })
+    frame['distance'] = frame['close'] / frame['ma'] - 1
+    return frame
+
+
+def test_ma_distance_frame_matches_pandas(db):
+    history = _history()
+    db_operations.save_stocks_data(history)
+    as_of = dt.date(2024, 3, 8)
+
+    for ma_period in (5, 20):
+        actual = db_operations.get_ma_distance_frame(SYMBOLS + ['NONE'], ma_period, as_of)
+        expected = _manual(history, ma_period, as_of)
+        pd.testing.assert_frame_equal(actual.sort_index(), expected, check_dtype=False, check_names=False,
+                                      rtol=1e-12)
+    assert actual.loc['SHORT', 'n_bars'] < 20 <= actual.loc['AAA', 'n_bars']
+
+    latest = db_operations.get_ma_distance_frame(SYMBOLS, 20)
+    pd.testing.assert_frame_equal(latest.sort_index(), _manual(history, 20, dt.date(2099, 1, 1)),
+                                  check_dtype=False, check_names=False, rtol=1e-12)
+
+
+def test_prefilter_matches_check_composite(db):
+    history = _history(seed=1)
+    db_operations.save_stocks_data(history)
+    as_of = dt.date(2024, 3, 8)
+    infos = {s: StockInfo(symbol=s, name=s, market_cap=5.0e11, sector='', industry='') for s in ('AAA', 'EEE')}
+    config = dataclasses.replace(BASE, threshold_large_cap=0.02, threshold_small_cap=0.06)
+
+    symbols = SYMBOLS[::-1]
+    expected = []
+    for symbol in symbols:
+        rows = history[(history['symbol'] == symbol) & (history['date'] <= pd.Timestamp(as_of))]
+        market_cap = infos[symbol]['market_cap'] if symbol in infos else np.nan
+        if screening.check_composite(rows['close'].to_numpy(), market_cap, config).passed:
+            expected.append(symbol)
+
+    assert screening.prefilter_by_ma_distance(symbols, config, infos, as_of) == expected
+    assert 0 < len(expected) < len(symbols)
@@ -0,0 +1,35 @@
+"""
+信号监控测试
+"""
+import pandas as pd
+
+from src.data import db_operations
+from src.monitor.signal_monitor import SignalMonitor
+from tests.test_db_operations import _bars
+
+
+class _RecordingStrategy:
+    def __init__(self):
+        self.seen = {}
+
+    def analyze(self, symbol, data):
+        self.seen[symbol] = data
+        return None
+
+
+def test_run_once_loads_history_from_database_for_symbols_outside_panel(db):
+    db_operations.save_stocks_data(pd.concat([
+        _bars('AAA', ['2024-01-02', '2024-01-03'], [10.0, 11.0]),
+        _bars('BBB', ['2024-01-03'], [20.0]),
+    ]))
+    strategy = _RecordingStrategy()
+    monitor = SignalMonitor(strategy, notifier=None, config=None)
+    quote = {'open': 12.0, 'high': 13.0, 'low': 11.5, 'close': 12.5, 'volume': 100, 'timestamp': '2024-01-04T15:00:00'}
+
+    monitor.run_once({'AAA': quote, 'BBB': quote, 'NEW': quote})
+
+    assert strategy.seen['AAA']['close'].tolist() == [10.0, 11.0, 12.5]
+    assert strategy.seen['BBB']['close'].tolist() == [20.0, 12.5]
+    assert strategy.seen['NEW']['close'].tolist() == [12.5]
+    assert list(strategy.seen['AAA'].columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert strategy.seen['AAA'].index.name == 'date'
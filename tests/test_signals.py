@@ -0,0 +1,111 @@
+"""
+交易信号测试
+"""
+import numpy as np
+import pandas as pd
+
+from src.config.settings import StrategyConfig
+from src.data.panel_store import OHLCVPanel
+from src.strategy import signals
+
+
+def _config(stop_loss_pct: float) -> StrategyConfig:
+    return StrategyConfig(ma_period=120, bollinger_period=20, bollinger_std=2.0,
+                          threshold_large_cap=0.08, threshold_small_cap=0.2,
+                          large_cap_market_cap=3.0e11, risk_reward_ratio=3.0, stop_loss_pct=stop_loss_pct)
+
+
+def test_target_price_follows_configured_stop_loss():
+    for pct in (0.1, 0.2):
+        config = _config(pct)
+        stop_loss = signals.calculate_stop_loss(100.0, None, config)
+        assert stop_loss == 100.0 * (1 - pct)
+        assert signals.calculate_target_price(100.0, config.risk_reward_ratio, stop_loss) == 100.0 + 3.0 * 100.0 * pct
+
+
+def test_target_price_accepts_arrays():
+    entry = np.array([10.0, 20.0])
+    np.testing.assert_allclose(signals.calculate_target_price(entry, 2.0, entry * 0.9), entry * 1.2)
+
+
+def _falling_panel(n_symbols: int = 300, n_dates: int = 60):
+    """下跌趋势的面板，使大量股票在最后一日满足准备条件"""
+    rng = np.random.default_rng(5)
+    returns = rng.normal(-0.01, 0.03, (n_symbols, n_dates))
+    returns[:, -3:] -= rng.uniform(0, 0.08, (n_symbols, 1))
+    close = 100 * np.exp(np.cumsum(returns, axis=1))
+    open_ = close * (1 + rng.normal(0, 0.02, close.shape))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, close.shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, close.shape)))
+    data = np.stack([open_, high, low, close, np.ones_like(close)], axis=-1)
+    dates = np.datetime64('2024-01-01') + np.arange(n_dates)
+    return OHLCVPanel([f'S{i:03d}' for i in range(n_symbols)], dates, data), rng
+
+
+def test_trigger_candidates_equal_fired_signals():
+    panel, rng = _falling_panel()
+    config = StrategyConfig(ma_period=20, bollinger_period=10, bollinger_std=2.0, threshold_large_cap=0.02,
+                            threshold_small_cap=0.05, large_cap_market_cap=3.0e11, risk_reward_ratio=3.0)
+    market_caps = np.where(np.arange(len(panel.symbols)) % 2 == 0, 5.0e11, np.nan)
+    day = panel.dates[-1] + 1
+    timestamp = pd.Timestamp(day) + pd.Timedelta(hours=15)
+
+    # 开盘价取前一日收盘价，使阳包阴的其余条件恒成立，候选集合应与信号集合完全一致
+    prev_close = panel.field('close')[:, -1]
+    prev_open = panel.field('open')[:, -1]
+    price = prev_close * (1 + rng.normal(0, 0.06, len(prev_close)))
+    quotes = {
+        symbol: {'open': prev_close[i], 'high': max(prev_close[i], price[i]), 'low': min(prev_close[i], price[i]),
+                 'close': price[i], 'volume': 1, 'timestamp': timestamp}
+        for i, symbol in enumerate(panel.symbols)
+    }
+    quotes['UNKNOWN'] = dict(quotes['S000'])
+
+    frame = signals.generate_signals_frame(panel, config, market_caps=market_caps, quotes=quotes)
+    levels = signals.compute_trigger_levels(panel, config, day, market_caps)
+    candidates = signals.find_trigger_candidates(levels, quotes)
+
+    assert set(frame['signal_type']) == set(signals.SIGNAL_TYPES)
+    assert sorted(candidates) == sorted(set(frame['symbol']))
+    # 前一日不满足准备条件的股票没有形态价位
+    assert np.isnan(levels.break_high_price).sum() > len(panel.symbols) // 2
+    assert np.all(np.isnan(levels.engulf_price) | (prev_close < prev_open))
+
+
+def test_signals_frame_matches_per_symbol_signals():
+    panel, _ = _falling_panel(n_symbols=40, n_dates=60)
+    data = np.array(panel.data)
+    data[:5, :35] = np.nan      # 上市较晚的股票，前段无数据
+    # 后一半股票最后一日低开高走，前一日为阴线时形成阳包阴
+    open_, high, low, close = (data[20:, :, i] for i in range(4))
+    open_[:, -1] = close[:, -2] * 0.99
+    close[:, -1] = open_[:, -2] * 1.01
+    high[:, -1] = np.maximum(high[:, -1], close[:, -1])
+    low[:, -1] = np.minimum(low[:, -1], open_[:, -1])
+    panel = OHLCVPanel(panel.symbols, panel.dates, data)
+    config = StrategyConfig(ma_period=20, bollinger_period=10, bollinger_std=2.0, threshold_large_cap=0.02,
+                            threshold_small_cap=0.05, large_cap_market_cap=3.0e11, risk_reward_ratio=3.0)
+    market_caps = np.where(np.arange(len(panel.symbols)) % 2 == 0, 5.0e11, np.nan)
+    generators = {
+        'bollinger_breakout': signals.generate_bollinger_breakout_signal,
+        'break_high': signals.generate_break_high_signal,
+        'yang_bao_yin': signals.generate_yang_bao_yin_signal,
+    }
+
+    fired = set()
+    for as_of in panel.dates[-5:]:
+        frame = signals.generate_signals_frame(panel, config, as_of=as_of, market_caps=market_caps)
+        actual = signals.signals_to_dicts(frame)
+        expected, composite = [], []
+        for row, symbol in enumerate(panel.symbols):
+            history = panel.to_frame(row)
+            history = history[history.index <= pd.Timestamp(as_of)]
+            market_cap = market_caps[row]
+            per_symbol = [generators[t](history, config, symbol, market_cap) for t in reversed(signals.SIGNAL_TYPES)]
+            expected.extend(s for s in per_symbol if s)
+            composite.append(signals.generate_composite_signal(history, config, symbol, market_cap))
+        assert actual == expected
+        first = {s['symbol']: s for s in reversed(actual)}
+        assert [s for s in composite if s] == [first[s] for s in panel.symbols if s in first]
+        fired.update(frame['signal_type'])
+    assert fired == set(signals.SIGNAL_TYPES)
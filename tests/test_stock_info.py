@@ -0,0 +1,28 @@
+"""
+股票信息快照测试
+"""
+import datetime as dt
+
+import numpy as np
+
+from src.data import stock_info
+from src.data.market_data import StockInfo
+
+
+def _info(symbol: str, market_cap: float) -> StockInfo:
+    return StockInfo(symbol=symbol, name=symbol, market_cap=market_cap, sector='', industry='')
+
+
+def test_market_cap_panel_uses_latest_snapshot_on_or_before_each_date(db):
+    stock_info.save_stock_info_snapshot([_info('AAA', 1.0), _info('BBB', 5.0)], dt.date(2024, 1, 2))
+    stock_info.save_stock_info_snapshot([_info('AAA', 2.0), _info('BBB', float('nan'))], dt.date(2024, 1, 4))
+    stock_info.save_stock_info_snapshot([_info('AAA', 9.0)], dt.date(2024, 1, 10))
+
+    dates = np.datetime64('2024-01-01') + np.arange(6)
+    result = stock_info.market_cap_panel(['BBB', 'AAA', 'ZZZ'], dates)
+
+    np.testing.assert_array_equal(result, [
+        [np.nan, 5.0, 5.0, 5.0, 5.0, 5.0],      # 缺失市值的快照沿用之前的值
+        [np.nan, 1.0, 1.0, 2.0, 2.0, 2.0],      # 之后的快照（1 月 10 日）不可见
+        [np.nan] * 6,
+    ])
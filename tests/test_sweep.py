@@ -0,0 +1,53 @@
+"""
+参数扫描测试：多进程扫描结果与逐组直接回测一致
+"""
+import dataclasses
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import sweep, vectorized
+from src.config.settings import BacktestConfig, StrategyConfig
+from src.data.panel_store import OHLCVPanel
+
+
+def _random_panel(n_symbols: int, n_dates: int, seed: int = 0) -> OHLCVPanel:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (n_symbols, n_dates)), axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.015, close.shape))
+    spread = np.abs(rng.normal(0, 0.01, close.shape)) * close
+    data = np.stack([open_, np.maximum(open_, close) + spread, np.minimum(open_, close) - spread,
+                     close, np.full(close.shape, 1000.0)], axis=-1)
+    return OHLCVPanel(symbols=[f'S{i}' for i in range(n_symbols)],
+                      dates=np.datetime64('2024-01-01') + np.arange(n_dates), data=data)
+
+
+BASE = StrategyConfig(ma_period=20, bollinger_period=10, bollinger_std=2.0, threshold_large_cap=0.05,
+                      threshold_small_cap=0.05, large_cap_market_cap=3.0e11, risk_reward_ratio=2.0,
+                      stop_loss_pct=0.08)
+
+
+def test_grid_configs_expands_product():
+    configs = sweep.grid_configs(BASE, {'ma_period': [10, 20], 'bollinger_std': [1.5, 2.0, 2.5]})
+    assert len(configs) == 6
+    assert {(c.ma_period, c.bollinger_std) for c in configs} == {(m, s) for m in (10, 20) for s in (1.5, 2.0, 2.5)}
+    assert all(c.bollinger_period == 10 for c in configs)
+
+
+def test_parallel_sweep_matches_direct_backtests():
+    panel = _random_panel(8, 300)
+    configs = sweep.grid_configs(BASE, {'ma_period': [10, 20], 'bollinger_period': [10, 15],
+                                        'bollinger_std': [1.5, 2.0]})
+    backtest_config = BacktestConfig(signal_types=['bollinger_breakout', 'break_high', 'yang_bao_yin'],
+                                     start_date='2024-02-01')
+
+    results = sweep.run_sweep(panel, configs, backtest_config, metric='total_return', max_workers=2)
+
+    assert len(results) == len(configs)
+    assert results['total_return'].is_monotonic_decreasing
+    fields = [f.name for f in dataclasses.fields(StrategyConfig)]
+    for params, row in zip(results[fields].to_dict('records'), results.to_dict('records')):
+        expected = vectorized.run_backtest(panel, StrategyConfig(**params), backtest_config).metrics
+        actual = pd.Series({key: row[key] for key in expected}, dtype=float)
+        pd.testing.assert_series_equal(actual, pd.Series(expected, dtype=float), rtol=1e-10)
+    assert results['n_trades'].min() > 0
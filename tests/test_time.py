@@ -0,0 +1,73 @@
+"""
+交易日历测试：交易日判断、前后交易日（含越界）、磁盘缓存的版本与年份范围
+"""
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from src.utils import time as trading_time
+
+
+@pytest.fixture
+def calendar(tmp_path):
+    return trading_time.TradingCalendar('NYSE', cache_dir=tmp_path)
+
+
+def test_sessions_and_neighbours(calendar):
+    assert not calendar.is_session(dt.date(2024, 7, 4))         # 独立日
+    assert calendar.is_session(dt.date(2024, 7, 5))
+    assert not calendar.is_session('2024-07-06')                # 周六
+    assert calendar.previous_session(dt.date(2024, 7, 5)) == dt.date(2024, 7, 3)
+    assert calendar.next_session(dt.date(2024, 7, 3)) == dt.date(2024, 7, 5)
+    assert calendar.previous_session(dt.date(2024, 1, 2)) == dt.date(2023, 12, 29)   # 跨年
+    assert len(calendar.sessions_in_range('2024-01-01', '2024-12-31')) == 252
+    np.testing.assert_array_equal(
+        calendar.is_session_array(np.array(['2024-12-24', '2024-12-25', '2024-12-26'], dtype='datetime64[D]')),
+        [True, False, True],
+    )
+
+
+def test_previous_and_next_sessions_out_of_range_are_nat(tmp_path, monkeypatch):
+    calendar = trading_time.TradingCalendar('NYSE', cache_dir=tmp_path)
+    sessions = np.array(['2020-06-01', '2020-06-02'], dtype='datetime64[D]')
+    empty = np.array([], dtype='datetime64[D]')
+    no_times = np.array([], dtype='datetime64[s]')
+    times = sessions.astype('datetime64[s]')
+    monkeypatch.setattr(calendar, '_compute_years', lambda first, last, years: {
+        year: (sessions, times, times) if year == 2020 else (empty, no_times, no_times) for year in years
+    })
+
+    days = np.array(['2020-05-01', '2020-06-02', '2020-07-01'], dtype='datetime64[D]')
+    previous = calendar.previous_sessions(days)
+    following = calendar.next_sessions(days)
+    assert np.isnat(previous[0]) and previous[1] == sessions[0] and previous[2] == sessions[1]
+    assert following[0] == sessions[0] and np.isnat(following[1]) and np.isnat(following[2])
+    with pytest.raises(ValueError):
+        calendar.previous_session(dt.date(2020, 6, 1))
+    with pytest.raises(ValueError):
+        calendar.next_session(dt.date(2020, 6, 2))
+
+
+def test_only_past_years_are_cached_and_keyed_on_library_version(tmp_path, monkeypatch):
+    this_year = dt.date.today().year
+    trading_time.TradingCalendar('NYSE', cache_dir=tmp_path).is_session(dt.date(this_year - 1, 6, 3))
+
+    cached = sorted(path.name for path in tmp_path.iterdir())
+    version = trading_time.CALENDAR_CACHE_VERSION
+    assert cached == [f'NYSE_{this_year - 2}_{version}.npz', f'NYSE_{this_year - 1}_{version}.npz']
+
+    # 过去的年份从缓存读取；当年需要重新计算
+    computed = []
+    calendar = trading_time.TradingCalendar('NYSE', cache_dir=tmp_path)
+    original = calendar._compute_years
+    monkeypatch.setattr(calendar, '_compute_years',
+                        lambda first, last, years: computed.extend(years) or original(first, last, years))
+    calendar.is_session(dt.date(this_year - 2, 6, 3))
+    assert computed == [this_year - 3]
+    calendar.is_session(dt.date(this_year - 1, 6, 3))
+    assert computed == [this_year - 3, this_year]
+
+    # 版本号变化后旧缓存不再命中
+    monkeypatch.setattr(trading_time, 'CALENDAR_CACHE_VERSION', 'new')
+    assert not trading_time.TradingCalendar('NYSE', cache_dir=tmp_path)._cache_path(this_year - 1).exists()
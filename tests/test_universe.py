@@ -0,0 +1,105 @@
+"""
+指数成分股快照测试：有效期内不请求网络、过期后台刷新、离线回退到本地快照
+"""
+import datetime as dt
+
+from src.data.universe import UniverseManager, UniverseSnapshot
+
+
+class _Fetcher:
+    """记录调用次数的成分股获取函数，symbols 为空或 error 非空时模拟网络不可用"""
+
+    def __init__(self, symbols, error=None):
+        self.symbols = symbols
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return list(self.symbols)
+
+
+def _manager(tmp_path, fetcher, ttl_hours=24.0) -> UniverseManager:
+    return UniverseManager(universe_dir=tmp_path, ttl_hours=ttl_hours, fetchers={'nasdaq100': fetcher})
+
+
+def _seed(manager: UniverseManager, symbols, age_hours: float) -> UniverseSnapshot:
+    """在磁盘上写入一份 age_hours 小时前获取的快照"""
+    fetched_at = dt.datetime.now() - dt.timedelta(hours=age_hours)
+    ordered = tuple(symbols)
+    snapshot = UniverseSnapshot('nasdaq100', fetched_at.date(), fetched_at, frozenset(ordered), ordered)
+    manager._save(snapshot)
+    return snapshot
+
+
+def _join_refresh(manager: UniverseManager):
+    thread = manager.refreshing.get('nasdaq100')
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+def test_missing_snapshot_is_fetched_and_saved(tmp_path):
+    fetcher = _Fetcher(['AAPL', 'MSFT', 'AAPL'])
+    manager = _manager(tmp_path, fetcher)
+
+    snapshot = manager.get_snapshot('nasdaq100')
+    assert snapshot.ordered == ('AAPL', 'MSFT')
+    assert manager.list_snapshots('nasdaq100') == [dt.date.today()]
+    assert fetcher.calls == 1
+
+    # 新的管理器从磁盘读取，不再请求网络
+    reloaded = _manager(tmp_path, fetcher)
+    assert reloaded.get_snapshot('nasdaq100').ordered == ('AAPL', 'MSFT')
+    assert fetcher.calls == 1
+
+
+def test_fresh_snapshot_does_not_refresh(tmp_path):
+    fetcher = _Fetcher(['NVDA'])
+    manager = _manager(tmp_path, fetcher)
+    _seed(manager, ['AAPL'], age_hours=1)
+
+    assert manager.members('nasdaq100') == frozenset({'AAPL'})
+    _join_refresh(manager)
+    assert fetcher.calls == 0
+    assert 'nasdaq100' not in manager.refreshing
+
+
+def test_expired_snapshot_is_served_then_refreshed_in_background(tmp_path):
+    fetcher = _Fetcher(['NVDA', 'AAPL'])
+    manager = _manager(tmp_path, fetcher)
+    old = _seed(manager, ['AAPL'], age_hours=48)
+
+    assert manager.get_snapshot('nasdaq100') == old    # 立即返回旧快照
+    _join_refresh(manager)
+    assert fetcher.calls == 1
+
+    snapshot = manager.get_snapshot('nasdaq100')
+    assert snapshot.ordered == ('NVDA', 'AAPL')
+    assert manager.list_snapshots('nasdaq100') == sorted({old.as_of, dt.date.today()})
+    assert manager.is_member('nasdaq100', 'NVDA')
+    assert fetcher.calls == 1
+
+
+def test_offline_keeps_last_snapshot(tmp_path):
+    for fetcher in (_Fetcher([]), _Fetcher(['X'], error=ConnectionError('offline'))):
+        manager = _manager(tmp_path, fetcher)
+        old = _seed(manager, ['AAPL', 'MSFT'], age_hours=48)
+
+        assert manager.get_snapshot('nasdaq100') == old
+        _join_refresh(manager)
+        assert fetcher.calls == 1
+        assert manager.get_snapshot('nasdaq100') == old
+        assert manager.list_snapshots('nasdaq100') == [old.as_of]
+        assert manager.get_symbols(['nasdaq100']) == ['AAPL', 'MSFT']
+
+
+def test_offline_without_snapshot_returns_empty(tmp_path):
+    fetcher = _Fetcher([], error=ConnectionError('offline'))
+    manager = _manager(tmp_path, fetcher)
+
+    assert manager.get_snapshot('nasdaq100') is None
+    assert manager.members('nasdaq100') == frozenset()
+    assert manager.get_symbols(['nasdaq100']) == []
+    assert manager.list_snapshots('nasdaq100') == []
@@ -0,0 +1,56 @@
+"""
+滚动前推测试：每折选出训练窗口最优参数，测试窗口独立撮合
+"""
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import vectorized, walk_forward
+from src.backtest.sweep import grid_configs
+from src.config.settings import BacktestConfig, StrategyConfig
+from tests.test_sweep import BASE, _random_panel
+
+
+def _window_config(backtest_config: BacktestConfig, panel, start: int, end: int) -> BacktestConfig:
+    return dataclasses.replace(backtest_config, start_date=str(panel.dates[start]),
+                               end_date=str(panel.dates[end - 1]))
+
+
+def test_make_folds_rolling_and_anchored():
+    assert walk_forward.make_folds(100, 40, 20) == [
+        walk_forward.Fold(0, 40, 40, 60), walk_forward.Fold(20, 60, 60, 80), walk_forward.Fold(40, 80, 80, 100),
+    ]
+    assert [f.train_start for f in walk_forward.make_folds(100, 40, 20, anchored=True)] == [0, 0, 0]
+    assert walk_forward.make_folds(50, 40, 20) == []
+
+
+def test_each_fold_picks_best_in_train_config():
+    panel = _random_panel(10, 400, seed=1)
+    configs = grid_configs(BASE, {'ma_period': [10, 20, 30], 'bollinger_std': [1.0, 1.5, 2.0]})
+    backtest_config = BacktestConfig(signal_types=['bollinger_breakout', 'break_high'], start_date='2024-02-10')
+    metric = 'total_return'
+
+    result = walk_forward.run_walk_forward(panel, configs, backtest_config, train_size=120, test_size=60,
+                                           metric=metric, max_workers=1)
+    start, end = vectorized.resolve_date_range(panel, backtest_config)
+    folds = walk_forward.make_folds(len(panel.dates), 120, 60, start, end)
+    assert len(result.folds) == len(folds) == 4
+
+    for fold, row in zip(folds, result.folds.to_dict('records')):
+        # 参照：每个窗口单独回测（空仓、初始资金起步）
+        train = [vectorized.run_backtest(panel, config, _window_config(backtest_config, panel, fold.train_start,
+                                                                       fold.train_end)).metrics[metric]
+                 for config in configs]
+        assert row[f'train_{metric}'] == pytest.approx(max(train), rel=1e-12)
+        chosen = StrategyConfig(**{f.name: row[f.name] for f in dataclasses.fields(StrategyConfig)})
+        assert train[configs.index(chosen)] == pytest.approx(max(train), rel=1e-12)
+
+        test = vectorized.run_backtest(panel, chosen, _window_config(backtest_config, panel, fold.test_start,
+                                                                     fold.test_end)).metrics
+        for key, value in test.items():
+            assert row[f'test_{key}'] == pytest.approx(value, rel=1e-10, nan_ok=True)
+
+    assert len(result.oos_equity) == 4 * 60
+    assert result.oos_equity.index[0] == pd.Timestamp(panel.dates[folds[0].test_start])